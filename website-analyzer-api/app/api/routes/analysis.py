@@ -1,18 +1,24 @@
 # app/api/routes/analysis.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from typing import Any, List, Optional
+import base64
+import binascii
+import json
 import uuid
 import re
 from datetime import datetime, timedelta 
+from bson import ObjectId
+from bson.errors import InvalidId
 from collections import Counter
 from app.core.config import settings
 from pydantic import BaseModel
 
+from app.db import database
 from app.db.models import User, AnalysisJob
 from app.api.dependencies import get_current_user
 # Wir verwenden die bereits existierenden Schemas für Konsistenz
-from app.schemas.analysis import JobResponse, AnalysisCreate 
+from app.schemas.analysis import JobResponse, AnalysisCreate, JobHistoryPage
 from app.worker.celery_app import celery_app 
 
 router = APIRouter()
@@ -38,6 +44,7 @@ async def start_analysis(
         status="pending",
         notes=analysis_in.notes if hasattr(analysis_in, 'notes') else None,
         user_id=str(current_user.id),
+        bypass_llm_cache=analysis_in.bypass_llm_cache,
         # NEU: Wir stempeln den Job mit der aktuellen Backend-Version aus der Config
         backend_version=settings.BACKEND_VERSION
     )
@@ -54,25 +61,70 @@ async def get_job_status(job_id: str, current_user: User = Depends(get_current_u
     job = await AnalysisJob.find_one(AnalysisJob.job_id == job_id, AnalysisJob.user_id == str(current_user.id))
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    return {"job_id": job.job_id, "status": job.status, "url": job.url}
+    return {"job_id": job.job_id, "status": job.status, "url": job.url, "completed_sections": job.completed_sections}
 
 
 @router.get("/results/{job_id}", response_model=AnalysisJob)
 async def get_analysis_results(job_id: str, current_user: User = Depends(get_current_user)) -> Any:
-    """ Gibt das vollständige Ergebnis eines abgeschlossenen Analyse-Jobs zurück. """
+    """
+    Gibt das Ergebnis eines Analyse-Jobs zurück: vollständig nach Abschluss, während der finalen
+    Analyse die bereits gestreamten Teilergebnisse (siehe completed_sections).
+    """
     job = await AnalysisJob.find_one(AnalysisJob.job_id == job_id, AnalysisJob.user_id == str(current_user.id))
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
-    if job.status not in ["completed", "failed"]:
+    if job.status not in ["completed", "failed"] and not job.completed_sections:
         raise HTTPException(status_code=400, detail=f"Job status is '{job.status}', not 'completed' or 'failed'.")
     return job
 
 
-@router.get("/history", response_model=List[AnalysisJob])
-async def get_analysis_history(current_user: User = Depends(get_current_user)) -> Any:
-    """ Gibt die gesamte Analyse-Historie für den eingeloggten Benutzer zurück. """
-    jobs = await AnalysisJob.find(AnalysisJob.user_id == str(current_user.id)).sort(-AnalysisJob.created_at).to_list()
-    return jobs
+# Nur die Felder der Historien-Übersicht; Analyse-Texte und Tracebacks bleiben in der Datenbank.
+HISTORY_PROJECTION = {"_id": 1, "job_id": 1, "url": 1, "status": 1, "opportunity_analysis.classification": 1, "created_at": 1, "finished_at": 1}
+
+def _encode_history_cursor(job: dict) -> str:
+    position = {"created_at": job["created_at"].isoformat(), "id": str(job["_id"])}
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+def _decode_history_cursor(cursor: str) -> tuple[datetime, ObjectId]:
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(position["created_at"]), ObjectId(position["id"])
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError, TypeError, KeyError, ValueError, InvalidId):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+@router.get("/history", response_model=JobHistoryPage)
+async def get_analysis_history(
+    limit: int = Query(settings.HISTORY_PAGE_SIZE, ge=1, le=settings.HISTORY_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: User = Depends(get_current_user)
+) -> Any:
+    """
+    Gibt die Analyse-Historie des eingeloggten Benutzers seitenweise zurück, neueste zuerst.
+    Jede Seite setzt per Keyset (created_at, _id) hinter dem letzten Job der vorherigen Seite an,
+    statt Jobs zu überspringen; so bleibt jede Seite ein kurzer Scan über den Index user_created_at_id.
+    """
+    query: dict = {"user_id": str(current_user.id)}
+    if cursor:
+        created_at, job_object_id = _decode_history_cursor(cursor)
+        query["$or"] = [{"created_at": {"$lt": created_at}}, {"created_at": created_at, "_id": {"$lt": job_object_id}}]
+
+    # Ein Job mehr als angefordert zeigt an, ob es eine weitere Seite gibt.
+    jobs = await database.get_collection(AnalysisJob).find(query, HISTORY_PROJECTION).sort(
+        [("created_at", -1), ("_id", -1)]
+    ).limit(limit + 1).to_list(length=limit + 1)
+    has_more = len(jobs) > limit
+    jobs = jobs[:limit]
+
+    items = [{
+        "id": str(job["_id"]),
+        "job_id": job["job_id"],
+        "url": job["url"],
+        "status": job["status"],
+        "classification": (job.get("opportunity_analysis") or {}).get("classification"),
+        "created_at": job["created_at"],
+        "finished_at": job.get("finished_at"),
+    } for job in jobs]
+    return {"items": items, "next_cursor": _encode_history_cursor(jobs[-1]) if has_more else None}
 
 
 @router.get("/check")
@@ -133,9 +185,10 @@ async def delete_analysis(job_id: str, current_user: User = Depends(get_current_
 
 # NEU: Endpunkt, um eine Analyse erneut zu starten
 @router.post("/{job_id}/rerun", response_model=JobResponse, status_code=202, summary="Rerun an Analysis Job")
-async def rerun_analysis(job_id: str, current_user: User = Depends(get_current_user)):
+async def rerun_analysis(job_id: str, bypass_llm_cache: bool = False, current_user: User = Depends(get_current_user)):
     """
     Findet einen alten Analyse-Job und startet einen neuen Job mit der gleichen URL und den gleichen Notizen.
+    Mit ?bypass_llm_cache=true werden gecachte KI-Antworten ignoriert und frisch erzeugt.
     """
     # Finde den alten Job, um die Daten zu kopieren
     old_job = await AnalysisJob.find_one(AnalysisJob.job_id == job_id, AnalysisJob.user_id == str(current_user.id))
@@ -150,7 +203,8 @@ async def rerun_analysis(job_id: str, current_user: User = Depends(get_current_u
         job_id=new_job_id,
         status="pending",
         notes=old_job.notes, # Übernehme die alten Notizen
-        user_id=str(current_user.id)
+        user_id=str(current_user.id),
+        bypass_llm_cache=bypass_llm_cache
     )
     await analysis_job.insert()
     
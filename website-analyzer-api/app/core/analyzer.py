@@ -1,9 +1,10 @@
 # app/core/analyzer.py
 import json
-import re
-from typing import Any, Dict, List, Optional
-import google.generativeai as genai
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
+from app.core import llm_client
+from app.core.json_stream import TopLevelJsonParser, extract_json_object
+from app.core.payload_builder import FinalPayload
 from app.core.config import settings
 
 def _log_llm_error(url: str, prompt: str, raw_response: str, error_type: str, details: str):
@@ -19,13 +20,14 @@ def _log_llm_error(url: str, prompt: str, raw_response: str, error_type: str, de
         f.write("="*80 + "\n\n")
 
 def _extract_json_from_text(text: str) -> Optional[str]:
-    match = re.search(r'\{.*\}', text, re.DOTALL)
-    if match:
-        return match.group(0)
-    return None
+    return extract_json_object(text)
 
-def parse_with_llm(html_content: str, url: str) -> Dict[str, Any]:
-    if not settings.DEIN_GOOGLE_API_KEY or "IHR_GOOGLE_API_KEY" in settings.DEIN_GOOGLE_API_KEY:
+def _has_json_object(text: str) -> bool:
+    """Nur Antworten mit verwertbarem JSON werden im LLM-Cache abgelegt."""
+    return _extract_json_from_text(text) is not None
+
+async def parse_with_llm(html_content: str, url: str, use_cache: bool = True) -> Dict[str, Any]:
+    if not llm_client.is_configured():
         return {"url": url, "parsing_error": "API Key not configured."}
     
     # KORREKTUR: Greift auf den Prompt aus dem settings-Objekt zu
@@ -33,10 +35,7 @@ def parse_with_llm(html_content: str, url: str) -> Dict[str, Any]:
     raw_response_text = ""
     
     try:
-        genai.configure(api_key=settings.DEIN_GOOGLE_API_KEY)
-        model = genai.GenerativeModel('gemini-1.5-flash-latest')
-        response = model.generate_content(prompt)
-        raw_response_text = response.text
+        raw_response_text = await llm_client.generate(prompt, template=settings.LLM_PARSER_PROMPT, use_cache=use_cache, is_valid=_has_json_object)
         
         json_string = _extract_json_from_text(raw_response_text)
         
@@ -53,25 +52,48 @@ def parse_with_llm(html_content: str, url: str) -> Dict[str, Any]:
         _log_llm_error(url, prompt, raw_response_text, "Unexpected Error", error_message)
         return {"url": url, "parsing_error": error_message, "raw_llm_response": raw_response_text}
 
-def analyze_messaging(structured_data: dict) -> str:
-    if not settings.DEIN_GOOGLE_API_KEY or "IHR_GOOGLE_API_KEY" in settings.DEIN_GOOGLE_API_KEY:
+async def summarize_section(section_name: str, payload: FinalPayload, use_cache: bool = True) -> Optional[Dict[str, Any]]:
+    """Map-Schritt für große Websites: verdichtet eine Seitengruppe zu einem Digest. None bei Fehlern."""
+    prompt = settings.SECTION_DIGEST_PROMPT.format(section_name=section_name, pages_json_data=payload.text)
+    raw_response_text = ""
+    try:
+        raw_response_text = await llm_client.generate(prompt, template=settings.SECTION_DIGEST_PROMPT, use_cache=use_cache, is_valid=_has_json_object)
+        json_string = _extract_json_from_text(raw_response_text)
+        if not json_string:
+            _log_llm_error(f"DIGEST {section_name}", prompt, raw_response_text, "No JSON Found", "Verdichtung hat kein valides JSON-Objekt zurückgegeben.")
+            return None
+        digest = json.loads(json_string)
+        return digest if isinstance(digest, dict) else None
+    except Exception as e:
+        _log_llm_error(f"DIGEST {section_name}", prompt, raw_response_text, "Unexpected Error", f"Unerwarteter Fehler in summarize_section: {e}")
+        return None
+
+async def analyze_messaging(payload: FinalPayload, use_cache: bool = True, on_section: Optional[Callable[[str, Any], Awaitable[None]]] = None) -> str:
+    """
+    Finale Analyse auf Basis der von payload_builder.build_final_payload vorbereiteten Daten.
+    Die Antwort wird gestreamt: on_section bekommt jedes Top-Level-Feld (opportunity_analysis,
+    detailed_analysis, ...), sobald es vollständig angekommen ist, lange vor dem Ende der Antwort.
+    """
+    if not llm_client.is_configured():
         return json.dumps({"error": "API Key nicht konfiguriert."})
 
-    if not structured_data.get("seiten_inhalte") and not structured_data.get("parsing_fehlschlaege"):
+    if not any(payload.data.get(key) for key in ("seiten_inhalte", "abschnitts_zusammenfassungen", "parsing_fehlschlaege")):
         return json.dumps({"error": "Keine Daten zum Analysieren vorhanden."})
         
-    data_as_json_string = json.dumps(structured_data, indent=2, ensure_ascii=False)
     # KORREKTUR: Greift auf den Prompt aus dem settings-Objekt zu
-    prompt = settings.FINAL_ANALYZER_PROMPT.format(structured_website_data=data_as_json_string)
+    prompt = settings.FINAL_ANALYZER_PROMPT.format(structured_website_data=payload.text)
     raw_response_text = ""
+    stream_parser = TopLevelJsonParser()
+
+    async def handle_chunk(chunk: str) -> None:
+        for key, value in stream_parser.feed(chunk):
+            if on_section is not None:
+                await on_section(key, value)
 
     try:
-        genai.configure(api_key=settings.DEIN_GOOGLE_API_KEY)
-        model = genai.GenerativeModel('gemini-1.5-flash-latest')
-        response = model.generate_content(prompt)
-        raw_response_text = response.text
+        raw_response_text = await llm_client.generate_stream(prompt, handle_chunk, template=settings.FINAL_ANALYZER_PROMPT, use_cache=use_cache, is_valid=_has_json_object)
         
-        cleaned_response = _extract_json_from_text(raw_response_text)
+        cleaned_response = stream_parser.text
 
         if not cleaned_response:
              _log_llm_error("FINALE_ANALYSE", prompt, raw_response_text, "No JSON Found", "Konnte kein valides JSON-Objekt in der finalen Analyse-Antwort finden.")
@@ -1,5 +1,7 @@
 # app/core/config.py
 
+from typing import Dict
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -21,11 +23,95 @@ class Settings(BaseSettings):
     # --- Feste Anwendungs-Konfigurationen ---
     CRAWLER_USER_AGENT: str = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/125.0.0.0 Safari/537.36'
     REQUEST_TIMEOUT: int = 10
+    HTTP_CONNECT_TIMEOUT: float = 5.0
+    HTTP_READ_TIMEOUT: float = 10.0
+    HTTP_MAX_CONNECTIONS: int = 50
+    HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    HTTP_KEEPALIVE_EXPIRY: float = 30.0
+    HTTP_ENABLE_HTTP2: bool = True
+
+    # Pool pro Prozess und Event-Loop: (uvicorn-Worker + Celery-Prozesse) × MONGO_MAX_POOL_SIZE
+    # muss unter dem Verbindungslimit von MongoDB bleiben.
+    MONGO_PORT: int = 27017
+    MONGO_DB_NAME: str = "website_analyzer_db"
+    MONGO_MAX_POOL_SIZE: int = 20
+    MONGO_MIN_POOL_SIZE: int = 0
+    MONGO_MAX_IDLE_TIME_MS: int = 60_000  # Ungenutzte Verbindungen danach schließen
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5_000
+    MONGO_CONNECT_TIMEOUT_MS: int = 5_000
+    MONGO_CONNECT_RETRIES: int = 5
+    MONGO_CONNECT_RETRY_DELAY: float = 1.0  # Verdoppelt sich mit jedem Versuch
+    MONGO_HEALTH_TIMEOUT: float = 2.0
+    DB_INDEX_CHECK_ON_STARTUP: bool = True
+    # Aufbewahrung abgeschlossener Jobs pro Endstatus in Stunden (TTL-Index auf expires_at).
+    # Nicht aufgeführte Status werden unbegrenzt behalten; ältere Jobs ohne expires_at trägt der System-Manager nach.
+    JOB_RETENTION_HOURS: Dict[str, int] = {"failed": 24}
+    STUCK_JOB_TIMEOUT_MINUTES: int = 5
+    SYSTEM_MANAGER_BATCH_SIZE: int = 100  # Hängende Jobs pro Lauf
+    HISTORY_PAGE_SIZE: int = 20  # Jobs pro Seite in /history, ohne limit-Parameter
+    HISTORY_MAX_PAGE_SIZE: int = 100
+
+    REDIS_CACHE_DB: int = 1
+    REDIS_SOCKET_TIMEOUT: float = 2.0
+    HTTP_CACHE_ENABLED: bool = True
+    HTTP_CACHE_MAX_AGE_SECONDS: int = 6 * 60 * 60
+    HTTP_CACHE_RETENTION_SECONDS: int = 7 * 24 * 60 * 60
+    HTTP_CACHE_MAX_BYTES: int = 512 * 1024 * 1024
+    HTTP_CACHE_MAX_ENTRY_BYTES: int = 5 * 1024 * 1024
+
+    ROBOTS_FETCH_TIMEOUT: float = 5.0
+    ROBOTS_CACHE_TTL_SECONDS: int = 24 * 60 * 60
+    ROBOTS_NEGATIVE_CACHE_TTL_SECONDS: int = 60 * 60
+    ROBOTS_MAX_CRAWL_DELAY: float = 5.0
     MAX_PAGES_TO_CRAWL: int = 50
+    CRAWLER_MAX_CONCURRENCY: int = 10
+    CRAWLER_MAX_CONCURRENCY_PER_HOST: int = 4
+    URL_CANONICALIZER_CACHE_SIZE: int = 50_000
+    CRAWLER_FRONTIER_MEMORY_LIMIT: int = 10_000  # Wartende URLs im Speicher, der Rest wird ausgelagert
+    CRAWLER_FRONTIER_MAX_SIZE: int = 1_000_000
+    # Was mit URLs aus Collections passiert, die COLLECTION_THRESHOLD überschritten haben:
+    # "defer" lädt sie nur mit übrigem Budget, "drop" verwirft sie sofort.
+    CRAWLER_COLLECTION_OVERFLOW: str = "defer"
+    SITEMAP_DISCOVERY_ENABLED: bool = True
+    SITEMAP_FETCH_TIMEOUT: float = 10.0
+    SITEMAP_MAX_FILES: int = 10
+    SITEMAP_MAX_URLS: int = 50_000
+    SITEMAP_MAX_BYTES: int = 50 * 1024 * 1024  # Pro Datei, entpackt (Obergrenze laut sitemaps.org)
+    PAGE_STORE_MEMORY_LIMIT_BYTES: int = 64 * 1024 * 1024
+    PAGE_STORE_DISK_LIMIT_BYTES: int = 512 * 1024 * 1024
     
-    CONFIDENCE_THRESHOLD: int = 60
+    PARSER_BACKEND: str = "lxml"  # "lxml" (schnell) oder "html.parser" (Referenz); Abweichungen bei fehlerhaftem HTML: siehe parser.py
+
+    LLM_MODEL_NAME: str = "gemini-1.5-flash-latest"
+    LLM_MAX_CONCURRENCY: int = 4  # Gleichzeitige LLM-Aufrufe pro Worker-Prozess
+    LLM_REQUESTS_PER_MINUTE: int = 15  # Gemeinsames Limit aller Worker (Token-Bucket in Redis)
+    LLM_TOKENS_PER_MINUTE: int = 1_000_000
+    LLM_OUTPUT_TOKEN_RESERVE: int = 2_000  # Wird pro Request zusätzlich zum Prompt vom Token-Bucket abgezogen
+    LLM_RATE_LIMIT_MAX_WAIT: float = 300.0
+    LLM_REQUEST_TIMEOUT: float = 180.0
+    LLM_MAX_RETRIES: int = 4
+    LLM_RETRY_BASE_DELAY: float = 2.0
+    LLM_CACHE_ENABLED: bool = True
+    LLM_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    LLM_CACHE_TTL_SECONDS: int = 30 * 24 * 60 * 60
+    FINAL_ANALYSIS_PAYLOAD_TOKEN_BUDGET: int = 120_000  # Geschätzte Tokens der Website-Daten im finalen Prompt
+    DEDUP_ENABLED: bool = True
+    DEDUP_MIN_BLOCK_CHARS: int = 80  # Kürzere Blöcke sind kaum länger als der Verweis und bleiben stehen
+    DEDUP_SIMILARITY_THRESHOLD: float = 0.8  # Geschätzte Jaccard-Ähnlichkeit der Wort-Shingles
+    CLASSIFIER_BATCH_SIZE: int = 25  # Seiten pro LLM-Request im Klassifizierungs-Schritt
+    CLASSIFIER_MIN_CONTENT_CHARS: int = 150  # Darunter gilt eine Seite ohne LLM als 'Hard_to_read'
+    MAP_REDUCE_ENABLED: bool = True
+    MAP_REDUCE_THRESHOLD_TOKENS: int = 60_000  # Ab dieser (ungekürzten) Payload-Größe wird erst pro Seitengruppe verdichtet
+    MAP_REDUCE_GROUP_TOKEN_BUDGET: int = 30_000  # Maximale Seitendaten pro Verdichtungs-Aufruf
+
+    CONFIDENCE_THRESHOLD: int = 60  # Seiten darunter werden zusätzlich vom LLM-Parser geparst
+    LLM_PARSE_ENABLED: bool = True
+    LLM_PARSE_MAX_CONCURRENCY: int = 3  # Gleichzeitige LLM-Parse-Aufrufe pro Analyse-Job
+    LLM_PARSE_TIMEOUT: float = 240.0  # Pro Seite, inklusive Warten auf das Rate-Limit
     COLLECTION_SAMPLE_SIZE: int = 3
     COLLECTION_THRESHOLD: int = 5
+    PAGE_SELECTION_STRATEGY: str = "diverse"  # "diverse" (möglichst unterschiedliche Seiten) oder "central" (typischste Seite je Cluster)
+    PAGE_SELECTION_SEED: int = 0
 
     SCORER_SEMANTIC_RATIO_THRESHOLD_BAD: float = 0.1
     SCORER_SEMANTIC_RATIO_PENALTY_BAD: int = 50
@@ -75,6 +161,26 @@ class Settings(BaseSettings):
 
 {page_json_data}
 
+"""
+
+    PAGE_CLASSIFIER_BATCH_PROMPT: str = """
+**Rolle:** Du bist ein hocheffizienter Website-Analyst. Deine einzige Aufgabe ist es, den Zweck mehrerer Webseiten basierend auf ihren Metadaten und Überschriften schnell zu klassifizieren.
+
+**Kontext:** Du erhältst ein JSON-Array. Jedes Element beschreibt eine einzelne Webseite und enthält ihre `url`.
+
+**Aufgabe:** Ordne JEDER Seite genau eine der folgenden Kategorien zu:
+
+* `Core_Messaging`: Die Seite beschreibt direkt das Kernangebot: das Produkt, die Dienstleistung, die Preise, die Lösung oder die primäre Zielgruppe (z.B. Homepage, Produktseite, Preisseite, Lösungsseite).
+* `Supporting_Content`: Die Seite liefert unterstützenden Inhalt, der Vertrauen oder Interesse am Kernangebot schafft (z.B. Blogartikel, Über uns, Case Study, Anwendungsbeispiele).
+* `Boilerplate`: Die Seite enthält standardisierte, rechtliche oder administrative Informationen, die nicht direkt zum Kernangebot gehören (z.B. Impressum, Kontakt, Datenschutz, AGB, Cookie-Richtlinien, Login).
+* `Hard_to_read`: Die Seite hat zu wenig oder zu unklaren Inhalt, um sie einer Kategorie zuzuordnen.
+
+**Antwortformat:** Gib AUSSCHLIESSLICH ein JSON-Array zurück, ohne Erklärungen und ohne Markdown, mit genau einem Eintrag pro Seite in derselben Reihenfolge:
+[{{"url": "<url der Seite>", "category": "<Kategorie>"}}]
+
+**Hier sind die Seitendaten:**
+
+{pages_json_data}
 """
 
 
@@ -117,6 +223,10 @@ After the detailed analysis, check for the following exclusion criteria.
 
 Analyze `{structured_website_data}` and generate a **single, valid JSON object**. All text must be in German.
 
+Note on the data: content blocks that repeat (almost) verbatim across pages, such as CTAs, testimonials or trust badges, appear in full only once. Every repetition is replaced by `{{"type": "duplicate", "ref": "<url>#<section index>[<block index>]"}}` pointing to the first occurrence, which is always contained in the data (section index = position in `content_structure`, counted from 0; "intro" stands for the intro content). Treat such a block as that same content repeated at this position, e.g. when judging consistency or repetition of messaging.
+
+For large websites the data contains `abschnitts_zusammenfassungen` instead of (or in addition to) `seiten_inhalte`: one digest per group of pages (`section`, `category`, `pages`), written by a previous analysis step. Base your analysis on these digests as if you had read the pages yourself. Their `evidence_quotes` are verbatim quotes from the pages and can be used as `evidence_quote`.
+
 ```json
 {{
   "opportunity_analysis": {{
@@ -284,6 +394,33 @@ Hier ist der rohe HTML-Code:
 Finale Anweisung: Deine Antwort darf AUSSCHLIESSLICH das oben definierte, valide JSON-Objekt enthalten. Beginne direkt mit {{ und ende mit }}. Füge unter gar keinen Umständen Erklärungen, Notizen, Entschuldigungen oder einleitende Sätze wie "Hier ist das JSON:" hinzu. Deine Antwort muss direkt von einem JSON-Parser verarbeitet werden können.
 """
 
+
+  # 6. Prompt für die VERDICHTUNG einer Seitengruppe (Map-Schritt großer Websites).
+  #    Das Ergebnis ersetzt die Seiteninhalte im FINAL_ANALYZER_PROMPT.
+  #    Die Platzhalter {section_name} und {pages_json_data} werden automatisch ersetzt.
+    SECTION_DIGEST_PROMPT: str = """
+You are a senior positioning analyst preparing material for a strategist. **You write in German.** You receive the parsed content of one group of pages of a larger website: `{section_name}`. The strategist will later judge the whole website along the "Clarity Scorecard 3.0" (value proposition, target audience and "Champion", benefit credibility, positioning angle, website architecture, language clarity and buzzword density, trust signals) and will only see your digest, not the pages.
+
+Content blocks of the form `{{"type": "duplicate", "ref": "..."}}` repeat a block that appeared earlier in this group of pages.
+
+Produce a **single, valid JSON object** and nothing else (no markdown, no explanation):
+
+{{
+  "value_proposition": "How these pages describe the core offer and its benefit, in 1-3 sentences.",
+  "target_audience": "Who is addressed (roles, industries, company sizes), or null.",
+  "key_messages": ["Up to 5 central claims or messages of this group."],
+  "evidence_quotes": ["Up to 6 short, VERBATIM quotes that best show the strengths and weaknesses of the messaging (including buzzwords)."],
+  "trust_signals": ["Case studies, testimonials, customer names, numbers, methodology; empty list if none."],
+  "structure_notes": "How the pages are organized and whether they tell a coherent story (e.g. problem-agitate-solve), in 1-2 sentences.",
+  "language_notes": "Clarity of the language and buzzword density, in 1-2 sentences."
+}}
+
+Do not invent information. If something is not in the data, use null or an empty list.
+
+The page data:
+{pages_json_data}
+"""
+
     class Config:
         env_file = ".env"
         env_file_encoding = 'utf-8'
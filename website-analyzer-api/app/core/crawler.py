@@ -1,21 +1,50 @@
 # app/core/crawler.py
-import requests
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-from urllib.robotparser import RobotFileParser
+import asyncio
+from bs4 import BeautifulSoup, SoupStrainer
+from urllib.parse import urlparse
 from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List
 
 # KORREKTUR: Wir importieren NUR noch das 'settings'-Objekt.
 from app.core.config import settings
+from app.core import http_cache, http_client, redis_client, robots, sitemap, url_canonicalizer
+from app.core.frontier import CrawlFrontier, UrlFingerprintSet
+from app.core.page_store import PageStore, StoredPage
+
+@dataclass
+class CrawlResult:
+    """
+    Ergebnis eines Crawls. fetched_urls enthält nur Seiten, die innerhalb des Budgets tatsächlich
+    als HTML geladen wurden; entdeckte, aber nie geladene URLs werden nur gezählt.
+    """
+    fetched_urls: List[str] = field(default_factory=list)
+    link_map: Dict[str, List[str]] = field(default_factory=dict)
+    external_links: List[str] = field(default_factory=list)
+    discovered_count: int = 0
+    dropped_count: int = 0
+    sitemap_url_count: int = 0
+    # Geladene Seiten gruppiert nach get_collection_key() und pro Collection zurückgestellte URLs
+    collections: Dict[str, List[str]] = field(default_factory=dict)
+    collection_overflow: Dict[str, int] = field(default_factory=dict)
+
+ROOT_COLLECTION = 'root'
+
+def get_collection_key(url: str) -> str:
+    """
+    Ordnet eine URL ihrer Collection zu: dem ersten Pfadsegment, wenn darunter weitere (nicht
+    numerische) Seiten liegen, z.B. 'blog' für /blog/mein-artikel. Alles andere gehört zu 'root'.
+    """
+    path_parts = urlparse(url).path.strip('/').split('/')
+    if len(path_parts) > 1 and not path_parts[1].isdigit():
+        return path_parts[0]
+    return ROOT_COLLECTION
 
 def get_base_domain(url: str) -> str:
-    """Extrahiert die Basis-Domain (z.B. 'google.com') aus einer URL."""
+    """Extrahiert die registrierbare Domain (z.B. 'google.com' oder 'example.co.uk') aus einer URL."""
     try:
-        parsed_url = urlparse(url)
-        domain_parts = parsed_url.netloc.split('.')
-        if len(domain_parts) >= 2:
-            return f"{domain_parts[-2]}.{domain_parts[-1]}"
-        return parsed_url.netloc
+        hostname = urlparse(url).hostname
+        return url_canonicalizer.registrable_domain(hostname) if hostname else ""
     except (ValueError, AttributeError):
         return ""
 
@@ -25,82 +54,207 @@ def normalize_url(url: str) -> str:
         return url[:-1]
     return url
 
-def get_url_list_and_map(start_url: str, max_pages: int = None) -> tuple[list[str], dict[str, list[str]], list[str]]:
-    """Durchsucht eine Website, um eine Liste interner URLs und eine Link-Map zu erstellen."""
-    try:
-        base_domain = get_base_domain(start_url)
-        scheme = urlparse(start_url).scheme
-        if not base_domain:
-            return [], {}, []
-    except (ValueError, AttributeError):
-        return [], {}, []
+_LINK_STRAINER = SoupStrainer('a', href=True)
 
-    robots_url = f"{scheme}://{urlparse(start_url).netloc}/robots.txt"
-    robot_parser = RobotFileParser()
-    robot_parser.set_url(robots_url)
-    try:
-        robot_parser.read()
-    except Exception as e:
-        print(f"Konnte robots.txt nicht lesen: {e}")
+def _extract_links(html_content: bytes, page_url: str) -> list[url_canonicalizer.CanonicalUrl]:
+    """
+    Liefert alle kanonisierten http(s)-Links einer Seite in Dokument-Reihenfolge.
+    page_url muss die tatsächlich geladene URL (nach Redirects) sein, da relative Links dagegen aufgelöst werden.
+    """
+    soup = BeautifulSoup(html_content, 'html.parser', parse_only=_LINK_STRAINER)
+    links = []
+    for link_tag in soup.find_all('a', href=True):
+        link = url_canonicalizer.canonicalize(link_tag['href'], page_url)
+        if link is not None:
+            links.append(link)
+    return links
+
+async def _fetch_page(url: str, host_limits: http_client.HostLimits, page_store: PageStore | None = None, timings: http_client.RequestTimings | None = None, crawl_delay: float = 0.0) -> tuple[bytes, str] | None:
+    """
+    Lädt eine einzelne Seite unter Einhaltung des globalen und des Host-Limits sowie des Crawl-delays.
+    Gibt (HTML-Body, finale URL) zurück oder None, wenn die Seite kein verwertbares HTML liefert.
+    Ist ein PageStore übergeben, wird jede erhaltene Antwort dort für den Parse-Schritt abgelegt;
+    den Body behalten nur HTML-Antworten, PDFs, Bilder usw. werden nur mit Status vermerkt.
+    """
+    async with host_limits.slot(url, crawl_delay):
+        response = await http_cache.fetch(url, timings=timings)
+    is_html = 'text/html' in response.headers.get('Content-Type', '')
+    if page_store is not None:
+        page_store.put(StoredPage(
+            url=url,
+            final_url=str(response.url),
+            status_code=response.status_code,
+            content_type=response.headers.get('Content-Type', ''),
+            headers=dict(response.headers),
+            # Nicht-HTML wird nie geparst und soll den Speicher der HTML-Seiten nicht belegen.
+            body=response.content if is_html else None,
+            encoding=response.charset_encoding
+        ))
+    response.raise_for_status()
+    if not is_html:
+        return None
+    return response.content, str(response.url)
+
+async def async_get_url_list_and_map(start_url: str, max_pages: int = None, page_store: PageStore | None = None) -> CrawlResult:
+    """
+    Asynchrone Crawl-Engine: Durchsucht eine Website, um eine Liste interner URLs und eine Link-Map zu erstellen.
+
+    Mehrere Seiten werden gleichzeitig geladen (begrenzt durch CRAWLER_MAX_CONCURRENCY und
+    CRAWLER_MAX_CONCURRENCY_PER_HOST). Die Ergebnisse werden aber strikt in der Reihenfolge
+    verarbeitet, in der die Seiten aus der Warteschlange genommen wurden. Dadurch bleibt die
+    Breitensuche und damit die Auswahl der Seiten innerhalb von MAX_PAGES_TO_CRAWL identisch
+    zum sequenziellen Crawling.
+
+    Pro Collection (siehe get_collection_key) werden höchstens COLLECTION_THRESHOLD + 1 Seiten
+    regulär geladen; das reicht, um die Collection als solche zu erkennen und daraus zu samplen.
+    Weitere URLs dieser Collection werden je nach CRAWLER_COLLECTION_OVERFLOW zurückgestellt
+    oder verworfen, damit das Budget in andere Bereiche der Website fließt. 'root' ist davon
+    ausgenommen, da dort die Einstiegsseiten der Bereiche liegen.
+
+    Vor dem ersten Seitenabruf werden die Sitemaps der Website gelesen (SITEMAP_DISCOVERY_ENABLED).
+    Die dort gefundenen URLs stehen direkt hinter der Startseite in der Warteschlange, flache Pfade
+    zuerst, sodass die Bereiche der Website ohne vorheriges Laden vieler HTML-Seiten bekannt sind.
+
+    Bekannte URLs werden nur als Fingerprints gehalten und die Warteschlange lagert große
+    Mengen auf die Platte aus (siehe CrawlFrontier), damit große Websites den Worker nicht füllen.
+
+    Wird ein PageStore übergeben, landen alle geladenen HTML-Antworten darin, sodass der
+    Parse-Schritt die Seiten nicht erneut herunterladen muss.
+    """
+    canonical_start = url_canonicalizer.canonicalize(start_url)
+    if canonical_start is None or not canonical_start.site:
+        return CrawlResult()
+    base_domain = canonical_start.site
 
-    normalized_start_url = normalize_url(start_url)
-    urls_to_visit = deque([normalized_start_url])
-    visited_urls = {normalized_start_url}
+    # robots.txt-Regeln pro Origin, einmal pro Job aus dem gemeinsamen Robots-Cache geladen.
+    robots_policies: dict[str, robots.RobotsPolicy] = {}
+
+    normalized_start_url = canonical_start.url
+    urls_to_visit = CrawlFrontier()
+    urls_to_visit.push(normalized_start_url)
+    # Zurückgestellte URLs übervoller Collections, nur geladen wenn urls_to_visit leer ist.
+    overflow_urls = CrawlFrontier()
+    collection_counts: dict[str, int] = {}
+    collection_overflow: dict[str, int] = {}
+    collection_limit = settings.COLLECTION_THRESHOLD + 1
+    seen_urls = UrlFingerprintSet()
+    seen_urls.add(normalized_start_url)
+    fetched_urls = []
     external_links = set()
     link_map = {}
     page_count = 0
-    
+
     # KORREKTUR: Greift jetzt auf die Variable aus dem settings-Objekt zu
     crawl_limit = max_pages if max_pages is not None else settings.MAX_PAGES_TO_CRAWL
 
-    while urls_to_visit and page_count < crawl_limit:
-        current_url = urls_to_visit.popleft()
+    # Gilt für Sitemaps und Seiten gleichermaßen, damit auch die Sitemap-Discovery den Crawl-delay einhält.
+    host_limits = http_client.HostLimits()
+    timings = http_client.RequestTimings()
 
-        if not robot_parser.can_fetch(settings.CRAWLER_USER_AGENT, current_url):
-            continue
+    sitemap_urls = []
+    if settings.SITEMAP_DISCOVERY_ENABLED and crawl_limit > 1:
+        start_policy = await robots.get_policy(normalized_start_url)
+        robots_policies[start_policy.origin] = start_policy
+        sitemap_urls = await sitemap.discover_urls(start_policy, base_domain, timings, host_limits)
+        # sorted() ist stabil: innerhalb derselben Tiefe bleibt die Reihenfolge der Sitemap erhalten.
+        for sitemap_url in sorted(sitemap_urls, key=lambda url: urlparse(url).path.count('/')):
+            if seen_urls.add(sitemap_url):
+                urls_to_visit.push(sitemap_url)
+    # Laufende Downloads in Entnahme-Reihenfolge: (url, task)
+    in_flight: deque[tuple[str, asyncio.Task | None]] = deque()
 
-        page_count += 1
-        link_map[current_url] = []
+    try:
+        while urls_to_visit or overflow_urls or in_flight:
+            # Alle bekannten URLs bis zum Budget sofort einplanen; die Semaphoren begrenzen die Parallelität.
+            # Zurückgestellte URLs kommen erst dran, wenn keine Seite mehr läuft, die neue Bereiche liefern kann.
+            frontier = urls_to_visit if urls_to_visit or in_flight else overflow_urls
+            while frontier and page_count < crawl_limit:
+                current_url = frontier.pop()
 
-        if crawl_limit == 1 and page_count == 1:
-            pass
-        else:
-            try:
-                # KORREKTUR: Greift jetzt auf die Variablen aus dem settings-Objekt zu
-                response = requests.get(
-                    current_url, 
-                    headers={'User-Agent': settings.CRAWLER_USER_AGENT}, 
-                    timeout=settings.REQUEST_TIMEOUT
-                )
-                response.raise_for_status()
-
-                if 'text/html' not in response.headers.get('Content-Type', ''):
+                collection_key = get_collection_key(current_url)
+                if frontier is urls_to_visit and collection_key != ROOT_COLLECTION and collection_counts.get(collection_key, 0) >= collection_limit:
+                    collection_overflow[collection_key] = collection_overflow.get(collection_key, 0) + 1
+                    if settings.CRAWLER_COLLECTION_OVERFLOW == "defer":
+                        overflow_urls.push(current_url)
                     continue
 
-                soup = BeautifulSoup(response.content, 'html.parser')
+                origin = robots.get_origin(current_url)
+                if origin not in robots_policies:
+                    robots_policies[origin] = await robots.get_policy(current_url)
+                policy = robots_policies[origin]
+                if not policy.can_fetch(current_url):
+                    continue
 
-                for link_tag in soup.find_all('a', href=True):
-                    href = link_tag['href']
-                    absolute_url = urljoin(current_url, href)
-                    
-                    cleaned_url = urlparse(absolute_url)._replace(query="", fragment="").geturl()
-                    normalized_cleaned_url = normalize_url(cleaned_url)
+                page_count += 1
+                collection_counts[collection_key] = collection_counts.get(collection_key, 0) + 1
+                link_map[current_url] = []
 
-                    if not normalized_cleaned_url or urlparse(normalized_cleaned_url).scheme not in ['http', 'https']:
-                        continue
-                    
-                    link_map[current_url].append(normalized_cleaned_url)
+                if crawl_limit == 1 and page_count == 1:
+                    in_flight.append((current_url, None))
+                else:
+                    task = asyncio.create_task(_fetch_page(current_url, host_limits, page_store, timings, policy.crawl_delay))
+                    in_flight.append((current_url, task))
 
-                    link_domain = get_base_domain(normalized_cleaned_url)
-                    is_internal = link_domain == base_domain
+            if not in_flight:
+                break
 
-                    if is_internal:
-                        if normalized_cleaned_url not in visited_urls:
-                            visited_urls.add(normalized_cleaned_url)
-                            urls_to_visit.append(normalized_cleaned_url)
+            # Immer auf die älteste Seite warten, damit neue Links in BFS-Reihenfolge eingereiht werden.
+            current_url, task = in_flight.popleft()
+            if task is None:
+                # Budget von einer Seite: Die Startseite wird erst im Parse-Schritt geladen.
+                fetched_urls.append(current_url)
+                continue
+            try:
+                fetched = await task
+                if fetched is None:
+                    continue
+                fetched_urls.append(current_url)
+                html_content, final_url = fetched
+
+                for link in _extract_links(html_content, final_url):
+                    normalized_cleaned_url = link.url
+                    link_map[current_url].append(normalized_cleaned_url)
+
+                    if link.site == base_domain:
+                        # Ist das Budget ausgeschöpft, wird die URL nur noch als entdeckt gezählt.
+                        if seen_urls.add(normalized_cleaned_url) and page_count < crawl_limit:
+                            urls_to_visit.push(normalized_cleaned_url)
                     else:
                         external_links.add(normalized_cleaned_url)
             except Exception as e:
                 print(f"Fehler beim Crawlen von {current_url}: {e}")
+    finally:
+        for _, task in in_flight:
+            if task is not None:
+                task.cancel()
+        dropped_count = urls_to_visit.dropped + overflow_urls.dropped
+        urls_to_visit.close()
+        overflow_urls.close()
+        timings.log_summary("Crawling")
+
+    print(f"Crawling: {len(fetched_urls)} Seiten geladen, {len(seen_urls)} interne URLs entdeckt, {dropped_count} wegen voller Frontier verworfen.")
+    for collection_key, count in collection_overflow.items():
+        print(f"    -> Collection '{collection_key}' hat das Limit erreicht: {count} URLs zurückgestellt.")
+    collections: dict[str, list[str]] = {}
+    for url in sorted(fetched_urls):
+        collections.setdefault(get_collection_key(url), []).append(url)
+    return CrawlResult(
+        fetched_urls=sorted(fetched_urls),
+        link_map=link_map,
+        external_links=sorted(external_links),
+        discovered_count=len(seen_urls),
+        dropped_count=dropped_count,
+        sitemap_url_count=len(sitemap_urls),
+        collections=collections,
+        collection_overflow=collection_overflow
+    )
 
-    return sorted(list(visited_urls)), link_map, sorted(list(external_links))
\ No newline at end of file
+def get_url_list_and_map(start_url: str, max_pages: int = None) -> CrawlResult:
+    """Synchroner Wrapper um die asynchrone Crawl-Engine für Aufrufer ohne eigenen Event-Loop."""
+    async def _crawl():
+        try:
+            return await async_get_url_list_and_map(start_url, max_pages)
+        finally:
+            await http_client.close_client()
+            await redis_client.close_redis()
+    return asyncio.run(_crawl())
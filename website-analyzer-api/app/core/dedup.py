@@ -0,0 +1,115 @@
+# app/core/dedup.py
+import copy
+import hashlib
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core import similarity
+from app.core.config import settings
+
+_MINHASH_BANDS = 8
+_MINHASH_ROWS = 4
+
+@dataclass
+class DedupStats:
+    blocks_seen: int = 0
+    exact_duplicates: int = 0
+    near_duplicates: int = 0
+    chars_removed: int = 0
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "blocks_seen": self.blocks_seen,
+            "exact_duplicates": self.exact_duplicates,
+            "near_duplicates": self.near_duplicates,
+            "chars_removed": self.chars_removed,
+        }
+
+def _block_text(block: Any) -> Optional[str]:
+    """Vergleichbarer Text eines Blocks; Zwischenüberschriften und bereits ersetzte Blöcke zählen nicht."""
+    if isinstance(block, str):
+        return block
+    if not isinstance(block, dict):
+        return None
+    if block.get("type") == "paragraph":
+        return block.get("text")
+    if block.get("type") == "list":
+        return "\n".join(block.get("items", []))
+    return None
+
+class _BlockIndex:
+    """Merkt sich die erste Fundstelle jedes Blocks, exakt per Hash und unscharf per MinHash/LSH."""
+
+    def __init__(self):
+        self._exact: Dict[str, str] = {}
+        self._signatures: Dict[int, Tuple[int, ...]] = {}
+        self._locations: List[str] = []
+        self._minhasher = similarity.MinHasher(num_perm=_MINHASH_BANDS * _MINHASH_ROWS)
+        self._lsh: similarity.LshIndex[int] = similarity.LshIndex(_MINHASH_BANDS, _MINHASH_ROWS)
+
+    def find_or_add(self, text: str, location: str) -> Tuple[Optional[str], bool]:
+        """Gibt (erste Fundstelle, exakt?) zurück, oder (None, False), wenn der Block neu ist."""
+        normalized = similarity.normalize_text(text)
+        digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+        if digest in self._exact:
+            return self._exact[digest], True
+
+        signature = self._minhasher.signature(similarity.shingles(normalized))
+        for candidate in self._lsh.candidates(signature):
+            if similarity.estimate_jaccard(signature, self._signatures[candidate]) >= settings.DEDUP_SIMILARITY_THRESHOLD:
+                return self._locations[candidate], False
+
+        block_id = len(self._locations)
+        self._locations.append(location)
+        self._signatures[block_id] = signature
+        self._lsh.add(block_id, signature)
+        self._exact[digest] = location
+        return None, False
+
+def deduplicate_pages(pages: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], DedupStats]:
+    """
+    Ersetzt Inhaltsblöcke, die (nahezu) identisch schon früher vorkamen, durch einen Verweis
+    {"type": "duplicate", "ref": "<url>#<abschnitt>[<block>]"} auf die erste Fundstelle. <abschnitt> ist
+    die Position in content_structure (ab 0) bzw. "intro", Überschriften sind nicht eindeutig. Typisch sind
+    CTAs, Testimonials und Trust-Badges, die innerhalb von <main> auf jeder Seite wiederholt werden.
+
+    Verglichen werden intro_content-Absätze sowie Absätze und Listen aus content_structure ab
+    DEDUP_MIN_BLOCK_CHARS Zeichen: exakt über einen Hash des normalisierten Texts und unscharf über
+    MinHash-Signaturen (Jaccard-Schätzung >= DEDUP_SIMILARITY_THRESHOLD). Die Eingabe bleibt unverändert.
+
+    Verweise gelten nur innerhalb genau dieser Seitenliste. Wird danach gekürzt oder umgruppiert,
+    muss neu dedupliziert werden (das übernimmt payload_builder.build_final_payload).
+    """
+    pages = copy.deepcopy(pages)
+    stats = DedupStats()
+    index = _BlockIndex()
+
+    def dedupe(block: Any, location: str) -> Any:
+        text = _block_text(block)
+        if not text or len(text) < settings.DEDUP_MIN_BLOCK_CHARS:
+            return block
+        stats.blocks_seen += 1
+        first_location, exact = index.find_or_add(text, location)
+        if first_location is None:
+            return block
+        if exact:
+            stats.exact_duplicates += 1
+        else:
+            stats.near_duplicates += 1
+        stats.chars_removed += len(text)
+        return {"type": "duplicate", "ref": first_location}
+
+    for page in pages:
+        url = page.get("url", "")
+        intro = page.get("intro_content")
+        if isinstance(intro, list):
+            page["intro_content"] = [
+                dedupe(paragraph, f"{url}#intro[{position}]")
+                for position, paragraph in enumerate(intro)
+            ]
+        for section_index, section in enumerate(page.get("content_structure", [])):
+            section["content_blocks"] = [
+                dedupe(block, f"{url}#{section_index}[{position}]")
+                for position, block in enumerate(section.get("content_blocks", []))
+            ]
+    return pages, stats
@@ -0,0 +1,120 @@
+# app/core/frontier.py
+import hashlib
+import os
+import tempfile
+from collections import deque
+from typing import IO, Optional, Set
+
+from app.core.config import settings
+
+def url_fingerprint(url: str) -> int:
+    """64-Bit-Fingerprint einer (kanonischen) URL. Kollisionen sind bei Crawl-Größen praktisch ausgeschlossen."""
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "big")
+
+class UrlFingerprintSet:
+    """Besucht-Menge, die statt der URL-Strings nur deren 64-Bit-Fingerprints hält."""
+
+    def __init__(self):
+        self._fingerprints: Set[int] = set()
+
+    def __contains__(self, url: str) -> bool:
+        return url_fingerprint(url) in self._fingerprints
+
+    def __len__(self) -> int:
+        return len(self._fingerprints)
+
+    def add(self, url: str) -> bool:
+        """Fügt die URL hinzu. Gibt False zurück, wenn sie bereits bekannt war."""
+        fingerprint = url_fingerprint(url)
+        if fingerprint in self._fingerprints:
+            return False
+        self._fingerprints.add(fingerprint)
+        return True
+
+class CrawlFrontier:
+    """
+    FIFO-Warteschlange der noch zu ladenden URLs mit begrenztem Speicherbedarf.
+
+    Die ersten CRAWLER_FRONTIER_MEMORY_LIMIT Einträge liegen im Speicher. Sobald das Limit
+    erreicht ist, werden neue URLs an eine temporäre Datei angehängt und in derselben Reihenfolge
+    wieder eingelesen, wenn der Speicherteil leer ist. Ab CRAWLER_FRONTIER_MAX_SIZE wartenden
+    Einträgen werden neue URLs verworfen und nur gezählt.
+    """
+
+    def __init__(self, memory_limit: int = None, max_size: int = None):
+        self.memory_limit = memory_limit if memory_limit is not None else settings.CRAWLER_FRONTIER_MEMORY_LIMIT
+        self.max_size = max_size if max_size is not None else settings.CRAWLER_FRONTIER_MAX_SIZE
+        self.dropped = 0
+        self._memory: deque[str] = deque()
+        self._spill_file: Optional[IO[bytes]] = None
+        self._spill_path: Optional[str] = None
+        self._spill_read_offset = 0
+        self._spilled = 0
+
+    def __len__(self) -> int:
+        return len(self._memory) + self._spilled
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __enter__(self) -> "CrawlFrontier":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def push(self, url: str) -> bool:
+        """Reiht eine URL hinten ein. Gibt False zurück, wenn die Frontier voll ist."""
+        if len(self) >= self.max_size:
+            self.dropped += 1
+            return False
+        # Sobald ausgelagert wurde, muss alles Weitere ebenfalls auf die Platte, sonst stimmt die Reihenfolge nicht.
+        if self._spilled or len(self._memory) >= self.memory_limit:
+            self._spill(url)
+        else:
+            self._memory.append(url)
+        return True
+
+    def pop(self) -> str:
+        """Entnimmt die älteste URL. Wirft IndexError, wenn die Frontier leer ist."""
+        if not self._memory and self._spilled:
+            self._refill()
+        return self._memory.popleft()
+
+    def close(self) -> None:
+        """Gibt den Speicher frei und löscht die Auslagerungsdatei."""
+        self._memory.clear()
+        self._spilled = 0
+        if self._spill_file is not None:
+            self._spill_file.close()
+            self._spill_file = None
+        if self._spill_path:
+            try:
+                os.remove(self._spill_path)
+            except OSError:
+                pass
+            self._spill_path = None
+
+    def _spill(self, url: str) -> None:
+        if self._spill_file is None:
+            fd, self._spill_path = tempfile.mkstemp(prefix="crawl_frontier_")
+            self._spill_file = os.fdopen(fd, "w+b")
+        self._spill_file.seek(0, os.SEEK_END)
+        self._spill_file.write(url.encode("utf-8") + b"\n")
+        self._spilled += 1
+
+    def _refill(self) -> None:
+        self._spill_file.flush()
+        self._spill_file.seek(self._spill_read_offset)
+        while self._spilled and len(self._memory) < self.memory_limit:
+            line = self._spill_file.readline()
+            if not line:
+                break
+            self._memory.append(line.rstrip(b"\n").decode("utf-8"))
+            self._spilled -= 1
+        self._spill_read_offset = self._spill_file.tell()
+        if not self._spilled:
+            # Alles wieder eingelesen: Datei leeren, damit sie nicht über den ganzen Crawl wächst.
+            self._spill_file.seek(0)
+            self._spill_file.truncate()
+            self._spill_read_offset = 0
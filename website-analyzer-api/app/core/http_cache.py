@@ -0,0 +1,152 @@
+# app/core/http_cache.py
+import hashlib
+import json
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import httpx
+
+from app.core import http_client
+from app.core.config import settings
+from app.core.redis_client import RedisLruCache
+
+# Header, die nach dem Dekodieren des Bodies nicht mehr stimmen und deshalb nicht gespeichert werden.
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+_store = RedisLruCache("httpcache", settings.HTTP_CACHE_MAX_BYTES, settings.HTTP_CACHE_RETENTION_SECONDS)
+
+def _cache_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()
+
+def _cache_control(headers: httpx.Headers) -> Dict[str, str]:
+    """Die Cache-Control-Direktiven als {name: wert}, z.B. {"max-age": "60", "no-cache": ""}."""
+    directives = {}
+    for directive in headers.get("Cache-Control", "").split(","):
+        name, _, value = directive.strip().partition("=")
+        if name:
+            directives[name.lower()] = value.strip().strip('"')
+    return directives
+
+def _server_lifetime(headers: httpx.Headers) -> Optional[float]:
+    """Frische laut Server in Sekunden: s-maxage bzw. max-age, sonst Expires minus Date. None ohne Angabe."""
+    directives = _cache_control(headers)
+    for name in ("s-maxage", "max-age"):
+        if name in directives:
+            try:
+                return float(directives[name])
+            except ValueError:
+                return 0.0
+    if "Expires" not in headers:
+        return None
+    try:
+        expires = parsedate_to_datetime(headers["Expires"]).timestamp()
+        date = parsedate_to_datetime(headers["Date"]).timestamp() if "Date" in headers else time.time()
+    except (TypeError, ValueError):
+        # Ungültiges Expires (z.B. "0") bedeutet laut RFC 9111 "bereits abgelaufen".
+        return 0.0
+    return expires - date
+
+def _freshness_lifetime(headers: httpx.Headers) -> float:
+    """Wie lange ein Eintrag ohne Revalidierung gilt: Angabe des Servers, höchstens HTTP_CACHE_MAX_AGE_SECONDS."""
+    server_lifetime = _server_lifetime(headers)
+    if server_lifetime is None:
+        return settings.HTTP_CACHE_MAX_AGE_SECONDS
+    return max(0.0, min(server_lifetime, settings.HTTP_CACHE_MAX_AGE_SECONDS))
+
+def _is_cacheable(response: httpx.Response) -> bool:
+    if response.status_code != 200:
+        return False
+    # private: nur für einen Nutzer bestimmt, gehört nicht in einen job-übergreifenden Cache.
+    if {"no-store", "private"} & set(_cache_control(response.headers)):
+        return False
+    return len(response.content) <= settings.HTTP_CACHE_MAX_ENTRY_BYTES
+
+def _to_response(meta: Dict[str, Any], body: bytes, cache_status: str) -> httpx.Response:
+    return httpx.Response(
+        status_code=meta["status_code"],
+        headers=meta["headers"],
+        content=body,
+        request=httpx.Request("GET", meta["final_url"]),
+        extensions={"from_cache": cache_status}
+    )
+
+async def _load(key: str) -> Optional[tuple[Dict[str, Any], bytes]]:
+    try:
+        cached = await _store.get(key)
+    except Exception as e:
+        print(f"⚠️ HTTP-Cache nicht erreichbar, lade ohne Cache: {e}")
+        return None
+    if cached is None:
+        return None
+    meta, body = cached
+    return json.loads(meta), body
+
+async def _save(key: str, response: httpx.Response) -> None:
+    headers = {name: value for name, value in response.headers.items() if name.lower() not in _DROPPED_HEADERS}
+    meta = {
+        "final_url": str(response.url),
+        "status_code": response.status_code,
+        "headers": headers,
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "no_cache": "no-cache" in _cache_control(response.headers),
+        "max_age": _freshness_lifetime(response.headers),
+        "stored_at": time.time(),
+    }
+    try:
+        await _store.set(key, json.dumps(meta), response.content)
+    except Exception as e:
+        print(f"⚠️ HTTP-Cache konnte {response.url} nicht speichern: {e}")
+
+async def fetch(url: str, timings: Optional[http_client.RequestTimings] = None) -> httpx.Response:
+    """
+    Lädt eine URL über den gemeinsamen HTTP-Client mit einem persistenten, job-übergreifenden Cache.
+
+    Frische Einträge werden ohne Netzwerkzugriff geliefert. Frisch heißt: jünger als max-age bzw.
+    Expires des Servers, höchstens HTTP_CACHE_MAX_AGE_SECONDS. Einträge mit no-cache und ältere
+    Einträge werden mit If-None-Match/If-Modified-Since revalidiert; bei 304 wird der gespeicherte
+    Body verwendet. Antworten mit no-store oder private werden nicht gespeichert.
+    Die Antwort trägt in response.extensions["from_cache"] die Herkunft ("hit", "revalidated"),
+    wenn sie aus dem Cache stammt.
+    """
+    if not settings.HTTP_CACHE_ENABLED:
+        return await http_client.fetch(url, timings=timings)
+
+    key = _cache_key(url)
+    started = time.perf_counter()
+    cached = await _load(key)
+
+    conditional_headers = {}
+    if cached is not None:
+        meta, body = cached
+        max_age = min(meta.get("max_age", settings.HTTP_CACHE_MAX_AGE_SECONDS), settings.HTTP_CACHE_MAX_AGE_SECONDS)
+        is_fresh = time.time() - meta["stored_at"] < max_age
+        if is_fresh and not meta.get("no_cache"):
+            if timings is not None:
+                elapsed = time.perf_counter() - started
+                timings.record(http_client.RequestTiming(url, meta["status_code"], "cache", elapsed, elapsed, len(body)))
+            return _to_response(meta, body, "hit")
+        if meta.get("etag"):
+            conditional_headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            conditional_headers["If-Modified-Since"] = meta["last_modified"]
+
+    response = await http_client.fetch(url, headers=conditional_headers or None, timings=timings)
+
+    if response.status_code == 304 and cached is not None:
+        meta, body = cached
+        meta["stored_at"] = time.time()
+        # Ein 304 darf die Frische-Angaben erneuern (RFC 9111, 4.3.4).
+        if "Cache-Control" in response.headers or "Expires" in response.headers:
+            meta["max_age"] = _freshness_lifetime(response.headers)
+            meta["no_cache"] = "no-cache" in _cache_control(response.headers)
+        try:
+            await _store.touch(key, json.dumps(meta))
+        except Exception as e:
+            print(f"⚠️ HTTP-Cache konnte {url} nicht aktualisieren: {e}")
+        return _to_response(meta, body, "revalidated")
+
+    if _is_cacheable(response):
+        await _save(key, response)
+    return response
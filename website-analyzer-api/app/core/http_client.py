@@ -0,0 +1,144 @@
+# app/core/http_client.py
+import asyncio
+import time
+import weakref
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Dict, List, Optional
+from urllib.parse import urlparse
+
+import httpx
+
+from app.core.config import settings
+
+# Ein Client pro Event-Loop: httpx-Verbindungen sind an den Loop gebunden, in dem sie geöffnet wurden.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+@dataclass
+class RequestTiming:
+    url: str
+    status_code: Optional[int]
+    http_version: str
+    time_to_headers: float
+    total_time: float
+    num_bytes: int
+    error: Optional[str] = None
+
+class RequestTimings:
+    """Sammelt die Zeiten aller Requests eines Jobs, um sichtbar zu machen, wohin die Crawl-Zeit fließt."""
+
+    def __init__(self):
+        self.entries: List[RequestTiming] = []
+
+    def record(self, timing: RequestTiming) -> None:
+        self.entries.append(timing)
+
+    def summary(self) -> Dict[str, object]:
+        if not self.entries:
+            return {"requests": 0}
+        totals = sorted(entry.total_time for entry in self.entries)
+        slowest = sorted(self.entries, key=lambda entry: entry.total_time, reverse=True)[:5]
+        return {
+            "requests": len(self.entries),
+            "errors": sum(1 for entry in self.entries if entry.error),
+            "bytes": sum(entry.num_bytes for entry in self.entries),
+            "total_seconds": round(sum(totals), 3),
+            "p50_seconds": round(totals[len(totals) // 2], 3),
+            "p95_seconds": round(totals[min(len(totals) - 1, int(len(totals) * 0.95))], 3),
+            "avg_time_to_headers_seconds": round(sum(entry.time_to_headers for entry in self.entries) / len(self.entries), 3),
+            "http_versions": sorted({entry.http_version for entry in self.entries if entry.http_version}),
+            "slowest": [(entry.url, round(entry.total_time, 3)) for entry in slowest],
+        }
+
+    def log_summary(self, label: str) -> None:
+        print(f"    -> ⏱️ HTTP-Timing {label}: {self.summary()}")
+
+class HostLimits:
+    """
+    Gemeinsame Grenzen aller Requests eines Crawl-Jobs: CRAWLER_MAX_CONCURRENCY insgesamt,
+    CRAWLER_MAX_CONCURRENCY_PER_HOST pro Host und der Mindestabstand zwischen zwei
+    Request-Starts pro Host (robots.txt Crawl-delay).
+    """
+
+    def __init__(self):
+        self._global_limit = asyncio.Semaphore(settings.CRAWLER_MAX_CONCURRENCY)
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._pacing_locks: Dict[str, asyncio.Lock] = {}
+        self._next_start: Dict[str, float] = {}
+
+    async def _pace(self, host: str, delay: float) -> None:
+        if delay <= 0:
+            return
+        loop = asyncio.get_running_loop()
+        async with self._pacing_locks.setdefault(host, asyncio.Lock()):
+            wait_time = self._next_start.get(host, 0.0) - loop.time()
+            if wait_time > 0:
+                await asyncio.sleep(wait_time)
+            self._next_start[host] = loop.time() + delay
+
+    @asynccontextmanager
+    async def slot(self, url: str, crawl_delay: float = 0.0) -> AsyncIterator[None]:
+        """Wartet den Crawl-delay des Hosts ab und hält für die Dauer des Requests beide Semaphoren."""
+        host = urlparse(url).netloc
+        host_limit = self._host_limits.setdefault(host, asyncio.Semaphore(settings.CRAWLER_MAX_CONCURRENCY_PER_HOST))
+        await self._pace(host, crawl_delay)
+        async with self._global_limit, host_limit:
+            yield
+
+def _build_client() -> httpx.AsyncClient:
+    # httpx bietet gzip/deflate immer und 'br' automatisch an, sobald 'brotli' installiert ist.
+    return httpx.AsyncClient(
+        headers={'User-Agent': settings.CRAWLER_USER_AGENT},
+        timeout=httpx.Timeout(
+            settings.REQUEST_TIMEOUT,
+            connect=settings.HTTP_CONNECT_TIMEOUT,
+            read=settings.HTTP_READ_TIMEOUT
+        ),
+        limits=httpx.Limits(
+            max_connections=settings.HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.HTTP_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.HTTP_KEEPALIVE_EXPIRY
+        ),
+        http2=settings.HTTP_ENABLE_HTTP2,
+        follow_redirects=True
+    )
+
+def get_client() -> httpx.AsyncClient:
+    """Gibt den gepoolten Client des aktuellen Event-Loops zurück und legt ihn bei Bedarf an."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None or client.is_closed:
+        client = _build_client()
+        _clients[loop] = client
+    return client
+
+async def close_client() -> None:
+    """Schließt den Client des aktuellen Event-Loops, bevor der Loop beendet wird."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None and not client.is_closed:
+        await client.aclose()
+
+async def fetch(url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None, timings: Optional[RequestTimings] = None) -> httpx.Response:
+    """
+    Lädt eine URL über den gemeinsamen Client und liest den Body vollständig ein.
+    Ist ein RequestTimings-Objekt übergeben, werden Zeit bis zu den Headern und Gesamtzeit erfasst.
+    """
+    client = get_client()
+    request_timeout = timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT
+    started = time.perf_counter()
+    headers_received = started
+    try:
+        async with client.stream("GET", url, headers=headers, timeout=request_timeout) as response:
+            headers_received = time.perf_counter()
+            await response.aread()
+    except Exception as e:
+        if timings is not None:
+            now = time.perf_counter()
+            timings.record(RequestTiming(url, None, "", headers_received - started, now - started, 0, str(e)))
+        raise
+    if timings is not None:
+        timings.record(RequestTiming(
+            url, response.status_code, response.http_version,
+            headers_received - started, time.perf_counter() - started, len(response.content)
+        ))
+    return response
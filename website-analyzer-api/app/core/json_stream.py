@@ -0,0 +1,149 @@
+# app/core/json_stream.py
+import json
+from typing import Any, List, Optional, Tuple
+
+class TopLevelJsonParser:
+    """
+    Inkrementeller Parser für ein JSON-Objekt, das stückweise (z.B. aus einem LLM-Stream) ankommt.
+
+    feed() liefert jedes Top-Level-Feld als (key, value), sobald sein Wert vollständig ist, ohne auf
+    das Ende der Antwort zu warten. Text vor der ersten '{' (Einleitungen, ```json) wird übersprungen,
+    Text nach der schließenden '}' ignoriert. Jedes Zeichen wird genau einmal betrachtet.
+    """
+
+    def __init__(self):
+        self.result: dict = {}
+        self.done = False
+        self._text = ""
+        self._position = 0
+        self._object_start: Optional[int] = None
+        self._object_end: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._key_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+
+    @property
+    def text(self) -> Optional[str]:
+        """Das vollständige Top-Level-Objekt als Text, sobald es geschlossen ist."""
+        if self._object_end is None:
+            return None
+        return self._text[self._object_start:self._object_end]
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        if self.done or not chunk:
+            return []
+        self._text += chunk
+        completed: List[Tuple[str, Any]] = []
+        text = self._text
+        for position in range(self._position, len(text)):
+            char = text[position]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._key is None and self._key_start is not None:
+                        try:
+                            self._key = json.loads(text[self._key_start:position + 1])
+                        except json.JSONDecodeError:
+                            self._key = text[self._key_start + 1:position]
+                continue
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._object_start = position
+                continue
+
+            if char == '"':
+                self._in_string = True
+                if self._depth == 1:
+                    if self._key is None:
+                        self._key_start = position
+                    elif self._value_start is None:
+                        self._value_start = position
+            elif char in "{[":
+                if self._depth == 1 and self._value_start is None:
+                    self._value_start = position
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._finish_member(text, position, completed)
+                    self.done = True
+                    self._object_end = position + 1
+                    self._position = position + 1
+                    return completed
+            elif self._depth == 1:
+                if char == ",":
+                    self._finish_member(text, position, completed)
+                elif char != ":" and not char.isspace() and self._key is not None and self._value_start is None:
+                    # Zahlen, true, false, null
+                    self._value_start = position
+        self._position = len(text)
+        return completed
+
+    def _finish_member(self, text: str, end: int, completed: List[Tuple[str, Any]]) -> None:
+        key, value_start = self._key, self._value_start
+        self._key = self._key_start = self._value_start = None
+        if key is None or value_start is None:
+            return
+        try:
+            value = json.loads(text[value_start:end])
+        except json.JSONDecodeError:
+            return
+        self.result[key] = value
+        completed.append((key, value))
+
+def extract_json_object(text: str) -> Optional[str]:
+    """
+    Das erste vollständige JSON-Objekt im Text, oder None. Anders als eine gierige Regex ('{' bis
+    zur letzten '}') endet es genau an der passenden schließenden Klammer und beachtet Strings.
+    """
+    parser = TopLevelJsonParser()
+    parser.feed(text)
+    return parser.text
+
+def _matching_bracket_end(text: str, start: int) -> Optional[int]:
+    """Position hinter der Klammer, die die Klammer bei start schließt (Strings beachtet), oder None."""
+    depth = 0
+    in_string = escaped = False
+    for position in range(start, len(text)):
+        char = text[position]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return position + 1
+    return None
+
+def extract_json_array(text: str) -> Optional[str]:
+    """
+    Das erste gültige JSON-Array im Text, oder None. Endet wie extract_json_object an der passenden
+    schließenden Klammer; eckige Klammern im Fließtext davor (z.B. "[Hinweis]") werden übersprungen.
+    """
+    start = text.find("[")
+    while start != -1:
+        end = _matching_bracket_end(text, start)
+        if end is None:
+            return None
+        try:
+            json.loads(text[start:end])
+            return text[start:end]
+        except json.JSONDecodeError:
+            start = text.find("[", start + 1)
+    return None
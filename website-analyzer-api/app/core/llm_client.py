@@ -0,0 +1,273 @@
+# app/core/llm_client.py
+import asyncio
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+import weakref
+from typing import AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+from app.core.config import settings
+from app.core.redis_client import RedisLruCache, get_redis
+
+# Antworten, bei denen sich ein erneuter Versuch nach einer Pause lohnt.
+_RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+)
+
+# Token-Bucket für Requests und Tokens pro Minute in einem Schritt. Die Zeit kommt von Redis selbst,
+# damit Uhrabweichungen zwischen Worker-Hosts keine Rolle spielen. Rückgabe: Wartezeit in ms (0 = erlaubt).
+_TOKEN_BUCKET_SCRIPT = """
+local t = redis.call('TIME')
+local now_ms = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local rpm = tonumber(ARGV[1])
+local tpm = tonumber(ARGV[2])
+local cost = math.min(tonumber(ARGV[3]), tpm)
+local state = redis.call('HMGET', KEYS[1], 'requests', 'tokens', 'ts')
+local requests = tonumber(state[1]) or rpm
+local tokens = tonumber(state[2]) or tpm
+local elapsed = math.max(0, now_ms - (tonumber(state[3]) or now_ms))
+requests = math.min(rpm, requests + elapsed * rpm / 60000)
+tokens = math.min(tpm, tokens + elapsed * tpm / 60000)
+local wait = 0
+if requests < 1 then wait = math.max(wait, (1 - requests) * 60000 / rpm) end
+if tokens < cost then wait = math.max(wait, (cost - tokens) * 60000 / tpm) end
+if wait == 0 then
+    requests = requests - 1
+    tokens = tokens - cost
+end
+redis.call('HSET', KEYS[1], 'requests', tostring(requests), 'tokens', tostring(tokens), 'ts', now_ms)
+redis.call('PEXPIRE', KEYS[1], 120000)
+return math.ceil(wait)
+"""
+
+# Grobe Annäherung an SentencePiece: Wörter und Einrückungen werden in Stücke von ca. 4 Zeichen
+# zerlegt, jedes Satzzeichen ist ein Token, einzelne Leerzeichen gehören zum folgenden Wort.
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]|\s{2,}")
+
+_model: Optional[genai.GenerativeModel] = None
+_model_lock = threading.Lock()
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+_response_cache = RedisLruCache("llmcache", settings.LLM_CACHE_MAX_BYTES, settings.LLM_CACHE_TTL_SECONDS)
+_CACHE_STATS_KEY = "llmcache:stats"
+# Treffer/Fehlschläge dieses Prozesses; die Summe über alle Worker liegt im Redis-Hash llmcache:stats.
+_cache_stats: Dict[str, int] = {"hits": 0, "misses": 0, "bypassed": 0}
+
+def is_configured() -> bool:
+    return bool(settings.DEIN_GOOGLE_API_KEY) and "IHR_GOOGLE_API_KEY" not in settings.DEIN_GOOGLE_API_KEY
+
+def estimate_tokens(text: str) -> int:
+    """Lokale Schätzung der Token-Zahl, ohne zusätzlichen API-Aufruf (count_tokens)."""
+    return sum((len(piece) + 3) // 4 for piece in _TOKEN_PATTERN.findall(text))
+
+def get_model() -> genai.GenerativeModel:
+    """Konfiguriert die API einmal pro Prozess und liefert immer dieselbe Modell-Instanz."""
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                genai.configure(api_key=settings.DEIN_GOOGLE_API_KEY)
+                _model = genai.GenerativeModel(settings.LLM_MODEL_NAME)
+    return _model
+
+def template_version(template: str) -> str:
+    """Version eines Prompt-Templates: ändert sich der Template-Text, ändern sich alle Cache-Keys."""
+    return hashlib.sha256(template.encode("utf-8")).hexdigest()[:12]
+
+def _cache_key(prompt: str, template: str) -> str:
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    return hashlib.sha256(f"{settings.LLM_MODEL_NAME}\0{template_version(template)}\0{prompt_hash}".encode("utf-8")).hexdigest()
+
+def get_cache_stats() -> Dict[str, int]:
+    return dict(_cache_stats)
+
+async def _count(stat: str) -> None:
+    _cache_stats[stat] += 1
+    try:
+        await get_redis().hincrby(_CACHE_STATS_KEY, stat, 1)
+    except Exception:
+        pass
+
+async def _load_cached(key: str) -> Optional[str]:
+    try:
+        entry = await _response_cache.get(key)
+    except Exception as e:
+        print(f"⚠️ LLM-Cache nicht erreichbar, frage das Modell direkt: {e}")
+        return None
+    return entry[1].decode("utf-8") if entry else None
+
+async def _save_cached(key: str, template: str, text: str) -> None:
+    meta = json.dumps({"model": settings.LLM_MODEL_NAME, "template_version": template_version(template), "stored_at": time.time()})
+    try:
+        await _response_cache.set(key, meta, text.encode("utf-8"))
+    except Exception as e:
+        print(f"⚠️ LLM-Cache konnte die Antwort nicht speichern: {e}")
+
+def _get_semaphore() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+        _semaphores[loop] = semaphore
+    return semaphore
+
+async def _acquire_rate_limit(token_cost: int) -> None:
+    """
+    Wartet, bis der gemeinsame Token-Bucket aller Worker den Request erlaubt.
+    Ist Redis nicht erreichbar, wird ohne globales Limit weitergemacht (nur die lokale Semaphore greift).
+    """
+    waited = 0.0
+    while True:
+        try:
+            wait_ms = await get_redis().eval(
+                _TOKEN_BUCKET_SCRIPT, 1, f"llm:ratelimit:{settings.LLM_MODEL_NAME}",
+                settings.LLM_REQUESTS_PER_MINUTE, settings.LLM_TOKENS_PER_MINUTE, token_cost
+            )
+        except Exception as e:
+            print(f"⚠️ LLM-Rate-Limiter nicht erreichbar, fahre ohne globales Limit fort: {e}")
+            return
+        if not wait_ms:
+            return
+        if waited >= settings.LLM_RATE_LIMIT_MAX_WAIT:
+            raise TimeoutError(f"LLM-Rate-Limit: nach {waited:.0f}s immer noch kein Kontingent frei.")
+        delay = min(int(wait_ms) / 1000, settings.LLM_RATE_LIMIT_MAX_WAIT - waited)
+        # Etwas Jitter, damit wartende Worker nicht alle im selben Moment wieder anklopfen.
+        delay += random.uniform(0, 0.25)
+        waited += delay
+        await asyncio.sleep(delay)
+
+async def _cache_lookup(prompt: str, template: Optional[str], use_cache: bool) -> Tuple[Optional[str], Optional[str]]:
+    """Gibt (Cache-Key, gecachte Antwort) zurück; der Key ist None, wenn nicht gecacht wird."""
+    cache_key = _cache_key(prompt, template) if template is not None and settings.LLM_CACHE_ENABLED else None
+    if cache_key is None:
+        return None, None
+    if not use_cache:
+        await _count("bypassed")
+        return cache_key, None
+    cached_text = await _load_cached(cache_key)
+    await _count("hits" if cached_text is not None else "misses")
+    return cache_key, cached_text
+
+async def generate(prompt: str, template: Optional[str] = None, use_cache: bool = True, is_valid: Optional[Callable[[str], bool]] = None) -> str:
+    """
+    Schickt einen Prompt an das konfigurierte Gemini-Modell und gibt den Antworttext zurück.
+
+    Ist das Template angegeben, aus dem der Prompt gerendert wurde, werden Antworten in Redis
+    gecacht (Key: Modell, Template-Version, Hash des Prompts; LRU mit LLM_CACHE_MAX_BYTES und
+    LLM_CACHE_TTL_SECONDS). use_cache=False überspringt das Lesen, speichert die frische Antwort
+    aber trotzdem. is_valid verhindert, dass unbrauchbare Antworten im Cache landen.
+
+    Pro Event-Loop laufen höchstens LLM_MAX_CONCURRENCY Aufrufe gleichzeitig, über alle Worker
+    hinweg begrenzt ein Token-Bucket in Redis Requests und Tokens pro Minute. Bei 429 und
+    vorübergehenden Fehlern wird mit exponentiellem Backoff erneut versucht (LLM_MAX_RETRIES).
+    Der blockierende SDK-Aufruf läuft in einem Thread, damit der Event-Loop frei bleibt.
+    """
+    cache_key, cached_text = await _cache_lookup(prompt, template, use_cache)
+    if cached_text is not None:
+        return cached_text
+
+    text = await _generate_uncached(prompt)
+    if cache_key is not None and (is_valid is None or is_valid(text)):
+        await _save_cached(cache_key, template, text)
+    return text
+
+async def generate_stream(prompt: str, on_chunk: Callable[[str], Awaitable[None]], template: Optional[str] = None, use_cache: bool = True, is_valid: Optional[Callable[[str], bool]] = None) -> str:
+    """
+    Wie generate, aber mit Streaming: on_chunk wird mit jedem Textstück aufgerufen, sobald es
+    ankommt (bei einem Cache-Treffer einmal mit der ganzen Antwort). Gibt den vollständigen Text
+    zurück. LLM_REQUEST_TIMEOUT gilt hier als maximale Pause zwischen zwei Stücken. Ein neuer
+    Versuch nach einem Fehler ist nur möglich, solange noch kein Stück weitergegeben wurde.
+    """
+    cache_key, cached_text = await _cache_lookup(prompt, template, use_cache)
+    if cached_text is not None:
+        await on_chunk(cached_text)
+        return cached_text
+
+    text = await _stream_uncached(prompt, on_chunk)
+    if cache_key is not None and (is_valid is None or is_valid(text)):
+        await _save_cached(cache_key, template, text)
+    return text
+
+async def _generate_uncached(prompt: str) -> str:
+    model = get_model()
+    token_cost = estimate_tokens(prompt) + settings.LLM_OUTPUT_TOKEN_RESERVE
+    async with _get_semaphore():
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            await _acquire_rate_limit(token_cost)
+            try:
+                response = await asyncio.wait_for(
+                    asyncio.to_thread(model.generate_content, prompt),
+                    timeout=settings.LLM_REQUEST_TIMEOUT
+                )
+                return response.text
+            except _RETRYABLE_ERRORS as e:
+                if attempt >= settings.LLM_MAX_RETRIES:
+                    raise
+                delay = settings.LLM_RETRY_BASE_DELAY * (2 ** attempt) + random.uniform(0, 1)
+                print(f"⏳ LLM-Anfrage abgelehnt ({type(e).__name__}), neuer Versuch {attempt + 1}/{settings.LLM_MAX_RETRIES} in {delay:.1f}s.")
+                await asyncio.sleep(delay)
+
+def _chunk_text(chunk) -> str:
+    # Stücke ohne Text (z.B. nur mit finish_reason) werfen beim Zugriff auf .text einen ValueError.
+    try:
+        return chunk.text
+    except ValueError:
+        return ""
+
+async def _iterate_stream(model: genai.GenerativeModel, prompt: str) -> AsyncIterator[str]:
+    """Liest den blockierenden SDK-Stream in einem Thread und reicht die Stücke über eine Queue an den Event-Loop."""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = object()
+    stop = threading.Event()
+
+    def produce() -> None:
+        try:
+            for chunk in model.generate_content(prompt, stream=True):
+                if stop.is_set():
+                    return
+                loop.call_soon_threadsafe(queue.put_nowait, _chunk_text(chunk))
+            loop.call_soon_threadsafe(queue.put_nowait, finished)
+        except Exception as e:
+            loop.call_soon_threadsafe(queue.put_nowait, e)
+
+    loop.run_in_executor(None, produce)
+    try:
+        while True:
+            item = await asyncio.wait_for(queue.get(), timeout=settings.LLM_REQUEST_TIMEOUT)
+            if item is finished:
+                return
+            if isinstance(item, Exception):
+                raise item
+            if item:
+                yield item
+    finally:
+        stop.set()
+
+async def _stream_uncached(prompt: str, on_chunk: Callable[[str], Awaitable[None]]) -> str:
+    model = get_model()
+    token_cost = estimate_tokens(prompt) + settings.LLM_OUTPUT_TOKEN_RESERVE
+    async with _get_semaphore():
+        for attempt in range(settings.LLM_MAX_RETRIES + 1):
+            await _acquire_rate_limit(token_cost)
+            parts = []
+            try:
+                async for chunk_text in _iterate_stream(model, prompt):
+                    parts.append(chunk_text)
+                    await on_chunk(chunk_text)
+                return "".join(parts)
+            except _RETRYABLE_ERRORS as e:
+                if parts or attempt >= settings.LLM_MAX_RETRIES:
+                    raise
+                delay = settings.LLM_RETRY_BASE_DELAY * (2 ** attempt) + random.uniform(0, 1)
+                print(f"⏳ LLM-Stream abgelehnt ({type(e).__name__}), neuer Versuch {attempt + 1}/{settings.LLM_MAX_RETRIES} in {delay:.1f}s.")
+                await asyncio.sleep(delay)
@@ -1,15 +1,34 @@
 # app/core/page_classifier.py
-import google.generativeai as genai
+import asyncio
 import json
-from typing import Dict, Any
+import re
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlparse
 
+from app.core import llm_client
 from app.core.config import settings
+from app.core.json_stream import extract_json_array
 
-def classify_page(page_data: Dict[str, Any]) -> str:
-    if not settings.DEIN_GOOGLE_API_KEY or "IHR_GOOGLE_API_KEY" in settings.DEIN_GOOGLE_API_KEY:
-        return "Hard_to_read"
-    
-    classification_input = {
+ALLOWED_CATEGORIES = ['Core_Messaging', 'Supporting_Content', 'Boilerplate', 'Hard_to_read']
+
+BOILERPLATE_PATH_KEYWORDS = ['datenschutz', 'datenschutzerklaerung', 'impressum', 'agb', 'cookie', 'cookies', 'legal', 'login', 'rechtliches', 'widerrufsbelehrung', 'versand']
+EXCLUDED_SUBDOMAINS = ['docs', 'api', 'status', 'files', 'developer', 'support', 'blog', 'karriere', 'jobs']
+# Seitennamen rechtlicher/administrativer Seiten und Fehlerseiten. Greift nur, wenn ein Titel-Abschnitt
+# (siehe _TITLE_SEGMENT_SEPARATOR_PATTERN) genau so lautet, z.B. "Impressum | Acme GmbH", aber nicht
+# bei Produkttiteln wie "Privacy-first Analytics" oder "Single Sign In für Teams".
+_BOILERPLATE_TITLE_PATTERN = re.compile(
+    r"^\s*(impressum|imprint|datenschutz(erklärung|erklaerung|hinweise)?|privacy( policy| notice)?|cookies?( policy|-richtlinie|richtlinie)?"
+    r"|agb|terms( of service| of use| and conditions)?|nutzungsbedingungen|widerruf(srecht|sbelehrung)?"
+    r"|log ?in|anmelden|sign in|404|seite nicht gefunden|page not found)\s*$",
+    re.IGNORECASE
+)
+# Trennzeichen zwischen Seitenname und Website-Name im Titel; ein Bindestrich nur mit Leerzeichen.
+_TITLE_SEGMENT_SEPARATOR_PATTERN = re.compile(r"\s*[|–—·»]\s*|\s+[-:]\s+")
+# Trennt den Pfad in Segmente und diese in Wörter ("/legal-notice.html" -> legal, notice, html).
+_PATH_WORD_SEPARATOR_PATTERN = re.compile(r"[/\-_.]+")
+
+def _classification_input(page_data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
         "url": page_data.get("url", ""),
         "page_title": page_data.get("page_title", ""),
         "meta_description": page_data.get("meta_description", ""),
@@ -17,23 +36,117 @@ def classify_page(page_data: Dict[str, Any]) -> str:
         "headings_in_content": [section.get("heading") for section in page_data.get("content_structure", []) if section.get("heading")]
     }
 
+def _content_length(page_data: Dict[str, Any]) -> int:
+    length = sum(len(text) for text in page_data.get("intro_content", []) if isinstance(text, str))
+    for section in page_data.get("content_structure", []):
+        for block in section.get("content_blocks", []):
+            length += len(block.get("text", "")) + sum(len(item) for item in block.get("items", []))
+    return length
+
+def _is_boilerplate_title(title: str) -> bool:
+    return any(_BOILERPLATE_TITLE_PATTERN.match(segment) for segment in _TITLE_SEGMENT_SEPARATOR_PATTERN.split(title))
+
+def classify_by_rules(page_data: Dict[str, Any]) -> Optional[str]:
+    """
+    Lokale Regel-Stufe: entscheidet eindeutige Fälle ohne LLM-Aufruf und gibt sonst None zurück.
+    Die Startseite ist immer 'Core_Messaging'. Sonst ergeben Pfad-Schlüsselwörter, ausgeschlossene
+    Subdomains und eindeutige Titel 'Boilerplate' und zu wenig Text 'Hard_to_read'.
+    """
+    parsed_url = urlparse(page_data.get("url", ""))
+    path = parsed_url.path.lower()
+    if path.strip("/") == "":
+        return "Core_Messaging"
+    # Ganze Wörter statt Teilstrings, sonst wären z.B. /magazin/paralegal oder /agbeton Boilerplate.
+    if set(_PATH_WORD_SEPARATOR_PATTERN.split(path)) & set(BOILERPLATE_PATH_KEYWORDS):
+        return "Boilerplate"
+    host_labels = (parsed_url.hostname or "").split(".")
+    if len(host_labels) > 2 and host_labels[0] in EXCLUDED_SUBDOMAINS:
+        return "Boilerplate"
+    if any(_is_boilerplate_title(page_data.get(field) or "") for field in ("page_title", "h1")):
+        return "Boilerplate"
+    if _content_length(page_data) < settings.CLASSIFIER_MIN_CONTENT_CHARS:
+        return "Hard_to_read"
+    return None
+
+def _parse_batch_answer(text: str) -> Optional[List[Dict[str, Any]]]:
+    array_text = extract_json_array(text)
+    return json.loads(array_text) if array_text is not None else None
+
+async def _classify_batch(batch: List[Dict[str, Any]], use_cache: bool) -> Dict[str, str]:
+    """Klassifiziert bis zu CLASSIFIER_BATCH_SIZE Seiten mit einem LLM-Aufruf (Antwort als JSON-Array)."""
+    batch_input = [_classification_input(page_data) for page_data in batch]
+    prompt = settings.PAGE_CLASSIFIER_BATCH_PROMPT.format(pages_json_data=json.dumps(batch_input, ensure_ascii=False, separators=(",", ":")))
+    try:
+        response_text = await llm_client.generate(
+            prompt, template=settings.PAGE_CLASSIFIER_BATCH_PROMPT, use_cache=use_cache,
+            is_valid=lambda text: _parse_batch_answer(text) is not None
+        )
+    except Exception as e:
+        print(f"Fehler im 'page_classifier' für einen Batch mit {len(batch)} Seiten: {e}")
+        return {}
+    answer = _parse_batch_answer(response_text)
+    if answer is None:
+        print(f"⚠️ 'page_classifier' hat für einen Batch mit {len(batch)} Seiten kein JSON-Array geliefert.")
+        return {}
+    batch_urls = {page["url"] for page in batch_input}
+    categories = {}
+    # Nur Antworten mit einer URL aus dem Batch zählen; fehlt sie, wäre die Zuordnung über die
+    # Position geraten. Nicht zugeordnete Seiten landen in classify_pages im Fallback.
+    for item in answer:
+        if isinstance(item, dict) and item.get("url") in batch_urls and item.get("category") in ALLOWED_CATEGORIES:
+            categories[item["url"]] = item["category"]
+    return categories
+
+async def classify_pages(pages: List[Dict[str, Any]], use_cache: bool = True) -> Dict[str, Dict[str, str]]:
+    """
+    Klassifiziert alle Seiten in zwei Stufen: zuerst die Regel-Stufe (kostenlos), dann die übrigen
+    Seiten gebündelt zu CLASSIFIER_BATCH_SIZE pro LLM-Aufruf. Ergebnis pro URL:
+    {"category": ..., "source": "rules" | "llm" | "fallback"}.
+    """
+    results: Dict[str, Dict[str, str]] = {}
+    undecided = []
+    for page_data in pages:
+        category = classify_by_rules(page_data)
+        if category is not None:
+            results[page_data.get("url", "")] = {"category": category, "source": "rules"}
+        else:
+            undecided.append(page_data)
+
+    if undecided and llm_client.is_configured():
+        batch_size = max(1, settings.CLASSIFIER_BATCH_SIZE)
+        batches = [undecided[start:start + batch_size] for start in range(0, len(undecided), batch_size)]
+        for categories in await asyncio.gather(*[_classify_batch(batch, use_cache) for batch in batches]):
+            for url, category in categories.items():
+                results[url] = {"category": category, "source": "llm"}
+
+    for page_data in undecided:
+        results.setdefault(page_data.get("url", ""), {"category": "Hard_to_read", "source": "fallback"})
+    return results
+
+async def classify_page(page_data: Dict[str, Any], use_cache: bool = True) -> str:
+    category = classify_by_rules(page_data)
+    if category is not None:
+        return category
+    if not llm_client.is_configured():
+        return "Hard_to_read"
+
     try:
-        genai.configure(api_key=settings.DEIN_GOOGLE_API_KEY)
-        model = genai.GenerativeModel('gemini-1.5-flash-latest')
-        data_as_json_string = json.dumps(classification_input, indent=2, ensure_ascii=False)
-        
+        data_as_json_string = json.dumps(_classification_input(page_data), indent=2, ensure_ascii=False)
+
         # KORREKTUR: Greift auf den Prompt aus dem settings-Objekt zu
         prompt = settings.PAGE_CLASSIFIER_PROMPT.format(page_json_data=data_as_json_string)
-        
-        response = model.generate_content(prompt)
-        category = response.text.strip()
-        
-        allowed_categories = ['Core_Messaging', 'Supporting_Content', 'Boilerplate', 'Hard_to_read']
-        if category in allowed_categories:
+
+        response_text = await llm_client.generate(
+            prompt, template=settings.PAGE_CLASSIFIER_PROMPT, use_cache=use_cache,
+            is_valid=lambda text: text.strip() in ALLOWED_CATEGORIES
+        )
+        category = response_text.strip()
+
+        if category in ALLOWED_CATEGORIES:
             return category
         else:
             return "Hard_to_read"
-            
+
     except Exception as e:
         print(f"Fehler im 'page_classifier' für URL {page_data.get('url', 'Unbekannt')}: {e}")
-        return "Hard_to_read"
\ No newline at end of file
+        return "Hard_to_read"
@@ -0,0 +1,89 @@
+# app/core/page_selector.py
+import re
+from typing import Dict, List, Optional
+
+from app.core import similarity
+from app.core.config import settings
+from app.core.page_store import PageStore
+from app.core.parser import STRIPPED_TAGS
+
+_STRIPPED_BLOCKS_PATTERN = re.compile(
+    r"<(%s)\b[^>]*>.*?</\1\s*>|<!--.*?-->" % "|".join(STRIPPED_TAGS),
+    re.IGNORECASE | re.DOTALL
+)
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+_URL_WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+def _visible_text(html: str) -> str:
+    """Billige Textextraktion per Regex; für einen Fingerprint reicht das, ein echter Parse-Lauf wäre zu teuer."""
+    return _TAG_PATTERN.sub(" ", _STRIPPED_BLOCKS_PATTERN.sub(" ", html))
+
+def page_fingerprint(url: str, page_store: Optional[PageStore]) -> int:
+    """SimHash des sichtbaren Seitentexts aus der Crawl-Antwort; ohne gespeicherte Seite aus den URL-Wörtern."""
+    stored_page = page_store.get(url) if page_store is not None else None
+    if stored_page is not None and stored_page.status_code < 400:
+        text = similarity.normalize_text(_visible_text(stored_page.text))
+    else:
+        text = " ".join(_URL_WORD_PATTERN.findall(url.lower()))
+    return similarity.simhash(similarity.shingles(text))
+
+def _tie_breaker(url: str, seed: int) -> int:
+    return similarity.stable_hash(f"{seed}:{url}")
+
+def _medoid(urls: List[str], fingerprints: Dict[str, int], seed: int) -> str:
+    """Die Seite mit dem kleinsten Gesamtabstand zu allen anderen, also die typischste."""
+    return min(urls, key=lambda url: (
+        sum(similarity.hamming_distance(fingerprints[url], fingerprints[other]) for other in urls),
+        _tie_breaker(url, seed)
+    ))
+
+def _farthest_points(urls: List[str], fingerprints: Dict[str, int], budget: int, seed: int) -> List[str]:
+    """Start beim Medoid, danach jeweils die Seite mit dem größten Abstand zur bisherigen Auswahl."""
+    selected = [_medoid(urls, fingerprints, seed)]
+    distances = {url: similarity.hamming_distance(fingerprints[url], fingerprints[selected[0]]) for url in urls}
+    while len(selected) < budget:
+        candidates = [url for url in urls if url not in selected]
+        next_url = max(candidates, key=lambda url: (distances[url], -_tie_breaker(url, seed)))
+        selected.append(next_url)
+        for url in candidates:
+            distances[url] = min(distances[url], similarity.hamming_distance(fingerprints[url], fingerprints[next_url]))
+    return selected
+
+def _cluster_medoids(urls: List[str], fingerprints: Dict[str, int], budget: int, seed: int) -> List[str]:
+    """
+    Bildet budget Cluster um weit auseinanderliegende Startpunkte und nimmt aus jedem den Medoid.
+    Haben zwei Startpunkte denselben Fingerprint (Vorlagen-Seiten, Seiten ohne gespeichertes HTML),
+    bleibt der Cluster des zweiten leer; die freien Plätze füllen dann die übrigen Startpunkte.
+    """
+    centers = _farthest_points(urls, fingerprints, budget, seed)
+    clusters: Dict[str, List[str]] = {center: [] for center in centers}
+    for url in urls:
+        nearest = min(centers, key=lambda center: (similarity.hamming_distance(fingerprints[url], fingerprints[center]), centers.index(center)))
+        clusters[nearest].append(url)
+    selected = [_medoid(members, fingerprints, seed) for members in clusters.values() if members]
+    selected += [center for center in centers if center not in selected][:budget - len(selected)]
+    return selected
+
+def select_pages(urls: List[str], budget: int, page_store: Optional[PageStore] = None, seed: Optional[int] = None, strategy: Optional[str] = None) -> List[str]:
+    """
+    Wählt budget repräsentative Seiten einer Collection aus, statt zufällig zu samplen.
+
+    Jede Seite bekommt einen SimHash ihres sichtbaren Texts aus der Crawl-Antwort (ohne nav,
+    header, footer usw.). Strategie "diverse" nimmt die Seiten, die sich am stärksten voneinander
+    unterscheiden, "central" bildet Cluster und nimmt deren typischste Seite. Bei gleichem seed
+    (PAGE_SELECTION_SEED) ist das Ergebnis für dieselben Seiten immer identisch.
+    """
+    seed = seed if seed is not None else settings.PAGE_SELECTION_SEED
+    strategy = strategy or settings.PAGE_SELECTION_STRATEGY
+    # Sortiert, damit die Auswahl nicht von der Reihenfolge der Eingabe abhängt.
+    urls = sorted(set(urls))
+    if len(urls) <= budget:
+        return urls
+    if budget <= 0:
+        return []
+    fingerprints = {url: page_fingerprint(url, page_store) for url in urls}
+    if strategy == "central":
+        return _cluster_medoids(urls, fingerprints, budget, seed)
+    if strategy == "diverse":
+        return _farthest_points(urls, fingerprints, budget, seed)
+    raise ValueError(f"Unbekannte Auswahl-Strategie '{strategy}'. Erlaubt: 'diverse', 'central'.")
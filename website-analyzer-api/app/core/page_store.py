@@ -0,0 +1,128 @@
+# app/core/page_store.py
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from app.core.config import settings
+
+_META_CHARSET_PATTERN = re.compile(rb'<meta[^>]+charset=["\']?([A-Za-z0-9_\-]+)', re.IGNORECASE)
+
+@dataclass
+class StoredPage:
+    """Eine beim Crawlen heruntergeladene Antwort, so wie sie der Parse-Schritt benötigt."""
+    url: str
+    final_url: str
+    status_code: int
+    content_type: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: Optional[bytes] = None
+    encoding: Optional[str] = None
+    body_path: Optional[str] = None
+    size: int = 0
+
+    @property
+    def text(self) -> str:
+        """Dekodiert den Body: Charset aus dem Header, sonst aus dem <meta>-Tag, sonst UTF-8."""
+        body = self.body or b""
+        encoding = self.encoding
+        if not encoding:
+            match = _META_CHARSET_PATTERN.search(body[:2048])
+            encoding = match.group(1).decode("ascii") if match else "utf-8"
+        try:
+            return body.decode(encoding, errors="replace")
+        except LookupError:
+            return body.decode("utf-8", errors="replace")
+
+class PageStore:
+    """
+    Job-lokaler Speicher für alle Antworten des Crawlers, damit jede Seite nur einmal geladen wird.
+
+    Bodies bleiben bis PAGE_STORE_MEMORY_LIMIT_BYTES im Speicher. Alles darüber wird in ein
+    temporäres Verzeichnis ausgelagert, bis PAGE_STORE_DISK_LIMIT_BYTES erreicht ist. Seiten, die
+    in keines der Limits mehr passen, werden nicht gespeichert und später erneut geladen.
+    """
+
+    def __init__(self, memory_limit_bytes: int = None, disk_limit_bytes: int = None):
+        self.memory_limit_bytes = memory_limit_bytes if memory_limit_bytes is not None else settings.PAGE_STORE_MEMORY_LIMIT_BYTES
+        self.disk_limit_bytes = disk_limit_bytes if disk_limit_bytes is not None else settings.PAGE_STORE_DISK_LIMIT_BYTES
+        self._pages: Dict[str, StoredPage] = {}
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        self._spill_dir: Optional[str] = None
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._pages
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def __enter__(self) -> "PageStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def put(self, page: StoredPage) -> bool:
+        """Legt eine Seite ab. Gibt False zurück, wenn sie wegen der Größenlimits verworfen wurde."""
+        if page.url in self._pages:
+            self._forget(self._pages.pop(page.url))
+
+        body = page.body or b""
+        page.size = len(body)
+
+        if self._memory_bytes + page.size <= self.memory_limit_bytes:
+            page.body = body
+            self._memory_bytes += page.size
+        elif self._disk_bytes + page.size <= self.disk_limit_bytes:
+            page.body_path = self._spill(page.url, body)
+            page.body = None
+            self._disk_bytes += page.size
+        else:
+            return False
+
+        self._pages[page.url] = page
+        return True
+
+    def get(self, url: str) -> Optional[StoredPage]:
+        """Gibt die gespeicherte Seite (inklusive Body) zurück oder None, wenn der Crawler sie nicht geladen hat."""
+        page = self._pages.get(url)
+        if page is None or page.body_path is None:
+            return page
+        with open(page.body_path, "rb") as f:
+            body = f.read()
+        return StoredPage(
+            url=page.url, final_url=page.final_url, status_code=page.status_code,
+            content_type=page.content_type, headers=page.headers, body=body,
+            encoding=page.encoding, size=page.size
+        )
+
+    def close(self) -> None:
+        """Gibt den Speicher frei und löscht ausgelagerte Dateien."""
+        self._pages.clear()
+        self._memory_bytes = 0
+        self._disk_bytes = 0
+        if self._spill_dir:
+            shutil.rmtree(self._spill_dir, ignore_errors=True)
+            self._spill_dir = None
+
+    def _spill(self, url: str, body: bytes) -> str:
+        if self._spill_dir is None:
+            self._spill_dir = tempfile.mkdtemp(prefix="page_store_")
+        path = os.path.join(self._spill_dir, hashlib.sha1(url.encode("utf-8")).hexdigest())
+        with open(path, "wb") as f:
+            f.write(body)
+        return path
+
+    def _forget(self, page: StoredPage) -> None:
+        if page.body_path:
+            self._disk_bytes -= page.size
+            try:
+                os.remove(page.body_path)
+            except OSError:
+                pass
+        else:
+            self._memory_bytes -= page.size
@@ -1,7 +1,35 @@
 # app/core/parser.py
 import re
+import lxml.html
+from lxml import etree
 from bs4 import BeautifulSoup
-from typing import Dict, Any, List, Optional
+from bs4.builder import HTMLTreeBuilder
+from typing import Callable, Dict, Any, List, NamedTuple, Optional
+
+from app.core.config import settings
+
+# Tags, die vor der Extraktion komplett entfernt werden (Navigation, Skripte, Formulare, ...).
+STRIPPED_TAGS = ['nav', 'footer', 'header', 'script', 'style', 'aside', 'form']
+RELEVANT_TAGS = ['h2', 'h3', 'p', 'ul', 'ol', 'blockquote']
+# Tags, die der Confidence-Scorer als "semantisch" zählt.
+SEMANTIC_TAGS = ['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'article', 'section', 'blockquote']
+# Zusätzlich für den LLM-Parser entfernt: eingebettete Medien und Widgets ohne lesbaren Text.
+LLM_STRIPPED_TAGS = ['svg', 'noscript', 'iframe', 'template', 'canvas', 'button', 'img', 'picture', 'video', 'audio', 'source']
+# Inline-Tags, deren Text erhalten bleibt, deren Markup der LLM-Parser aber nicht braucht.
+_LLM_UNWRAPPED_TAGS = ['span', 'font', 'a', 'b', 'strong', 'i', 'em', 'u', 'small', 'mark', 'wbr']
+
+# Leere HTML-Elemente ohne schließendes Tag (für die Größenabschätzung des Bodys).
+_VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+
+# Tags, in denen BeautifulSoup Leerraum unverändert lässt.
+_WHITESPACE_PRESERVING_TAGS = {'pre', 'textarea'}
+# Attribute, deren Werte BeautifulSoup als Liste speichert (z.B. class), pro Tag bzw. '*' für alle.
+_LIST_ATTRIBUTES = HTMLTreeBuilder.DEFAULT_CDATA_LIST_ATTRIBUTES
+# Attribute, denen libxml2 ohne Wert (<input disabled>) ihren eigenen Namen als Wert gibt.
+_BOOLEAN_ATTRIBUTES = {'checked', 'compact', 'declare', 'defer', 'disabled', 'ismap', 'multiple', 'nohref', 'noresize', 'noshade', 'nowrap', 'readonly', 'selected'}
+
+_XML_DECLARATION_PATTERN = re.compile(r'^\s*<\?xml[^>]*\?>')
+_BODY_TAG_PATTERN = re.compile(r'<body[\s>/]', re.IGNORECASE)
 
 def _log_parser_error(url: str, html_content: str, error: str):
     with open("parser_error_log.txt", "a", encoding="utf-8") as f:
@@ -15,47 +43,389 @@ def _clean_text(text: str) -> str:
     if not text: return ""
     return re.sub(r'\s+', ' ', text).strip()
 
-def parse_html_to_json(html_content: str, url: str) -> Dict[str, Any]:
+def _empty_page_data(url: str, page_title: str = "", meta_description: str = "", h1: str = "") -> Dict[str, Any]:
+    return {"url": url, "page_title": page_title, "meta_description": meta_description, "h1": h1, "intro_content": [], "content_structure": []}
+
+def _text_field(value: Any) -> str:
+    return _clean_text(value) if isinstance(value, str) else ""
+
+def _normalize_block(block: Any) -> Optional[Dict[str, Any]]:
+    if not isinstance(block, dict):
+        return None
+    if block.get("type") == "list" or ("items" in block and "text" not in block):
+        items = block.get("items")
+        items = [item for item in (_text_field(item) for item in items) if item] if isinstance(items, list) else []
+        return {"type": "list", "items": items} if items else None
+    text = _text_field(block.get("text"))
+    if not text:
+        return None
+    return {"type": "subheading" if block.get("type") == "subheading" else "paragraph", "text": text}
+
+def normalize_page_data(page_data: Any, url: str) -> Optional[Dict[str, Any]]:
+    """
+    Bringt page_data aus einer fremden Quelle (LLM-Parser) in die Form, die _ContentBuilder erzeugt:
+    Textfelder sind Strings, intro_content eine Liste von Strings, Abschnitte und Blöcke sind Dicts
+    mit Text bzw. items. Ungültige Einträge fallen weg. None, wenn kein Inhalt übrig bleibt.
+    """
+    if not isinstance(page_data, dict) or page_data.get("parsing_error"):
+        return None
+    intro_content = page_data.get("intro_content")
+    content_structure = page_data.get("content_structure")
+    if not isinstance(intro_content, (list, type(None))) or not isinstance(content_structure, (list, type(None))):
+        return None
+    normalized = _empty_page_data(url, *(_text_field(page_data.get(field)) for field in ("page_title", "meta_description", "h1")))
+    normalized["intro_content"] = [text for text in (_text_field(text) for text in intro_content or []) if text]
+    for section in content_structure or []:
+        if not isinstance(section, dict):
+            continue
+        blocks = section.get("content_blocks")
+        blocks = [block for block in (_normalize_block(block) for block in blocks) if block] if isinstance(blocks, list) else []
+        if blocks:
+            normalized["content_structure"].append({"heading": _text_field(section.get("heading")), "content_blocks": blocks})
+    if not normalized["intro_content"] and not normalized["content_structure"]:
+        return None
+    return normalized
+
+def _page_metrics(has_body: bool, semantic_count: int = 0, div_count: int = 0, all_tags_count: int = 0, text_length: int = 0, body_size: int = 0) -> Dict[str, Any]:
+    """Die Kennzahlen, aus denen confidence_scorer.score_metrics den Confidence-Score berechnet."""
+    return {
+        "has_body": has_body,
+        "semantic_ratio": semantic_count / (div_count + 1),
+        "text_to_tag_ratio": text_length / (all_tags_count + 1),
+        "body_size": body_size,
+    }
+
+class _ContentBuilder:
+    """Baut aus der Folge relevanter Tags (h2, h3, p, Listen, Zitate) intro_content und content_structure auf."""
+
+    def __init__(self, page_data: Dict[str, Any]):
+        self.page_data = page_data
+        self.content_structure: List[Dict[str, Any]] = []
+        self.current_section: Optional[Dict[str, Any]] = None
+        self.has_seen_h2 = False
+
+    def add(self, tag_name: str, text: Callable[[], str], list_items: Callable[[], List[str]]) -> None:
+        if tag_name == 'h2':
+            self.has_seen_h2 = True
+            if self.current_section: self.content_structure.append(self.current_section)
+            self.current_section = {"heading": _clean_text(text()), "content_blocks": []}
+            return
+        if not self.has_seen_h2:
+            intro_text = _clean_text(text())
+            if intro_text: self.page_data["intro_content"].append(intro_text)
+            return
+        if not self.current_section: self.current_section = {"heading": "", "content_blocks": []}
+        if tag_name in ('p', 'blockquote'):
+            cleaned = _clean_text(text())
+            if cleaned: self.current_section["content_blocks"].append({"type": "paragraph", "text": cleaned})
+        elif tag_name in ('ul', 'ol'):
+            items = [item for item in (_clean_text(li_text) for li_text in list_items()) if item]
+            if items: self.current_section["content_blocks"].append({"type": "list", "items": items})
+        elif tag_name == 'h3':
+            cleaned = _clean_text(text())
+            if cleaned: self.current_section["content_blocks"].append({"type": "subheading", "text": cleaned})
+
+    def finish(self) -> Dict[str, Any]:
+        if self.current_section and self.current_section["content_blocks"]:
+            self.content_structure.append(self.current_section)
+        self.page_data["content_structure"] = self.content_structure
+        return self.page_data
+
+# --- Backend 1: BeautifulSoup mit dem reinen Python-Parser (Referenz-Implementierung) ---
+
+def _parse_with_html_parser(html_content: str, url: str) -> Dict[str, Any]:
+    return _analyze_with_html_parser(html_content, url, with_metrics=False)[0]
+
+def _analyze_with_html_parser(html_content: str, url: str, with_metrics: bool = True) -> tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+    soup = BeautifulSoup(html_content, 'html.parser')
+    for tag in soup.find_all(STRIPPED_TAGS):
+        tag.decompose()
+    page_title = _clean_text(soup.title.string if soup.title else "")
+    h1 = _clean_text(soup.h1.string if soup.h1 else "")
+    meta_desc_tag = soup.find('meta', attrs={'name': 'description'})
+    meta_description = _clean_text(meta_desc_tag.get('content', '') if meta_desc_tag else "")
+    page_data = _empty_page_data(url, page_title, meta_description, h1)
+    body = soup.body
+    metrics = None
+    if with_metrics:
+        metrics = _page_metrics(has_body=False)
+        if body:
+            metrics = _page_metrics(
+                has_body=True,
+                semantic_count=len(body.find_all(SEMANTIC_TAGS)),
+                div_count=len(body.find_all('div')),
+                all_tags_count=len(body.find_all(True)),
+                text_length=len(_clean_text(body.get_text())),
+                body_size=len(str(body))
+            )
+    main_content = soup.main if soup.main else body
+    if not main_content: return page_data, metrics
+    builder = _ContentBuilder(page_data)
+    for tag in main_content.find_all(RELEVANT_TAGS):
+        builder.add(tag.name, tag.get_text, lambda tag=tag: [li.get_text() for li in tag.find_all('li')])
+    return builder.finish(), metrics
+
+# --- Backend 2: lxml (libxml2), liefert dieselbe page_data-Struktur deutlich schneller ---
+# Bei fehlerhaftem HTML weicht lxml bewusst ab und folgt dem Browser statt html.parser:
+# - Nicht geschlossene <p> (und <li>, <td> ...) schließt libxml2 implizit. html.parser verschachtelt
+#   sie, so dass jeder Absatz zusätzlich den Text aller folgenden Absätze enthält. Ebenso beendet
+#   eine Überschrift einen offenen Absatz, statt in ihm zu landen.
+# - <![CDATA[...]]> im Body verwirft libxml2 wie der Browser; html.parser behandelt ihn als Text.
+# - Markup in <title> ist bei lxml wörtlicher Titeltext ("A <b>B</b>"), html.parser liefert "".
+# Der Inhalt von <template> zählt in beiden Backends nicht als Text. tests/test_parser.py
+# prüft diese Fälle (GOLDEN_CASES) mit der erwarteten lxml-Ausgabe.
+
+def _lxml_string(element) -> Optional[str]:
+    """Entspricht BeautifulSoups Tag.string: Text nur dann, wenn das Element genau ein Kind hat."""
+    text = element.text or ""
+    if len(element) == 0:
+        return text or None
+    if len(element) == 1 and not text and not element[0].tail:
+        child = element[0]
+        if not isinstance(child.tag, str):
+            return child.text
+        return _lxml_string(child)
+    return None
+
+def _lxml_document(html_content: str):
+    """Parst das Dokument und entfernt die Boilerplate-Tags. Gibt None für leere Dokumente zurück."""
+    return _lxml_document_with_merges(html_content)[0]
+
+def _lxml_document_with_merges(html_content: str) -> tuple[Any, int]:
+    """
+    Wie _lxml_document, zählt aber zusätzlich, wie oft im <body> beim Entfernen eines Tags zwei
+    reine Leerraum-Strings zu einem verschmolzen sind. BeautifulSoups decompose() lässt beide
+    stehen, str(body) gibt also je ein Zeichen mehr aus (für die Body-Größe in _analyze_with_lxml).
+    """
+    html_content = _XML_DECLARATION_PATTERN.sub('', html_content, count=1)
+    if not html_content.strip():
+        return None, 0
+    try:
+        root = lxml.html.document_fromstring(html_content)
+    except etree.ParserError:
+        return None, 0
+    whitespace_merges = 0
+    for element in list(root.iter(*STRIPPED_TAGS)):
+        if element.tail and element.tail.isspace() and _in_collapsed_body_text(element):
+            previous = element.getprevious()
+            preceding_text = previous.tail if previous is not None else element.getparent().text
+            if preceding_text and preceding_text.isspace():
+                whitespace_merges += 1
+        element.drop_tree()
+    return root, whitespace_merges
+
+def _in_collapsed_body_text(element) -> bool:
+    ancestors = {ancestor.tag for ancestor in element.iterancestors()}
+    return 'body' in ancestors and not ancestors & _WHITESPACE_PRESERVING_TAGS
+
+def clean_body_html(html_content: str) -> str:
+    """
+    Bereinigter <body>-Teilbaum als Eingabe für den LLM-Parser: ohne STRIPPED_TAGS, Medien,
+    Kommentare, Attribute, Inline-Markup und leere Elemente, mit zusammengefassten Leerzeichen.
+    Die Überschriften- und Absatzstruktur bleibt erhalten, der Prompt wird aber deutlich kleiner.
+    """
+    root = _lxml_document(html_content)
+    if root is None:
+        return ""
+    body = next(root.iter('body'), root)
+    etree.strip_elements(body, etree.Comment, etree.ProcessingInstruction, *LLM_STRIPPED_TAGS, with_tail=False)
+    etree.strip_tags(body, *_LLM_UNWRAPPED_TAGS)
+    # Von innen nach außen, damit auch Container verschwinden, die nur leere Elemente enthielten.
+    for element in reversed(list(body.iter())):
+        element.attrib.clear()
+        if element is not body and len(element) == 0 and not (element.text or "").strip() and element.tag not in _VOID_TAGS:
+            element.drop_tree()
+    return _clean_text(lxml.html.tostring(body, encoding='unicode'))
+
+def _lxml_head_fields(root) -> tuple[str, str, str]:
+    title_tag = next(root.iter('title'), None)
+    h1_tag = next(root.iter('h1'), None)
+    meta_desc_tag = next((meta for meta in root.iter('meta') if meta.get('name') == 'description'), None)
+    page_title = _clean_text(_lxml_string(title_tag) if title_tag is not None else "")
+    h1 = _clean_text(_lxml_string(h1_tag) if h1_tag is not None else "")
+    meta_description = _clean_text(meta_desc_tag.get('content', '') if meta_desc_tag is not None else "")
+    return page_title, meta_description, h1
+
+def _serialized_text_size(text: str, preserve_whitespace: bool = False) -> int:
+    """
+    Länge eines Textknotens wie in str(tag): &, < und > escaped. BeautifulSoup kürzt reine
+    Leerraum-Strings außerhalb von <pre>/<textarea> auf ein Zeichen ("\n" oder " "), deshalb
+    zählt Einrückung zwischen den Tags hier auch nur einmal.
+    """
+    if not preserve_whitespace and text.isspace():
+        return 1
+    return len(text) + 4 * text.count('&') + 3 * (text.count('<') + text.count('>'))
+
+def _serialized_attribute_size(tag: str, name: str, value: str) -> int:
+    """
+    Länge von ' name="value"' wie bei str(tag). Listen-Attribute wie class gibt BeautifulSoup mit
+    einfachen Leerzeichen aus; enthält der Wert beide Anführungszeichen, wird " zu &quot;.
+    Ein Boolean-Attribut mit seinem Namen als Wert zählt wie ohne Wert (disabled=""): lxml
+    unterscheidet <input disabled> nicht von <input disabled="disabled">. Im zweiten Fall ist
+    body_size deshalb um len(name) kleiner als bei html.parser.
+    """
+    if name in _BOOLEAN_ATTRIBUTES and value == name:
+        value = ""
+    if name in _LIST_ATTRIBUTES['*'] or name in _LIST_ATTRIBUTES.get(tag, ()):
+        value = " ".join(value.split())
+    quote_escapes = 5 * value.count('"') if '"' in value and "'" in value else 0
+    return len(name) + 4 + _serialized_text_size(value, preserve_whitespace=True) + quote_escapes
+
+def _lxml_text(element) -> str:
+    """text_content() ohne den Inhalt von <template>, den auch BeautifulSoups get_text() auslässt."""
+    if element.find('.//template') is None and next(element.iterancestors('template'), None) is None:
+        return element.text_content()
+    if element.tag == 'template' or next(element.iterancestors('template'), None) is not None:
+        return ""
+    parts = [element.text or ""]
+    for child in element:
+        if isinstance(child.tag, str):
+            parts.append(_lxml_text(child))
+        parts.append(child.tail or "")
+    return "".join(parts)
+
+def _lxml_body(root, html_content: str):
+    # libxml2 ergänzt ein fehlendes <body>; html.parser nicht. Für identische Ergebnisse zählt nur ein echtes <body>.
+    if not _BODY_TAG_PATTERN.search(html_content):
+        return None
+    return next(root.iter('body'), None)
+
+def _parse_with_lxml(html_content: str, url: str) -> Dict[str, Any]:
+    root = _lxml_document(html_content)
+    if root is None: return _empty_page_data(url)
+    page_title, meta_description, h1 = _lxml_head_fields(root)
+    page_data = _empty_page_data(url, page_title, meta_description, h1)
+    main_content = next(root.iter('main'), None)
+    if main_content is None: main_content = _lxml_body(root, html_content)
+    if main_content is None: return page_data
+    builder = _ContentBuilder(page_data)
+    for tag in main_content.iter(*RELEVANT_TAGS):
+        _add_lxml_tag(builder, tag)
+    return builder.finish()
+
+def _add_lxml_tag(builder: _ContentBuilder, tag) -> None:
+    builder.add(tag.tag, lambda: _lxml_text(tag), lambda: [_lxml_text(li) for li in tag.iter('li')])
+
+def _analyze_with_lxml(html_content: str, url: str) -> tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Fusionierte Seitenanalyse: Ein einziger Durchlauf über <body> liefert sowohl die page_data als
+    auch die Kennzahlen für den Confidence-Score (Tag-Zählungen, Textlänge, Body-Größe).
+    Die Body-Größe wird beim Durchlauf aus Tags, Attributen und Text aufsummiert, statt den
+    Body zu serialisieren. Sie ist eine Näherung an len(str(body)) von BeautifulSoup, damit
+    SCORER_BODY_SIZE_THRESHOLD_SMALL für beide Backends gleich greift. Bekannte Abweichung:
+    ausgeschriebene Boolean-Attribute (selected="selected") zählen pro Vorkommen len(name)
+    Zeichen zu wenig (siehe _serialized_attribute_size), also 5 bis 8 Zeichen je Attribut. Der
+    Score weicht nur ab, wenn body_size bei html.parser um weniger als diese Summe über der
+    Schwelle liegt.
+    """
+    root, whitespace_merges = _lxml_document_with_merges(html_content)
+    if root is None: return _empty_page_data(url), _page_metrics(has_body=False)
+    page_title, meta_description, h1 = _lxml_head_fields(root)
+    builder = _ContentBuilder(_empty_page_data(url, page_title, meta_description, h1))
+    main_content = next(root.iter('main'), None)
+    body = _lxml_body(root, html_content)
+
+    if body is None:
+        if main_content is not None:
+            for tag in main_content.iter(*RELEVANT_TAGS):
+                _add_lxml_tag(builder, tag)
+        return builder.finish(), _page_metrics(has_body=False)
+
+    content_root = main_content if main_content is not None else body
+    in_content = content_root is body
+    relevant_tags = set(RELEVANT_TAGS)
+    semantic_tags = set(SEMANTIC_TAGS)
+    semantic_count = div_count = all_tags_count = 0
+    body_size = whitespace_merges
+    # Verschachtelungstiefe in <pre>/<textarea> (Leerraum bleibt erhalten) und <template> (Text unsichtbar).
+    preserve_depth = template_depth = 0
+    text_parts: List[str] = []
+
+    def add_text(text: str) -> None:
+        nonlocal body_size
+        if not template_depth:
+            text_parts.append(text)
+        body_size += _serialized_text_size(text, preserve_depth > 0)
+
+    for event, element in etree.iterwalk(body, events=("start", "end", "comment", "pi")):
+        if event in ("comment", "pi"):
+            # Kommentare zählen nicht zum Text, wohl aber zur Größe; ihr Tail ist normaler Text.
+            comment = element.text or ""
+            body_size += (1 if comment.isspace() and not preserve_depth else len(comment)) + 7
+            if element.tail:
+                add_text(element.tail)
+            continue
+        if event == "end":
+            if element is content_root and content_root is not body:
+                in_content = False
+            if element.tag not in _VOID_TAGS:
+                body_size += len(element.tag) + 3
+            if element.tag in _WHITESPACE_PRESERVING_TAGS: preserve_depth -= 1
+            elif element.tag == 'template': template_depth -= 1
+            if element is not body and element.tail:
+                add_text(element.tail)
+            continue
+
+        if element is content_root:
+            in_content = True
+        if element is not body:
+            all_tags_count += 1
+            if element.tag in semantic_tags: semantic_count += 1
+            elif element.tag == 'div': div_count += 1
+        if element.tag in _WHITESPACE_PRESERVING_TAGS: preserve_depth += 1
+        elif element.tag == 'template': template_depth += 1
+        if element.text:
+            add_text(element.text)
+        body_size += len(element.tag) + (3 if element.tag in _VOID_TAGS else 2) + sum(_serialized_attribute_size(element.tag, name, value) for name, value in element.attrib.items())
+        if in_content and element.tag in relevant_tags:
+            _add_lxml_tag(builder, element)
+
+    metrics = _page_metrics(
+        has_body=True,
+        semantic_count=semantic_count,
+        div_count=div_count,
+        all_tags_count=all_tags_count,
+        text_length=len(_clean_text("".join(text_parts))),
+        body_size=body_size
+    )
+    return builder.finish(), metrics
+
+class _ParserBackend(NamedTuple):
+    parse: Callable[[str, str], Dict[str, Any]]
+    analyze: Callable[[str, str], tuple[Dict[str, Any], Dict[str, Any]]]
+
+PARSER_BACKENDS: Dict[str, _ParserBackend] = {
+    "html.parser": _ParserBackend(_parse_with_html_parser, _analyze_with_html_parser),
+    "lxml": _ParserBackend(_parse_with_lxml, _analyze_with_lxml),
+}
+
+def _get_backend(backend: Optional[str]) -> _ParserBackend:
+    backend_name = backend or settings.PARSER_BACKEND
+    if backend_name not in PARSER_BACKENDS:
+        raise ValueError(f"Unbekanntes Parser-Backend '{backend_name}'. Erlaubt: {', '.join(PARSER_BACKENDS)}")
+    return PARSER_BACKENDS[backend_name]
+
+def parse_html_to_json(html_content: str, url: str, backend: Optional[str] = None) -> Dict[str, Any]:
+    """Regelbasierter Parser. Das Backend kommt aus settings.PARSER_BACKEND, sofern nicht explizit angegeben."""
+    parser_backend = _get_backend(backend)
+    try:
+        return parser_backend.parse(html_content, url)
+    except Exception as e:
+        error_message = f"Rule-based parser failed unexpectedly: {e}"
+        _log_parser_error(url, html_content, error_message)
+        return {"url": url, "parsing_error": error_message}
+
+def analyze_page(html_content: str, url: str, backend: Optional[str] = None) -> tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Parst eine Seite genau einmal und liefert (page_data, metrics). Die Kennzahlen werden mit
+    confidence_scorer.score_metrics zum Confidence-Score verrechnet, ohne das HTML erneut zu parsen.
+    """
+    if not html_content:
+        return _empty_page_data(url), _page_metrics(has_body=False)
+    parser_backend = _get_backend(backend)
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        for tag in soup.find_all(['nav', 'footer', 'header', 'script', 'style', 'aside', 'form']):
-            tag.decompose()
-        page_title = _clean_text(soup.title.string if soup.title else "")
-        h1 = _clean_text(soup.h1.string if soup.h1 else "")
-        meta_desc_tag = soup.find('meta', attrs={'name': 'description'})
-        meta_description = _clean_text(meta_desc_tag.get('content', '') if meta_desc_tag else "")
-        page_data = {"url": url, "page_title": page_title, "meta_description": meta_description, "h1": h1, "intro_content": [], "content_structure": []}
-        main_content = soup.main if soup.main else soup.body
-        if not main_content: return page_data
-        content_structure: List[Dict[str, Any]] = []
-        current_section: Optional[Dict[str, Any]] = None
-        has_seen_h2 = False
-        relevant_tags = main_content.find_all(['h2', 'h3', 'p', 'ul', 'ol', 'blockquote'])
-        for tag in relevant_tags:
-            if tag.name == 'h2':
-                has_seen_h2 = True
-                if current_section: content_structure.append(current_section)
-                current_section = {"heading": _clean_text(tag.get_text()), "content_blocks": []}
-                continue
-            if not has_seen_h2:
-                intro_text = _clean_text(tag.get_text())
-                if intro_text: page_data["intro_content"].append(intro_text)
-                continue
-            if not current_section: current_section = {"heading": "", "content_blocks": []}
-            if tag.name in ('p', 'blockquote'):
-                text = _clean_text(tag.get_text())
-                if text: current_section["content_blocks"].append({"type": "paragraph", "text": text})
-            elif tag.name in ('ul', 'ol'):
-                items = [_clean_text(li.get_text()) for li in tag.find_all('li') if _clean_text(li.get_text())]
-                if items: current_section["content_blocks"].append({"type": "list", "items": items})
-            elif tag.name == 'h3':
-                text = _clean_text(tag.get_text())
-                if text: current_section["content_blocks"].append({"type": "subheading", "text": text})
-        if current_section and current_section["content_blocks"]:
-            content_structure.append(current_section)
-        page_data["content_structure"] = content_structure
-        return page_data
+        return parser_backend.analyze(html_content, url)
     except Exception as e:
         error_message = f"Rule-based parser failed unexpectedly: {e}"
         _log_parser_error(url, html_content, error_message)
-        return {"url": url, "parsing_error": error_message}
\ No newline at end of file
+        return {"url": url, "parsing_error": error_message}, _page_metrics(has_body=False)
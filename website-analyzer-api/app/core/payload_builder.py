@@ -0,0 +1,166 @@
+# app/core/payload_builder.py
+import copy
+import json
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.core import dedup, llm_client
+from app.core.config import settings
+
+# Kürzungsstufen für lange Seiten: (Absätze pro Abschnitt, Zeichen pro Absatz, Listenpunkte pro Liste)
+_CONTENT_TRIM_LEVELS = [(8, 800, 10), (4, 400, 6), (2, 200, 4), (1, 120, 2)]
+
+@dataclass
+class FinalPayload:
+    """Die für den finalen Analyse-Prompt serialisierten Website-Daten samt Kürzungsprotokoll."""
+    data: Dict[str, Any]
+    text: str
+    tokens: int
+    budget: int
+    original_tokens: int = 0  # Vor dem Kürzen
+    trimming_steps: List[Dict[str, Any]] = field(default_factory=list)
+    dedup_stats: Optional[dedup.DedupStats] = None
+
+    def report(self) -> Dict[str, Any]:
+        return {"budget_tokens": self.budget, "final_tokens": self.tokens, "steps": self.trimming_steps}
+
+def serialize(data: Any) -> str:
+    """Kompakte JSON-Serialisierung ohne Einrückung und Leerzeichen: spart gegenüber indent=2 viele Tokens."""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+def _deduplicated(data: Dict[str, Any]) -> Tuple[Dict[str, Any], Optional[dedup.DedupStats]]:
+    """Die zu serialisierende Fassung von data: wiederholte Inhaltsblöcke durch Verweise ersetzt (DEDUP_ENABLED)."""
+    if not settings.DEDUP_ENABLED or not data.get("seiten_inhalte"):
+        return data, None
+    pages, stats = dedup.deduplicate_pages(data["seiten_inhalte"])
+    return {**data, "seiten_inhalte": pages}, stats
+
+def _summarize_excluded_pages(data: Dict[str, Any]) -> Optional[str]:
+    excluded = data.get("ausgeschlossene_seiten")
+    if not isinstance(excluded, list) or not excluded:
+        return None
+    data["ausgeschlossene_seiten"] = {"anzahl": len(excluded)}
+    return f"{len(excluded)} ausgeschlossene URLs durch ihre Anzahl ersetzt"
+
+def _factor_common_links(data: Dict[str, Any]) -> Optional[str]:
+    """Links, die auf mindestens der Hälfte aller Seiten vorkommen (Navigation, Footer), nur einmal aufführen."""
+    link_map = data.get("link_struktur")
+    if not isinstance(link_map, dict) or len(link_map) < 2 or "gemeinsame_links" in link_map:
+        return None
+    occurrences = Counter(link for links in link_map.values() for link in set(links))
+    common = sorted(link for link, count in occurrences.items() if count >= len(link_map) / 2)
+    if not common:
+        return None
+    common_set = set(common)
+    data["link_struktur"] = {
+        "gemeinsame_links": common,
+        "seiten": {url: sorted(set(links) - common_set) for url, links in link_map.items()}
+    }
+    return f"{len(common)} wiederkehrende Navigations-Links zusammengefasst"
+
+def _shorten_failures(data: Dict[str, Any]) -> Optional[str]:
+    failures = data.get("parsing_fehlschlaege")
+    if not isinstance(failures, list) or not failures or not isinstance(failures[0], dict):
+        return None
+    data["parsing_fehlschlaege"] = [failure.get("url") for failure in failures]
+    return f"Fehlerbegründungen von {len(failures)} Seiten entfernt"
+
+def _drop_link_map(data: Dict[str, Any]) -> Optional[str]:
+    if not data.get("link_struktur"):
+        return None
+    data["link_struktur"] = {}
+    return "Link-Struktur entfernt"
+
+def _trim_page_content(page: Dict[str, Any], max_paragraphs: int, max_chars: int, max_items: int) -> int:
+    """Kürzt die Abschnitte einer Seite von hinten; gibt die Zahl der gekürzten Blöcke zurück."""
+    trimmed = 0
+    for section in page.get("content_structure", []):
+        kept_blocks, paragraphs = [], 0
+        for block in section.get("content_blocks", []):
+            if block.get("type") == "paragraph":
+                paragraphs += 1
+                if paragraphs > max_paragraphs:
+                    trimmed += 1
+                    continue
+                if len(block.get("text", "")) > max_chars:
+                    block = {**block, "text": block["text"][:max_chars].rstrip() + " …"}
+                    trimmed += 1
+            elif block.get("type") == "list" and len(block.get("items", [])) > max_items:
+                block = {**block, "items": block["items"][:max_items]}
+                trimmed += 1
+            kept_blocks.append(block)
+        section["content_blocks"] = kept_blocks
+    intro = page.get("intro_content")
+    if isinstance(intro, list) and len(intro) > max_paragraphs:
+        trimmed += len(intro) - max_paragraphs
+        page["intro_content"] = intro[:max_paragraphs]
+    return trimmed
+
+def _content_trimmer(level: int) -> Callable[[Dict[str, Any]], Optional[str]]:
+    max_paragraphs, max_chars, max_items = _CONTENT_TRIM_LEVELS[level]
+
+    def trim(data: Dict[str, Any]) -> Optional[str]:
+        trimmed = sum(_trim_page_content(page, max_paragraphs, max_chars, max_items) for page in data.get("seiten_inhalte", []))
+        if not trimmed:
+            return None
+        return f"{trimmed} Inhaltsblöcke gekürzt (max. {max_paragraphs} Absätze à {max_chars} Zeichen pro Abschnitt)"
+    return trim
+
+# Reihenfolge = geringster Informationswert zuerst.
+_TRIM_STEPS: List[Callable[[Dict[str, Any]], Optional[str]]] = [
+    _summarize_excluded_pages,
+    _factor_common_links,
+    _shorten_failures,
+    *[_content_trimmer(level) for level in range(len(_CONTENT_TRIM_LEVELS))],
+    _drop_link_map,
+]
+
+def build_final_payload(structured_data: Dict[str, Any], budget: Optional[int] = None) -> FinalPayload:
+    """
+    Serialisiert die Daten für FINAL_ANALYZER_PROMPT kompakt und hält ein Token-Budget ein
+    (FINAL_ANALYSIS_PAYLOAD_TOKEN_BUDGET, lokal geschätzt). Solange das Budget überschritten ist,
+    werden die Blöcke mit dem geringsten Informationswert zuerst gekürzt und als letzter Ausweg
+    Seiten vom Ende der Liste entfernt. Jeder Schritt wird im Kürzungsprotokoll festgehalten.
+
+    Gekürzt wird der vollständige Inhalt; serialisiert wird er nach jedem Schritt neu dedupliziert.
+    So zeigt jeder Duplikat-Verweis auf einen Block, der im Payload tatsächlich noch steht, auch
+    wenn die Kürzung oder die Gruppierung im Map-Schritt das erste Vorkommen entfernt hat.
+    """
+    budget = budget if budget is not None else settings.FINAL_ANALYSIS_PAYLOAD_TOKEN_BUDGET
+    data = copy.deepcopy(structured_data)
+    view, dedup_stats = _deduplicated(data)
+    text = serialize(view)
+    tokens = original_tokens = llm_client.estimate_tokens(text)
+    steps: List[Dict[str, Any]] = []
+
+    def record(description: str) -> None:
+        nonlocal view, dedup_stats, text, tokens
+        view, dedup_stats = _deduplicated(data)
+        new_text = serialize(view)
+        new_tokens = llm_client.estimate_tokens(new_text)
+        steps.append({"step": description, "tokens_before": tokens, "tokens_after": new_tokens})
+        text, tokens = new_text, new_tokens
+
+    for trim_step in _TRIM_STEPS:
+        if tokens <= budget:
+            break
+        description = trim_step(data)
+        if description:
+            record(description)
+
+    pages = data.get("seiten_inhalte", [])
+    dropped_pages = []
+    while tokens > budget and len(pages) > 1:
+        dropped_pages.append(pages.pop().get("url"))
+        if view is not data:
+            # Verweise zeigen nur auf frühere Seiten, die letzte Seite entfällt also ohne neue Deduplizierung.
+            view["seiten_inhalte"].pop()
+        text = serialize(view)
+        tokens = llm_client.estimate_tokens(text)
+    if dropped_pages:
+        steps.append({"step": f"{len(dropped_pages)} Seiten entfernt", "urls": dropped_pages, "tokens_after": tokens})
+
+    if steps:
+        print(f"✂️ Analyse-Payload auf {tokens} von {budget} Tokens gekürzt ({len(steps)} Schritte).")
+    return FinalPayload(data=view, text=text, tokens=tokens, budget=budget, original_tokens=original_tokens, trimming_steps=steps, dedup_stats=dedup_stats)
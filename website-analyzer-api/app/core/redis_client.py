@@ -0,0 +1,125 @@
+# app/core/redis_client.py
+import asyncio
+import time
+import weakref
+from typing import Optional, Tuple
+
+import redis.asyncio as aioredis
+
+from app.core.config import settings
+
+# Wie beim HTTP-Client: Ein Redis-Client pro Event-Loop, da die Verbindungen loop-gebunden sind.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aioredis.Redis]" = weakref.WeakKeyDictionary()
+
+def get_redis() -> aioredis.Redis:
+    """Gibt den Redis-Client für Caches (eigene DB, getrennt vom Celery-Broker) zurück."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = aioredis.Redis(
+            host=settings.REDIS_HOST,
+            port=6379,
+            db=settings.REDIS_CACHE_DB,
+            socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+            socket_timeout=settings.REDIS_SOCKET_TIMEOUT
+        )
+        _clients[loop] = client
+    return client
+
+async def close_redis() -> None:
+    """Schließt den Redis-Client des aktuellen Event-Loops."""
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+class RedisLruCache:
+    """
+    Größenbegrenzter Cache in Redis, den sich alle Worker-Prozesse teilen.
+
+    Jeder Eintrag besteht aus Metadaten (String) und einem Body (Bytes). Die letzte Nutzung wird in
+    einem Sorted Set gepflegt; überschreitet die Gesamtgröße max_bytes, werden die am längsten nicht
+    genutzten Einträge verdrängt. Zusätzlich läuft jeder Eintrag nach ttl_seconds ab. Die Buchführung
+    ist nicht transaktional über mehrere Worker hinweg und damit bewusst nur annähernd exakt.
+    """
+
+    def __init__(self, namespace: str, max_bytes: int, ttl_seconds: int):
+        self.namespace = namespace
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+    def _entry_key(self, key: str) -> str:
+        return f"{self.namespace}:entry:{key}"
+
+    @property
+    def _lru_key(self) -> str:
+        return f"{self.namespace}:lru"
+
+    @property
+    def _sizes_key(self) -> str:
+        return f"{self.namespace}:sizes"
+
+    @property
+    def _total_key(self) -> str:
+        return f"{self.namespace}:total"
+
+    async def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        """Liefert (metadaten, body) oder None und markiert den Eintrag als zuletzt genutzt."""
+        redis = get_redis()
+        entry = await redis.hgetall(self._entry_key(key))
+        if not entry:
+            await self._forget(key)
+            return None
+        await redis.zadd(self._lru_key, {key: time.time()})
+        return entry[b"meta"].decode("utf-8"), entry.get(b"body", b"")
+
+    async def set(self, key: str, meta: str, body: bytes) -> None:
+        redis = get_redis()
+        size = len(body) + len(meta)
+        previous_size = await redis.hget(self._sizes_key, key)
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._entry_key(key), mapping={"meta": meta, "body": body})
+            pipe.expire(self._entry_key(key), self.ttl_seconds)
+            pipe.zadd(self._lru_key, {key: time.time()})
+            pipe.hset(self._sizes_key, key, size)
+            pipe.incrby(self._total_key, size - int(previous_size or 0))
+            await pipe.execute()
+        await self._evict()
+
+    async def touch(self, key: str, meta: str) -> None:
+        """Aktualisiert nur die Metadaten (z.B. nach einer erfolgreichen Revalidierung)."""
+        redis = get_redis()
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.hset(self._entry_key(key), "meta", meta)
+            pipe.expire(self._entry_key(key), self.ttl_seconds)
+            pipe.zadd(self._lru_key, {key: time.time()})
+            await pipe.execute()
+
+    async def _forget(self, key: str) -> None:
+        """Räumt die Buchführung für einen (z.B. per TTL abgelaufenen) Eintrag auf."""
+        redis = get_redis()
+        size = await redis.hget(self._sizes_key, key)
+        if size is None:
+            return
+        async with redis.pipeline(transaction=True) as pipe:
+            pipe.delete(self._entry_key(key))
+            pipe.zrem(self._lru_key, key)
+            pipe.hdel(self._sizes_key, key)
+            pipe.decrby(self._total_key, int(size))
+            await pipe.execute()
+
+    async def _evict(self) -> None:
+        redis = get_redis()
+        total = int(await redis.get(self._total_key) or 0)
+        while total > self.max_bytes:
+            oldest = await redis.zpopmin(self._lru_key, 16)
+            if not oldest:
+                break
+            for member, _ in oldest:
+                key = member.decode("utf-8")
+                size = int(await redis.hget(self._sizes_key, key) or 0)
+                async with redis.pipeline(transaction=True) as pipe:
+                    pipe.delete(self._entry_key(key))
+                    pipe.hdel(self._sizes_key, key)
+                    pipe.decrby(self._total_key, size)
+                    await pipe.execute()
+                total -= size
@@ -0,0 +1,101 @@
+# app/core/robots.py
+import asyncio
+import json
+from dataclasses import dataclass, field
+from typing import List, Optional
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+from app.core import http_client
+from app.core.config import settings
+from app.core.redis_client import get_redis
+
+@dataclass
+class RobotsPolicy:
+    """Die geparsten robots.txt-Regeln eines Origins (Schema + Host)."""
+    origin: str
+    parser: RobotFileParser
+    reachable: bool = True
+    sitemaps: List[str] = field(default_factory=list)
+
+    def can_fetch(self, url: str) -> bool:
+        return self.parser.can_fetch(settings.CRAWLER_USER_AGENT, url)
+
+    @property
+    def crawl_delay(self) -> float:
+        """Crawl-delay für unseren User-Agent, begrenzt auf ROBOTS_MAX_CRAWL_DELAY."""
+        delay = self.parser.crawl_delay(settings.CRAWLER_USER_AGENT)
+        if delay is None:
+            rate = self.parser.request_rate(settings.CRAWLER_USER_AGENT)
+            delay = rate.seconds / rate.requests if rate and rate.requests else 0
+        return min(float(delay or 0), settings.ROBOTS_MAX_CRAWL_DELAY)
+
+def get_origin(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+def _build_policy(origin: str, record: dict) -> RobotsPolicy:
+    parser = RobotFileParser(f"{origin}/robots.txt")
+    status = record.get("status")
+    if record.get("unreachable"):
+        # Nicht erreichbare robots.txt: wie "keine Regeln", damit ein hängender Server nicht den Job blockiert.
+        parser.allow_all = True
+    elif status in (401, 403):
+        parser.disallow_all = True
+    elif status is not None and status >= 400:
+        parser.allow_all = True
+    else:
+        parser.parse(record.get("lines", []))
+    # RobotFileParser.can_fetch() liefert ohne Zeitstempel immer False.
+    parser.modified()
+    return RobotsPolicy(
+        origin=origin,
+        parser=parser,
+        reachable=not record.get("unreachable", False),
+        sitemaps=list(parser.site_maps() or [])
+    )
+
+async def _download(origin: str) -> dict:
+    try:
+        response = await asyncio.wait_for(
+            http_client.fetch(f"{origin}/robots.txt", timeout=settings.ROBOTS_FETCH_TIMEOUT),
+            timeout=settings.ROBOTS_FETCH_TIMEOUT
+        )
+    except Exception as e:
+        print(f"Konnte robots.txt für {origin} nicht lesen: {e!r}")
+        return {"unreachable": True}
+    if response.status_code >= 500:
+        print(f"robots.txt für {origin} lieferte HTTP {response.status_code}.")
+        return {"unreachable": True}
+    if response.status_code >= 400:
+        return {"status": response.status_code}
+    return {"status": response.status_code, "lines": response.text.splitlines()}
+
+async def get_policy(url: str) -> RobotsPolicy:
+    """
+    Liefert die robots.txt-Regeln für den Origin einer URL.
+
+    Die Rohregeln werden in Redis für alle Worker-Prozesse zwischengespeichert
+    (ROBOTS_CACHE_TTL_SECONDS). Nicht erreichbare robots.txt-Dateien werden kürzer negativ
+    gecacht (ROBOTS_NEGATIVE_CACHE_TTL_SECONDS), damit nicht jeder Job erneut auf den Timeout wartet.
+    """
+    origin = get_origin(url)
+    cache_key = f"robots:{origin}"
+    redis = None
+    try:
+        redis = get_redis()
+        cached = await redis.get(cache_key)
+        if cached:
+            return _build_policy(origin, json.loads(cached))
+    except Exception as e:
+        print(f"⚠️ Robots-Cache nicht erreichbar: {e}")
+        redis = None
+
+    record = await _download(origin)
+    if redis is not None:
+        ttl = settings.ROBOTS_NEGATIVE_CACHE_TTL_SECONDS if record.get("unreachable") else settings.ROBOTS_CACHE_TTL_SECONDS
+        try:
+            await redis.set(cache_key, json.dumps(record), ex=ttl)
+        except Exception as e:
+            print(f"⚠️ Robots-Cache konnte {origin} nicht speichern: {e}")
+    return _build_policy(origin, record)
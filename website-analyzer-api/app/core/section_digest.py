@@ -0,0 +1,80 @@
+# app/core/section_digest.py
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.core import analyzer, llm_client, payload_builder
+from app.core.config import settings
+from app.core.crawler import get_collection_key
+
+# Reihenfolge der Gruppen im Reduce-Schritt: Kernbotschaft zuerst.
+_CATEGORY_ORDER = ['Core_Messaging', 'Supporting_Content', 'Hard_to_read']
+
+@dataclass
+class PageGroup:
+    """Seiten einer Kategorie aus einer oder mehreren Collections, die gemeinsam verdichtet werden."""
+    category: str
+    collections: List[str] = field(default_factory=list)
+    pages: List[Dict[str, Any]] = field(default_factory=list)
+    tokens: int = 0
+
+    @property
+    def name(self) -> str:
+        return f"{self.category}: {', '.join(self.collections)}"
+
+def group_pages(pages: List[Dict[str, Any]], classifications: Dict[str, Dict[str, str]], token_budget: Optional[int] = None) -> List[PageGroup]:
+    """
+    Gruppiert die Seiten nach Klassifizierungs-Kategorie und darin nach Collection. Collections
+    derselben Kategorie werden zusammengelegt, solange die Gruppe unter token_budget
+    (MAP_REDUCE_GROUP_TOKEN_BUDGET) bleibt; größere Collections werden auf mehrere Gruppen verteilt.
+    """
+    token_budget = token_budget if token_budget is not None else settings.MAP_REDUCE_GROUP_TOKEN_BUDGET
+    by_category: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+    for page in pages:
+        url = page.get("url", "")
+        category = classifications.get(url, {}).get("category", "Supporting_Content")
+        by_category.setdefault(category, {}).setdefault(get_collection_key(url), []).append(page)
+
+    groups: List[PageGroup] = []
+    categories = sorted(by_category, key=lambda category: _CATEGORY_ORDER.index(category) if category in _CATEGORY_ORDER else len(_CATEGORY_ORDER))
+    for category in categories:
+        group = PageGroup(category)
+        for collection, collection_pages in by_category[category].items():
+            for page in collection_pages:
+                page_tokens = llm_client.estimate_tokens(payload_builder.serialize(page))
+                if group.pages and group.tokens + page_tokens > token_budget:
+                    groups.append(group)
+                    group = PageGroup(category)
+                if collection not in group.collections:
+                    group.collections.append(collection)
+                group.pages.append(page)
+                group.tokens += page_tokens
+        if group.pages:
+            groups.append(group)
+    return groups
+
+async def summarize_groups(groups: List[PageGroup], use_cache: bool = True) -> Tuple[List[Dict[str, Any]], List[PageGroup]]:
+    """
+    Map-Schritt: verdichtet alle Gruppen parallel (begrenzt durch llm_client). Liefert die Digests
+    und die Gruppen, deren Verdichtung fehlgeschlagen ist.
+    """
+    async def summarize(group: PageGroup) -> Optional[Dict[str, Any]]:
+        group_payload = payload_builder.build_final_payload({"seiten_inhalte": group.pages}, budget=settings.MAP_REDUCE_GROUP_TOKEN_BUDGET)
+        return await analyzer.summarize_section(group.name, group_payload, use_cache=use_cache)
+
+    digests, failed_groups = [], []
+    for group, digest in zip(groups, await asyncio.gather(*[summarize(group) for group in groups])):
+        if digest is None:
+            failed_groups.append(group)
+            continue
+        # Zuordnung kommt aus dem Code, nicht vom LLM: spart Output-Tokens und bleibt verlässlich.
+        digests.append({"section": ", ".join(group.collections), "category": group.category, "pages": [page.get("url") for page in group.pages], **digest})
+    return digests, failed_groups
+
+def build_reduce_input(final_data_input: Dict[str, Any], digests: List[Dict[str, Any]], failed_groups: List[PageGroup]) -> Dict[str, Any]:
+    """Eingabe des Reduce-Schritts: Digests statt Seiteninhalte; nur Seiten fehlgeschlagener Gruppen bleiben im Original."""
+    reduce_input = {key: value for key, value in final_data_input.items() if key != "seiten_inhalte"}
+    reduce_input["abschnitts_zusammenfassungen"] = digests
+    if failed_groups:
+        reduce_input["seiten_inhalte"] = [page for group in failed_groups for page in group.pages]
+    return reduce_input
@@ -0,0 +1,83 @@
+# app/core/similarity.py
+import hashlib
+import random
+import re
+from typing import Dict, Generic, Hashable, Iterable, List, Set, Tuple, TypeVar
+
+_WORD_PATTERN = re.compile(r"\w+")
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+Key = TypeVar("Key", bound=Hashable)
+
+def normalize_text(text: str) -> str:
+    """Kleinbuchstaben, nur Wörter, einfache Leerzeichen: Grundlage für exakte und unscharfe Vergleiche."""
+    return " ".join(_WORD_PATTERN.findall(text.lower()))
+
+def stable_hash(text: str) -> int:
+    """64-Bit-Hash, der anders als hash() über Prozesse hinweg stabil ist."""
+    return int.from_bytes(hashlib.blake2b(text.encode("utf-8"), digest_size=8).digest(), "big")
+
+def shingles(normalized_text: str, size: int = 3) -> Set[int]:
+    """Menge der gehashten Wort-Shingles (überlappende Folgen von size Wörtern)."""
+    words = normalized_text.split()
+    if len(words) <= size:
+        return {stable_hash(" ".join(words))} if words else set()
+    return {stable_hash(" ".join(words[i:i + size])) for i in range(len(words) - size + 1)}
+
+class MinHasher:
+    """MinHash-Signaturen zur Schätzung der Jaccard-Ähnlichkeit zweier Shingle-Mengen."""
+
+    def __init__(self, num_perm: int = 32, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._permutations = [(rng.randrange(1, _MERSENNE_PRIME), rng.randrange(0, _MERSENNE_PRIME)) for _ in range(num_perm)]
+
+    def signature(self, shingle_set: Iterable[int]) -> Tuple[int, ...]:
+        values = list(shingle_set)
+        if not values:
+            return (_MAX_HASH,) * self.num_perm
+        return tuple(
+            min(((a * value + b) % _MERSENNE_PRIME) & _MAX_HASH for value in values)
+            for a, b in self._permutations
+        )
+
+def estimate_jaccard(signature_a: Tuple[int, ...], signature_b: Tuple[int, ...]) -> float:
+    return sum(1 for a, b in zip(signature_a, signature_b) if a == b) / len(signature_a)
+
+class LshIndex(Generic[Key]):
+    """
+    Locality-Sensitive Hashing über MinHash-Signaturen: liefert Kandidaten, die sich in mindestens
+    einem Band gleichen, statt jede neue Signatur mit allen bisherigen zu vergleichen.
+    """
+
+    def __init__(self, bands: int, rows: int):
+        self.bands = bands
+        self.rows = rows
+        self._buckets: List[Dict[Tuple[int, ...], List[Key]]] = [{} for _ in range(bands)]
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> Iterable[Tuple[int, Tuple[int, ...]]]:
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def candidates(self, signature: Tuple[int, ...]) -> List[Key]:
+        found: Dict[Key, None] = {}
+        for band, band_key in self._band_keys(signature):
+            for key in self._buckets[band].get(band_key, ()):
+                found.setdefault(key)
+        return list(found)
+
+    def add(self, key: Key, signature: Tuple[int, ...]) -> None:
+        for band, band_key in self._band_keys(signature):
+            self._buckets[band].setdefault(band_key, []).append(key)
+
+def simhash(shingle_set: Iterable[int], bits: int = 64) -> int:
+    """SimHash-Fingerprint: ähnliche Shingle-Mengen ergeben Fingerprints mit kleinem Hamming-Abstand."""
+    weights = [0] * bits
+    for value in shingle_set:
+        for bit in range(bits):
+            weights[bit] += 1 if value >> bit & 1 else -1
+    return sum(1 << bit for bit, weight in enumerate(weights) if weight > 0)
+
+def hamming_distance(fingerprint_a: int, fingerprint_b: int) -> int:
+    return bin(fingerprint_a ^ fingerprint_b).count("1")
@@ -0,0 +1,157 @@
+# app/core/sitemap.py
+import asyncio
+import contextlib
+import time
+import zlib
+from collections import deque
+from typing import Iterator, List, Optional
+from xml.etree.ElementTree import ParseError, XMLPullParser
+
+from app.core import http_client, robots, url_canonicalizer
+from app.core.config import settings
+from app.core.robots import RobotsPolicy
+
+DEFAULT_SITEMAP_PATHS = ("/sitemap.xml", "/sitemap_index.xml")
+
+_GZIP_MAGIC = b"\x1f\x8b"
+_INFLATE_CHUNK_BYTES = 64 * 1024
+
+class _SitemapTooLarge(Exception):
+    pass
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+
+def _inflate(decompressor, chunk: bytes) -> Iterator[bytes]:
+    """Entpackt gzip stückweise, damit eine Zip-Bombe nie komplett im Speicher landet."""
+    data = decompressor.decompress(chunk, _INFLATE_CHUNK_BYTES)
+    while data:
+        yield data
+        if not decompressor.unconsumed_tail:
+            break
+        data = decompressor.decompress(decompressor.unconsumed_tail, _INFLATE_CHUNK_BYTES)
+
+class _SitemapReader:
+    """
+    Liest eine Sitemap (urlset oder sitemapindex) inkrementell mit XMLPullParser.
+    Verarbeitete Elemente werden sofort verworfen, der Speicherbedarf hängt also nicht von der Dateigröße ab.
+    """
+
+    def __init__(self):
+        self.page_urls: List[str] = []
+        self.child_sitemaps: List[str] = []
+        self.bytes_read = 0
+        self._parser = XMLPullParser(events=("start", "end"))
+        self._root = None
+        self._depth = 0
+        self._decompressor = None
+        self._first_chunk = True
+
+    def feed(self, chunk: bytes) -> None:
+        if self._first_chunk:
+            self._first_chunk = False
+            # *.xml.gz wird oft als application/gzip ohne Content-Encoding ausgeliefert.
+            if chunk.startswith(_GZIP_MAGIC):
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        pieces = _inflate(self._decompressor, chunk) if self._decompressor else (chunk,)
+        for piece in pieces:
+            self.bytes_read += len(piece)
+            if self.bytes_read > settings.SITEMAP_MAX_BYTES:
+                raise _SitemapTooLarge()
+            self._parser.feed(piece)
+            self._collect()
+
+    def close(self) -> None:
+        self._parser.close()
+        self._collect()
+
+    def _collect(self) -> None:
+        for event, element in self._parser.read_events():
+            if event == "start":
+                self._depth += 1
+                if self._root is None:
+                    self._root = element
+                continue
+            self._depth -= 1
+            name = _local_name(element.tag)
+            # Nur <loc> direkt unter <url>/<sitemap> zählt, nicht z.B. <image:loc> aus Erweiterungen.
+            if name == "loc" and self._depth == 2 and element.text:
+                target = self.child_sitemaps if _local_name(self._root.tag) == "sitemapindex" else self.page_urls
+                target.append(element.text.strip())
+            elif self._depth == 1:
+                self._root.remove(element)
+
+async def _read_sitemap(url: str, timings: Optional[http_client.RequestTimings], host_limits: Optional[http_client.HostLimits] = None, crawl_delay: float = 0.0) -> Optional[_SitemapReader]:
+    reader = _SitemapReader()
+    client = http_client.get_client()
+    slot = host_limits.slot(url, crawl_delay) if host_limits is not None else contextlib.nullcontext()
+    started = time.perf_counter()
+    try:
+        async with slot, client.stream("GET", url, timeout=settings.SITEMAP_FETCH_TIMEOUT) as response:
+            if response.status_code >= 400:
+                return None
+            async for chunk in response.aiter_bytes():
+                reader.feed(chunk)
+        reader.close()
+    except _SitemapTooLarge:
+        print(f"⚠️ Sitemap {url} überschreitet SITEMAP_MAX_BYTES, nur der gelesene Teil wird verwendet.")
+    except ParseError as e:
+        print(f"⚠️ Sitemap {url} ist kein gültiges XML: {e}")
+    except Exception as e:
+        print(f"Konnte Sitemap {url} nicht laden: {e!r}")
+        return None
+    if timings is not None:
+        elapsed = time.perf_counter() - started
+        timings.record(http_client.RequestTiming(url, response.status_code, response.http_version, elapsed, elapsed, reader.bytes_read))
+    return reader
+
+async def discover_urls(policy: RobotsPolicy, site: str, timings: Optional[http_client.RequestTimings] = None, host_limits: Optional[http_client.HostLimits] = None) -> List[str]:
+    """
+    Sammelt Seiten-URLs aus den Sitemaps einer Website, ohne eine einzige HTML-Seite zu laden.
+
+    Gelesen werden die Sitemap:-Zeilen der robots.txt sowie /sitemap.xml und /sitemap_index.xml.
+    Sitemap-Indizes werden in Breitensuche aufgelöst. Begrenzt durch SITEMAP_MAX_FILES,
+    SITEMAP_MAX_URLS und SITEMAP_MAX_BYTES pro Datei. Zurückgegeben werden nur kanonische
+    URLs derselben registrierbaren Domain, ohne Duplikate und in Fundreihenfolge.
+
+    Mit host_limits laufen die Sitemap-Abrufe unter denselben Grenzen wie die Seitenabrufe des
+    Crawlers, einschließlich des Crawl-delays aus der robots.txt des jeweiligen Hosts.
+    """
+    policies = {policy.origin: policy}
+    pending = deque(policy.sitemaps or [])
+    pending.extend(f"{policy.origin}{path}" for path in DEFAULT_SITEMAP_PATHS)
+    seen_sitemaps = set()
+    found: dict[str, None] = {}
+    files_read = 0
+
+    while pending and files_read < settings.SITEMAP_MAX_FILES and len(found) < settings.SITEMAP_MAX_URLS:
+        sitemap_url = pending.popleft().strip()
+        # Bewusst ohne Kanonisierung vergleichen: paginierte Sitemaps unterscheiden sich oft nur in der Query.
+        if not sitemap_url.startswith(("http://", "https://")) or sitemap_url in seen_sitemaps:
+            continue
+        seen_sitemaps.add(sitemap_url)
+        # Sitemaps dürfen auf anderen Hosts liegen (z.B. einem CDN); dort gilt deren robots.txt.
+        origin = robots.get_origin(sitemap_url)
+        if origin not in policies:
+            policies[origin] = await robots.get_policy(sitemap_url)
+        sitemap_policy = policies[origin]
+        if not sitemap_policy.can_fetch(sitemap_url):
+            continue
+
+        files_read += 1
+        reader = await _read_sitemap(sitemap_url, timings, host_limits, sitemap_policy.crawl_delay)
+        if reader is None:
+            continue
+        pending.extend(reader.child_sitemaps)
+        for page_url in reader.page_urls:
+            link = url_canonicalizer.canonicalize(page_url)
+            if link is not None and link.site == site:
+                found.setdefault(link.url)
+                if len(found) >= settings.SITEMAP_MAX_URLS:
+                    break
+        # Kooperativ bleiben, falls sehr viele kleine Sitemaps gelesen werden.
+        await asyncio.sleep(0)
+
+    if found:
+        print(f"🗺️ Sitemap-Discovery für {policy.origin}: {len(found)} URLs aus {files_read} abgefragten Sitemap-Dateien.")
+    return list(found)
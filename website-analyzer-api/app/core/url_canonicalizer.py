@@ -0,0 +1,143 @@
+# app/core/url_canonicalizer.py
+import ipaddress
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, NamedTuple, Optional
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+from app.core.config import settings
+
+# Offline mitgelieferte Public Suffix List (https://publicsuffix.org), damit kein Netzwerkzugriff nötig ist.
+PUBLIC_SUFFIX_LIST_PATH = Path(__file__).parent / "data" / "public_suffix_list.dat"
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+_TERMINAL = "$"      # Markiert im Trie das Ende einer Regel
+_EXCEPTION = "!"     # Markiert eine Ausnahmeregel (z.B. !city.kawasaki.jp)
+
+class CanonicalUrl(NamedTuple):
+    url: str
+    site: str
+
+def _to_ascii(label: str) -> str:
+    try:
+        return label.encode("idna").decode("ascii")
+    except UnicodeError:
+        return label
+
+@lru_cache(maxsize=1)
+def _suffix_trie() -> Dict[str, dict]:
+    """Kompiliert die Public Suffix List einmal pro Prozess in einen Trie über die umgekehrten Labels."""
+    trie: Dict[str, dict] = {}
+    with open(PUBLIC_SUFFIX_LIST_PATH, encoding="utf-8") as f:
+        for line in f:
+            rule = line.strip()
+            if not rule or rule.startswith("//"):
+                continue
+            is_exception = rule.startswith("!")
+            labels = [_to_ascii(label) for label in rule.lstrip("!").lower().split(".")]
+            node = trie
+            for label in reversed(labels):
+                node = node.setdefault(label, {})
+            node[_EXCEPTION if is_exception else _TERMINAL] = True
+    return trie
+
+def _public_suffix_length(labels: list[str]) -> int:
+    """
+    Anzahl der Labels (von rechts), die nach den PSL-Regeln das öffentliche Suffix bilden.
+    Es gewinnt die längste passende Regel; eine passende Ausnahmeregel hat immer Vorrang.
+    """
+    reversed_labels = labels[::-1]
+    suffix_length = 1  # Standardregel "*": unbekannte TLDs gelten als öffentliches Suffix
+    exception_length = None
+    pending = [(_suffix_trie(), 0)]
+    while pending:
+        node, depth = pending.pop()
+        if depth >= len(reversed_labels):
+            continue
+        label = reversed_labels[depth]
+        for key in (label, "*"):
+            child = node.get(key)
+            if child is None:
+                continue
+            if key == label and child.get(_EXCEPTION):
+                exception_length = depth
+            if child.get(_TERMINAL):
+                suffix_length = max(suffix_length, depth + 1)
+            pending.append((child, depth + 1))
+    return exception_length if exception_length is not None else suffix_length
+
+@lru_cache(maxsize=4096)
+def registrable_domain(host: str) -> str:
+    """
+    Liefert die registrierbare Domain ("eTLD+1"), z.B. 'example.co.uk' für 'shop.example.co.uk'.
+    IP-Adressen, 'localhost' und öffentliche Suffixe selbst werden unverändert zurückgegeben.
+    """
+    host = host.lower().rstrip(".")
+    if not host:
+        return ""
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+        return host
+    except ValueError:
+        pass
+    labels = [_to_ascii(label) for label in host.split(".")]
+    suffix_length = _public_suffix_length(labels)
+    if suffix_length >= len(labels):
+        return ".".join(labels)
+    return ".".join(labels[-(suffix_length + 1):])
+
+def _canonical_netloc(scheme: str, netloc: str) -> tuple[str, str]:
+    """Gibt (netloc, host) zurück: Host in Kleinbuchstaben, ohne abschließenden Punkt und ohne Standard-Port."""
+    userinfo, _, hostport = netloc.rpartition("@")
+    host, port = hostport, ""
+    if not hostport.endswith("]") and ":" in hostport:
+        host, _, port = hostport.rpartition(":")
+    host = host.lower().rstrip(".")
+    if port and (not port.isdigit() or int(port) == _DEFAULT_PORTS.get(scheme)):
+        port = ""
+    canonical = f"{host}:{port}" if port else host
+    return (f"{userinfo}@{canonical}" if userinfo else canonical), host
+
+def canonicalize_absolute(url: str) -> Optional[CanonicalUrl]:
+    """
+    Normalisiert eine absolute URL: Schema und Host in Kleinbuchstaben, Standard-Ports entfernt,
+    Query und Fragment entfernt, abschließender Schrägstrich entfernt. Nur http(s) ist erlaubt.
+    """
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS or not parts.netloc:
+        return None
+    netloc, host = _canonical_netloc(scheme, parts.netloc)
+    canonical_url = urlunsplit((scheme, netloc, parts.path, "", ""))
+    if canonical_url.endswith("/"):
+        canonical_url = canonical_url[:-1]
+    return CanonicalUrl(canonical_url, registrable_domain(host))
+
+@lru_cache(maxsize=settings.URL_CANONICALIZER_CACHE_SIZE)
+def _canonicalize_cached(base: str, href: str) -> Optional[CanonicalUrl]:
+    return canonicalize_absolute(urljoin(base, href) if base else href)
+
+def _memo_base(href: str, page_url: str) -> str:
+    """
+    Reduziert die Basis-URL auf das, wovon das Ergebnis wirklich abhängt. So treffen wiederkehrende
+    Navigations-Links auf jeder Seite denselben Memo-Eintrag, auch wenn die Seiten verschieden sind.
+    """
+    if href.startswith(("http://", "https://")):
+        return ""
+    parts = urlsplit(page_url)
+    if href.startswith("//"):
+        return f"{parts.scheme}:"
+    if href.startswith("/"):
+        return f"{parts.scheme}://{parts.netloc}"
+    return page_url
+
+def canonicalize(href: str, page_url: str = "") -> Optional[CanonicalUrl]:
+    """Löst einen (relativen) Link gegen page_url auf und normalisiert ihn. Gibt None für Nicht-http(s)-Links zurück."""
+    href = href.strip()
+    try:
+        return _canonicalize_cached(_memo_base(href, page_url) if page_url else "", href)
+    except ValueError:
+        return None
@@ -1,50 +1,153 @@
 # app/db/database.py
 
+import asyncio
+import threading
+import time
+import weakref
+from typing import Any, Dict
+
 import motor.motor_asyncio
 from beanie import init_beanie
+from pymongo import monitoring
 from app.core.config import settings
 from app.db.models import User, AnalysisJob # Importiert unsere Modelle
-import asyncio
 
-# Wir entfernen die globale Client-Variable, da sie die Ursache des Problems ist.
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """
+    Zählt die Verbindungen aller Motor-Clients des Prozesses mit. pymongo ruft die Methoden aus
+    seinen eigenen Threads auf, deshalb sind die Zähler durch ein Lock geschützt.
+    "wait_queue" sind Checkouts, die gestartet, aber noch nicht bedient wurden.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {"open": 0, "checked_out": 0, "wait_queue": 0, "created_total": 0, "checkout_failures_total": 0, "pool_clears_total": 0}
+
+    def _add(self, **deltas: int) -> None:
+        with self._lock:
+            for name, delta in deltas.items():
+                self._stats[name] += delta
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_closed(self, event): pass
+    def pool_cleared(self, event): self._add(pool_clears_total=1)
+    def connection_created(self, event): self._add(open=1, created_total=1)
+    def connection_ready(self, event): pass
+    def connection_closed(self, event): self._add(open=-1)
+    def connection_check_out_started(self, event): self._add(wait_queue=1)
+    def connection_check_out_failed(self, event): self._add(wait_queue=-1, checkout_failures_total=1)
+    def connection_checked_out(self, event): self._add(wait_queue=-1, checked_out=1)
+    def connection_checked_in(self, event): self._add(checked_out=-1)
+
+_pool_stats = PoolStatsListener()
+
+DOCUMENT_MODELS = [User, AnalysisJob]
+
+# Ein Client pro Event-Loop: Motor-Verbindungen sind an ihren Loop gebunden. API und Worker-Prozesse
+# haben je einen langlebigen Loop, der Client wird beim ersten Zugriff angelegt und danach wiederverwendet.
+_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, motor.motor_asyncio.AsyncIOMotorClient]" = weakref.WeakKeyDictionary()
+_initialized_loops: "weakref.WeakSet[asyncio.AbstractEventLoop]" = weakref.WeakSet()
+
+def _mongo_uri() -> str:
+    return f"mongodb://{settings.MONGO_INITDB_ROOT_USERNAME}:{settings.MONGO_INITDB_ROOT_PASSWORD}@{settings.MONGO_HOST}:{settings.MONGO_PORT}"
+
+def _build_client() -> motor.motor_asyncio.AsyncIOMotorClient:
+    return motor.motor_asyncio.AsyncIOMotorClient(
+        _mongo_uri(),
+        maxPoolSize=settings.MONGO_MAX_POOL_SIZE,
+        minPoolSize=settings.MONGO_MIN_POOL_SIZE,
+        maxIdleTimeMS=settings.MONGO_MAX_IDLE_TIME_MS,
+        serverSelectionTimeoutMS=settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        connectTimeoutMS=settings.MONGO_CONNECT_TIMEOUT_MS,
+        event_listeners=[_pool_stats]
+    )
+
+def get_client() -> motor.motor_asyncio.AsyncIOMotorClient:
+    """Gibt den Client des aktuellen Event-Loops zurück und legt ihn bei Bedarf an (ohne Netzwerkzugriff)."""
+    loop = asyncio.get_running_loop()
+    client = _clients.get(loop)
+    if client is None:
+        client = _build_client()
+        _clients[loop] = client
+    return client
 
 async def init_db():
     """
     Initialisiert die Datenbankverbindung und Beanie.
-    Diese Funktion wird jetzt von beiden, API und Worker, aufgerufen und ist robust gegen geschlossene Event-Loops.
+    Wird von API und Worker aufgerufen; ist der aktuelle Event-Loop schon initialisiert, passiert nichts.
+    Bis MONGO_CONNECT_RETRIES Versuche mit wachsender Pause, etwa solange MongoDB beim Start noch hochfährt.
     """
+    loop = asyncio.get_running_loop()
+    if loop in _initialized_loops:
+        return
     print("--- DB: Initialisiere Datenbankverbindung... ---")
-    
-    max_retries = 5
-    retry_delay = 2
-    
-    for attempt in range(max_retries):
+    client = get_client()
+
+    for attempt in range(settings.MONGO_CONNECT_RETRIES):
         try:
-            # Verbindungsstring erstellen, genau wie in deinem Code
-            mongo_uri = f"mongodb://{settings.MONGO_INITDB_ROOT_USERNAME}:{settings.MONGO_INITDB_ROOT_PASSWORD}@{settings.MONGO_HOST}:27017"
-            
-            # Client erstellen. Dies geschieht jetzt bei jedem Aufruf von init_db,
-            # was den Fehler "Event loop is closed" verhindert.
-            client = motor.motor_asyncio.AsyncIOMotorClient(mongo_uri)
-            
-            # Verbindung pingen
-            await client.admin.command('ping') 
-            
-            # Beanie mit allen Dokumenten initialisieren, genau wie in deinem Code.
-            # Annahme: Der DB-Name in deiner .env ist 'website_analyzer_db' oder du passt es hier an.
+            await client.admin.command('ping')
             await init_beanie(
-                database=client.get_database("website_analyzer_db"), 
-                document_models=[User, AnalysisJob]
+                database=client.get_database(settings.MONGO_DB_NAME),
+                document_models=DOCUMENT_MODELS,
+                skip_indexes=True
             )
-            
-            print(f"✅ DB: Datenbankverbindung erfolgreich auf Versuch {attempt + 1}.")
-            return # Wichtig: Die Funktion hier beenden, wenn erfolgreich
-        
+            await _create_indexes()
+            _initialized_loops.add(loop)
+            print(f"✅ DB: Datenbankverbindung erfolgreich auf Versuch {attempt + 1} (Pool max. {settings.MONGO_MAX_POOL_SIZE}).")
+            return
         except Exception as e:
             print(f"⚠️ DB: Datenbankverbindung fehlgeschlagen auf Versuch {attempt + 1}: {e}")
-            if attempt < max_retries - 1:
-                print(f"   Warte {retry_delay} Sekunden...")
+            if attempt < settings.MONGO_CONNECT_RETRIES - 1:
+                retry_delay = settings.MONGO_CONNECT_RETRY_DELAY * (2 ** attempt)
+                print(f"   Warte {retry_delay:.1f} Sekunden...")
                 await asyncio.sleep(retry_delay)
             else:
                 print("🚨 DB: Konnte nach allen Versuchen keine Verbindung zur Datenbank herstellen.")
-                raise # Den Fehler weiterwerfen, damit der Celery-Task als 'failed' markiert wird
\ No newline at end of file
+                raise # Den Fehler weiterwerfen, damit der Celery-Task als 'failed' markiert wird
+
+async def _create_indexes() -> None:
+    """
+    Legt die in Settings.indexes deklarierten Indexe einzeln an, statt über init_beanie. Scheitert
+    einer (z.B. email_unique bei doppelten E-Mails in einer bestehenden Datenbank), startet die
+    Anwendung trotzdem; indexes.check_indexes meldet ihn danach als fehlend.
+    """
+    for model in DOCUMENT_MODELS:
+        collection = get_collection(model)
+        for index in getattr(model.Settings, "indexes", []):
+            try:
+                await collection.create_indexes([index])
+            except Exception as e:
+                print(f"🚨 DB: Index '{index.document['name']}' in '{model.Settings.name}' konnte nicht angelegt werden: {e}")
+
+def get_collection(model) -> motor.motor_asyncio.AsyncIOMotorCollection:
+    """Direkter Zugriff auf die Collection eines Dokument-Modells, für Abfragen an Beanie vorbei (Pipelines, Bulk-Updates)."""
+    return get_client().get_database(settings.MONGO_DB_NAME)[model.Settings.name]
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Verbindungszahlen des Prozesses, etwa um MONGO_MAX_POOL_SIZE an uvicorn- und Celery-Concurrency anzupassen."""
+    return {**_pool_stats.snapshot(), "clients": len(_clients), "max_pool_size": settings.MONGO_MAX_POOL_SIZE}
+
+async def check_health() -> Dict[str, Any]:
+    """
+    Günstiger Health-Check für API und Worker: ein ping über den vorhandenen Pool, begrenzt durch
+    MONGO_HEALTH_TIMEOUT. Wirft nie, sondern meldet den Fehler im Ergebnis.
+    """
+    started = time.perf_counter()
+    try:
+        await asyncio.wait_for(get_client().admin.command('ping'), timeout=settings.MONGO_HEALTH_TIMEOUT)
+    except Exception as e:
+        return {"status": "error", "error": str(e) or type(e).__name__, "pool": get_pool_stats()}
+    return {"status": "ok", "latency_ms": round((time.perf_counter() - started) * 1000, 1), "pool": get_pool_stats()}
+
+async def close_db():
+    """Schließt den Client des aktuellen Event-Loops (beim Herunterfahren von API bzw. Worker-Prozess)."""
+    loop = asyncio.get_running_loop()
+    _initialized_loops.discard(loop)
+    client = _clients.pop(loop, None)
+    if client is not None:
+        client.close()
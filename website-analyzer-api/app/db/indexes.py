@@ -0,0 +1,47 @@
+# app/db/indexes.py
+
+from typing import Dict, List
+
+from app.db import database
+
+async def check_indexes() -> Dict[str, Dict[str, List[str]]]:
+    """
+    Vergleicht die in Settings.indexes deklarierten Indexe jeder Collection mit denen in MongoDB:
+    "missing" sind deklariert, aber nicht vorhanden (z.B. weil database._create_indexes sie wegen
+    doppelter Werte nicht anlegen konnte), "undeclared" existieren, sind aber nicht (mehr)
+    deklariert, und "unused" wurden laut $indexStats seit dem letzten Neustart von MongoDB nie benutzt.
+    """
+    report = {}
+    for model in database.DOCUMENT_MODELS:
+        collection = database.get_collection(model)
+        declared = {index.document["name"] for index in getattr(model.Settings, "indexes", [])}
+        existing = set(await collection.index_information()) - {"_id_"}
+        try:
+            usage = {stat["name"]: stat["accesses"]["ops"] async for stat in collection.aggregate([{"$indexStats": {}}])}
+        except Exception as e:
+            # $indexStats braucht die clusterMonitor-Rolle; ohne sie fehlt nur diese Spalte.
+            print(f"⚠️ DB: Index-Nutzung für '{model.Settings.name}' nicht abrufbar: {e}")
+            usage = {}
+        report[model.Settings.name] = {
+            "missing": sorted(declared - existing),
+            "undeclared": sorted(existing - declared),
+            "unused": sorted(name for name, ops in usage.items() if ops == 0 and name != "_id_"),
+        }
+    return report
+
+async def log_index_report() -> None:
+    """Startup-Check: meldet fehlende, nicht deklarierte und ungenutzte Indexe, bricht aber nie ab."""
+    try:
+        report = await check_indexes()
+    except Exception as e:
+        print(f"⚠️ DB: Index-Check fehlgeschlagen: {e}")
+        return
+    for collection_name, findings in report.items():
+        if findings["missing"]:
+            print(f"🚨 DB: In '{collection_name}' fehlen deklarierte Indexe: {', '.join(findings['missing'])}")
+        if findings["undeclared"]:
+            print(f"⚠️ DB: In '{collection_name}' gibt es nicht deklarierte Indexe: {', '.join(findings['undeclared'])}")
+        if findings["unused"]:
+            print(f"ℹ️ DB: In '{collection_name}' seit dem MongoDB-Start ungenutzte Indexe: {', '.join(findings['unused'])}")
+    if not any(any(findings.values()) for findings in report.values()):
+        print("✅ DB: Alle deklarierten Indexe vorhanden und in Benutzung.")
@@ -2,8 +2,10 @@
 
 from beanie import Document
 from pydantic import Field, EmailStr, BaseModel
+from pymongo import ASCENDING, DESCENDING, IndexModel
 from typing import Optional, List, Any, Dict, Union 
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
+from app.core.config import settings
 
 class User(Document):
     email: EmailStr
@@ -13,6 +15,8 @@ class User(Document):
     is_active: bool = True 
     class Settings:
         name = "users"
+        # Login (security.authenticate_user) sucht per E-Mail; unique verhindert doppelte Konten.
+        indexes = [IndexModel([("email", ASCENDING)], name="email_unique", unique=True)]
 
 # --- Der Rest der Datei bleibt exakt so, wie du ihn hast ---
 class ExclusionCriterion(BaseModel):
@@ -36,6 +40,14 @@ class AnalysisJob(Document):
     exclusion_analysis: Optional[List[ExclusionCriterion]] = None
     detailed_analysis: Optional[List[DetailedAnalysisCriterion]] = None
     actionable_recommendations: Optional[List[Union[str, Dict[str, Any]]]] = None
+    # Pro geparster Seite: URL, Confidence-Score und die Kennzahlen der fusionierten Seitenanalyse.
+    page_reports: Optional[List[Dict[str, Any]]] = None
+    # Auf Wunsch des Nutzers frische KI-Antworten erzwingen, statt den LLM-Cache zu lesen.
+    bypass_llm_cache: bool = False
+    # Was payload_builder kürzen musste, um das Token-Budget der finalen Analyse einzuhalten.
+    payload_trimming: Optional[Dict[str, Any]] = None
+    # Felder der finalen Analyse, die schon gespeichert sind (füllt sich während des Streamings).
+    completed_sections: Optional[List[str]] = None
     
     notes: Optional[str] = None
     retry_count: int = Field(default=0)
@@ -45,5 +57,31 @@ class AnalysisJob(Document):
     finished_at: Optional[datetime] = None
     user_id: Optional[str] = None
     error_message: Optional[str] = None
+    # Löschzeitpunkt für den TTL-Index; None = Job wird behalten (siehe JOB_RETENTION_HOURS).
+    expires_at: Optional[datetime] = None
 
-    class Settings: name = "analysis_jobs"
\ No newline at end of file
+    @staticmethod
+    def expiry_for(status: str, finished_at: datetime) -> Optional[datetime]:
+        retention_hours = settings.JOB_RETENTION_HOURS.get(status)
+        return finished_at + timedelta(hours=retention_hours) if retention_hours is not None else None
+
+    def mark_finished(self, status: str) -> None:
+        """Setzt den Endstatus, finished_at und je nach Status das Ablaufdatum; speichern muss der Aufrufer."""
+        self.status = status
+        self.finished_at = datetime.now(timezone.utc)
+        self.expires_at = self.expiry_for(status, self.finished_at)
+
+    class Settings:
+        name = "analysis_jobs"
+        # Field(unique=True) legt in Beanie keinen Index an, deshalb alle Indexe explizit.
+        # job_id_unique deckt auch die Abfragen auf job_id + user_id ab (höchstens ein Treffer).
+        indexes = [
+            IndexModel([("job_id", ASCENDING)], name="job_id_unique", unique=True),
+            # /history, /check und /stats: Jobs eines Nutzers, neueste zuerst. _id macht die
+            # Sortierung eindeutig, damit /history per Cursor (created_at, _id) blättern kann.
+            IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="user_created_at_id"),
+            # System-Manager: hängende Jobs (status + created_at)
+            IndexModel([("status", ASCENDING), ("created_at", ASCENDING)], name="status_created_at"),
+            # MongoDB löscht Jobs selbst, sobald expires_at erreicht ist (Dokumente ohne expires_at bleiben).
+            IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+        ]
\ No newline at end of file
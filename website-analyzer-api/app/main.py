@@ -1,16 +1,21 @@
 # app/main.py
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
-from app.db.database import init_db
+from app.core.config import settings
+from app.db.database import check_health, close_db, init_db
+from app.db.indexes import log_index_report
 from app.api.routes import auth, analysis
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    """Initialisiert die Datenbankverbindung beim Start."""
+    """Initialisiert die Datenbankverbindung beim Start und schließt sie beim Herunterfahren."""
     await init_db()
+    if settings.DB_INDEX_CHECK_ON_STARTUP:
+        await log_index_report()
     yield
+    await close_db()
     print("API shutdown.")
 
 app = FastAPI(
@@ -46,4 +51,12 @@ app.include_router(analysis.router, prefix="/analysis", tags=["Analysis"])
 @app.get("/", tags=["Status"])
 def read_root():
     """Ein einfacher Endpunkt, um zu prüfen, ob die API online ist."""
-    return {"status": "ok", "message": "Welcome to the Website Analyzer API!"}
\ No newline at end of file
+    return {"status": "ok", "message": "Welcome to the Website Analyzer API!"}
+
+@app.get("/health", tags=["Status"])
+async def health(response: Response):
+    """Health-Check inklusive Datenbank-Ping und Verbindungs-Pool; 503, wenn MongoDB nicht erreichbar ist."""
+    database = await check_health()
+    if database["status"] != "ok":
+        response.status_code = 503
+    return {"status": database["status"], "database": database}
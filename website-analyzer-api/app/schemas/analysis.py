@@ -6,11 +6,29 @@ from datetime import datetime
 
 class AnalysisCreate(BaseModel):
     url: HttpUrl
+    bypass_llm_cache: bool = False
 
 class JobResponse(BaseModel):
     job_id: str
     status: str
     url: str
+    # Während der finalen Analyse: die bereits unter /results abrufbaren Teilergebnisse.
+    completed_sections: Optional[List[str]] = None
+
+class JobSummary(BaseModel):
+    """Ein Eintrag in /history; das vollständige Ergebnis liefert /results/{job_id}."""
+    id: str
+    job_id: str
+    url: str
+    status: str
+    classification: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+class JobHistoryPage(BaseModel):
+    items: List[JobSummary]
+    # Als cursor-Parameter übergeben, um die nächste Seite zu laden; None auf der letzten Seite.
+    next_cursor: Optional[str] = None
 
 # --- Detaillierte Pydantic-Modelle für das strukturierte Analyse-Ergebnis ---
 # KORREKTUR: Alle Felder werden optional, um mit alten/unvollständigen Daten kompatibel zu sein.
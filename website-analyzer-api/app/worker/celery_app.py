@@ -1,6 +1,8 @@
 # app/worker/celery_app.py
 
 from celery import Celery
+from celery.concurrency import get_implementation
+from celery.signals import worker_init, worker_process_init, worker_process_shutdown
 from app.core.config import settings
 
 redis_url = f"redis://{settings.REDIS_HOST}:6379/0"
@@ -12,4 +14,27 @@ celery_app = Celery(
 )
 
 # Sagt Celery nur noch, wo es nach Tasks suchen soll.
-celery_app.autodiscover_tasks(["app.worker"])
\ No newline at end of file
+celery_app.autodiscover_tasks(["app.worker"])
+
+# Pools, die pro Prozess immer nur einen Task gleichzeitig ausführen (siehe app/worker/runtime.py).
+SUPPORTED_POOLS = ("celery.concurrency.prefork", "celery.concurrency.solo")
+
+@worker_init.connect
+def check_worker_pool(sender=None, **kwargs):
+    """Bricht den Start mit threads/gevent/eventlet ab, statt erst beim zweiten parallelen Task zu scheitern."""
+    from app.worker import runtime
+    pool = get_implementation(sender.pool_cls)
+    if pool.__module__ not in SUPPORTED_POOLS:
+        # SystemExit statt Exception: Celery fängt Exceptions aus Signal-Handlern ab und startet trotzdem.
+        raise SystemExit(f"🚨 Pool '{pool.__module__}' nicht unterstützt. {runtime.UNSUPPORTED_POOL_MESSAGE}")
+
+@worker_process_init.connect
+def init_worker_process(**kwargs):
+    """Jeder Worker-Prozess bekommt einen eigenen, langlebigen Event-Loop; die DB-Verbindung folgt beim ersten Task."""
+    from app.worker import runtime
+    runtime.start()
+
+@worker_process_shutdown.connect
+def shutdown_worker_process(**kwargs):
+    from app.worker import runtime
+    runtime.shutdown()
@@ -0,0 +1,72 @@
+# app/worker/runtime.py
+import asyncio
+import threading
+from typing import Any, Coroutine, Optional, TypeVar
+
+from app.core import http_client, redis_client
+from app.db.database import close_db, init_db
+
+T = TypeVar("T")
+
+# Ein langlebiger Event-Loop pro Worker-Prozess. Motor-, HTTP- und Redis-Clients sind an ihren Loop
+# gebunden und werden so über alle Tasks des Prozesses hinweg wiederverwendet, statt bei jedem
+# asyncio.run() neu aufgebaut (und nie geschlossen) zu werden.
+# Das setzt voraus, dass ein Prozess nie zwei Tasks gleichzeitig ausführt: unterstützt werden nur die
+# Celery-Pools prefork und solo, nicht threads, gevent oder eventlet (siehe celery_app.check_worker_pool).
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_thread: Optional[int] = None
+
+UNSUPPORTED_POOL_MESSAGE = (
+    "Der Worker unterstützt nur die Celery-Pools 'prefork' und 'solo': jeder Prozess hat genau einen "
+    "Event-Loop und kann keine Tasks parallel in Threads oder Greenlets ausführen."
+)
+
+def start() -> None:
+    """
+    Legt den Event-Loop des Prozesses an. Ohne Netzwerkzugriff, damit worker_process_init schnell
+    fertig wird (Celery beendet Kindprozesse, die dafür länger als worker_proc_alive_timeout brauchen).
+    """
+    global _loop, _loop_thread
+    if _loop is not None and not _loop.is_closed():
+        return
+    _loop = asyncio.new_event_loop()
+    _loop_thread = threading.get_ident()
+    asyncio.set_event_loop(_loop)
+
+def run(coroutine: Coroutine[Any, Any, T]) -> T:
+    """
+    Führt eine Task-Koroutine auf dem Loop des Prozesses aus (startet ihn bei Bedarf, z.B. im solo-Pool).
+    Die Datenbank wird beim ersten Task initialisiert; schlägt das fehl, scheitert nur dieser Task
+    und der nächste versucht es erneut.
+    Aus einem anderen Thread oder Greenlet bzw. während der Loop läuft gibt es einen klaren
+    RuntimeError statt "This event loop is already running".
+    """
+    start()
+    if threading.get_ident() != _loop_thread or _loop.is_running():
+        coroutine.close()
+        raise RuntimeError(UNSUPPORTED_POOL_MESSAGE)
+    try:
+        _loop.run_until_complete(init_db())
+    except BaseException:
+        coroutine.close()
+        raise
+    return _loop.run_until_complete(coroutine)
+
+async def _close_clients() -> None:
+    await http_client.close_client()
+    await redis_client.close_redis()
+    await close_db()
+
+def shutdown() -> None:
+    """Schließt alle Verbindungen des Prozesses und danach den Event-Loop."""
+    global _loop, _loop_thread
+    if _loop is None or _loop.is_closed():
+        return
+    try:
+        _loop.run_until_complete(_close_clients())
+        _loop.run_until_complete(_loop.shutdown_asyncgens())
+    finally:
+        _loop.close()
+        _loop = None
+        _loop_thread = None
+        print("--- WORKER: Event-Loop und Verbindungen geschlossen. ---")
@@ -1,31 +1,80 @@
 # app/worker/tasks.py
 
 import traceback
-import random
 import json
 import asyncio
+import time
 from datetime import datetime, timedelta, timezone
-from collections import defaultdict
+from typing import Any, Dict, Optional, Tuple
 from urllib.parse import urlparse, urlunparse
-import requests
 
+from app.worker import runtime
 from app.worker.celery_app import celery_app
+from app.db import database
 from app.db.models import AnalysisJob, ExclusionCriterion, DetailedAnalysisCriterion
-from app.core import analyzer, crawler, parser
+from app.core import analyzer, confidence_scorer, crawler, http_cache, llm_client, page_classifier, page_selector, parser, payload_builder, section_digest
 from app.core.config import settings
-from app.db.database import init_db
-from beanie.operators import In
-
-BOILERPLATE_PATH_KEYWORDS = ['datenschutz', 'impressum', 'agb', 'cookie', 'legal', 'login', 'rechtliches', 'widerrufsbelehrung', 'versand']
-EXCLUDED_SUBDOMAINS = ['docs', 'api', 'status', 'files', 'developer', 'support', 'blog', 'karriere', 'jobs']
+from app.core.page_store import PageStore
 
 def get_clean_root_url(url: str) -> str:
     parsed = urlparse(url)
     netloc = parsed.netloc.replace("www.", "")
     return urlunparse((parsed.scheme, netloc, '', '', '', ''))
 
+async def _load_html(url_str: str, page_store: PageStore) -> str:
+    """Liefert das HTML einer Seite aus dem Page-Store und lädt nur vom Crawler übersprungene Seiten nach."""
+    stored_page = page_store.get(url_str)
+    if stored_page is not None:
+        if stored_page.status_code >= 400:
+            raise ValueError(f"HTTP-Status {stored_page.status_code} beim Crawlen von {url_str}")
+        if 'text/html' not in stored_page.content_type:
+            raise ValueError(f"Kein HTML ({stored_page.content_type or 'ohne Content-Type'}) beim Crawlen von {url_str}")
+        return stored_page.text
+    response = await http_cache.fetch(url_str)
+    response.raise_for_status()
+    return response.text
+
+# Top-Level-Felder der finalen KI-Antwort, die am Job gespeichert werden.
+ANALYSIS_SECTIONS = ("opportunity_analysis", "detailed_analysis", "exclusion_analysis", "actionable_recommendations", "full_text_analysis")
+
+def _apply_analysis_section(job: AnalysisJob, key: str, value: Any) -> None:
+    if key == "exclusion_analysis":
+        if value:
+            job.exclusion_analysis = [ExclusionCriterion(**item) for item in value]
+    elif key == "detailed_analysis":
+        if value:
+            job.detailed_analysis = [DetailedAnalysisCriterion(**item) for item in value]
+    else:
+        setattr(job, key, value)
+
+async def _parse_with_llm(html_content: str, url_str: str, rule_based: Dict[str, Any], semaphore: asyncio.Semaphore, use_cache: bool) -> Tuple[Optional[Dict[str, Any]], float]:
+    """
+    Parst eine Seite mit niedriger Confidence über den begrenzten LLM-Pool. Gesendet wird nur der
+    bereinigte <body>. Liefert (page_data oder None bei Fehler/Timeout/unbrauchbarer Antwort, Dauer in ms).
+    """
+    async with semaphore:
+        started = time.perf_counter()
+        try:
+            llm_content = await asyncio.wait_for(
+                analyzer.parse_with_llm(parser.clean_body_html(html_content), url_str, use_cache=use_cache),
+                timeout=settings.LLM_PARSE_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            print(f"    -> ⏱️ LLM-Parser für {url_str} nach {settings.LLM_PARSE_TIMEOUT:.0f}s abgebrochen, nutze regelbasiertes Ergebnis.")
+            llm_content = None
+        elapsed_ms = (time.perf_counter() - started) * 1000
+    # Die Antwort des LLM ist nicht vertrauenswürdig: Klassifizierung und Payload-Builder erwarten
+    # genau die Struktur des regelbasierten Parsers, sonst scheitert der ganze Job.
+    llm_content = parser.normalize_page_data(llm_content, url_str)
+    if llm_content is None:
+        return None, elapsed_ms
+    # Der bereinigte Body enthält keinen <head>: Titel und Meta-Description aus dem regelbasierten Ergebnis übernehmen.
+    for field in ("page_title", "meta_description"):
+        if not llm_content[field] and rule_based.get(field):
+            llm_content[field] = rule_based[field]
+    return llm_content, elapsed_ms
+
 async def async_run_analysis(job_id: str):
-    await init_db()
     
     job = await AnalysisJob.find_one(AnalysisJob.job_id == job_id)
     if not job:
@@ -35,27 +84,28 @@ async def async_run_analysis(job_id: str):
     job.backend_version = settings.BACKEND_VERSION
     print(f"✅ [WORKER][{job_id}] Task gestartet (Version {job.backend_version}). Setze Status auf 'in_progress'.")
     job.status = "in_progress"
+    job.completed_sections = None
     await job.save()
 
+    page_store = PageStore()
     try:
         print(f"  [1/5] [{job_id}] Crawling wird gestartet für URL: {job.url}")
-        urls_to_process, link_map, crawled_urls = crawler.get_url_list_and_map(job.url)
+        crawl_result = await crawler.async_get_url_list_and_map(job.url, page_store=page_store)
+        urls_to_process, link_map = crawl_result.fetched_urls, crawl_result.link_map
         if not urls_to_process: raise ValueError("Crawling hat keine internen URLs geliefert.")
-        print(f"  [1/5] [{job_id}] Crawling erfolgreich: {len(crawled_urls)} URLs.")
+        print(f"  [1/5] [{job_id}] Crawling erfolgreich: {len(urls_to_process)} Seiten geladen, {crawl_result.discovered_count} interne URLs entdeckt.")
 
         print(f"  [2/5] [{job_id}] Filtern und Samplen der URL-Liste...")
-        page_collections = defaultdict(list)
-        for url_str in urls_to_process:
-            path_parts = urlparse(url_str).path.strip('/').split('/')
-            if len(path_parts) > 1 and not path_parts[1].isdigit(): page_collections[path_parts[0]].append(url_str)
-            else: page_collections['root'].append(url_str)
+        # Die Collections hat bereits der Crawler gebildet und übervolle Collections dabei gedeckelt.
+        page_collections = crawl_result.collections
         final_urls_to_parse = []
         excluded_urls_for_report = []
         for key, pages in page_collections.items():
             if len(pages) > settings.COLLECTION_THRESHOLD:
-                sample = random.sample(pages, settings.COLLECTION_SAMPLE_SIZE)
+                sample = page_selector.select_pages(pages, settings.COLLECTION_SAMPLE_SIZE, page_store)
+                sample_set = set(sample)
                 final_urls_to_parse.extend(sample)
-                excluded_urls_for_report.extend([p for p in pages if p not in sample])
+                excluded_urls_for_report.extend([p for p in pages if p not in sample_set])
                 print(f"    -> Collection '{key}' gesampelt: {len(sample)} von {len(pages)} Seiten behalten.")
             else:
                 final_urls_to_parse.extend(pages)
@@ -64,29 +114,106 @@ async def async_run_analysis(job_id: str):
         print(f"  [3/5] [{job_id}] Starte Parsing für {len(final_urls_to_parse)} Seiten...")
         relevant_pages_for_analysis = []
         failed_page_reports = []
-        for i, url_str in enumerate(final_urls_to_parse):
+        page_reports = []
+        parse_results = []
+        llm_parse_tasks = {}
+        llm_parse_semaphore = asyncio.Semaphore(settings.LLM_PARSE_MAX_CONCURRENCY)
+        use_llm_parser = settings.LLM_PARSE_ENABLED and llm_client.is_configured()
+        for url_str in final_urls_to_parse:
             try:
-                response = requests.get(url_str, timeout=10)
-                response.raise_for_status()
-                html_content = response.text
-                parsed_content = parser.parse_html_to_json(html_content, url_str)
-                if parsed_content and not parsed_content.get("parsing_error"):
-                    relevant_pages_for_analysis.append(parsed_content)
-                else:
-                    reason = parsed_content.get("parsing_error", "Parsing lieferte keinen Inhalt.")
-                    failed_page_reports.append({"url": url_str, "reason": reason})
+                html_content = await _load_html(url_str, page_store)
+                started = time.perf_counter()
+                parsed_content, page_metrics = parser.analyze_page(html_content, url_str)
+                confidence_score = confidence_scorer.score_metrics(page_metrics)
+                report = {
+                    "url": url_str,
+                    "confidence_score": confidence_score,
+                    "semantic_ratio": round(page_metrics["semantic_ratio"], 3),
+                    "text_to_tag_ratio": round(page_metrics["text_to_tag_ratio"], 3),
+                    "body_size": page_metrics["body_size"],
+                    "route": "rules",
+                    "parse_ms": round((time.perf_counter() - started) * 1000, 1)
+                }
+                page_reports.append(report)
+                if use_llm_parser and confidence_score < settings.CONFIDENCE_THRESHOLD:
+                    # Läuft im Hintergrund weiter, während die übrigen Seiten regelbasiert geparst werden.
+                    report["route"] = "llm"
+                    llm_parse_tasks[len(parse_results)] = asyncio.create_task(
+                        _parse_with_llm(html_content, url_str, parsed_content, llm_parse_semaphore, use_cache=not job.bypass_llm_cache)
+                    )
+                parse_results.append((url_str, parsed_content, report))
             except Exception as e:
                 print(f"    -> 🚨 Fehler beim Parsen von {url_str}: {e}")
                 failed_page_reports.append({"url": url_str, "reason": str(e)})
+
+        llm_parse_results = {}
+        if llm_parse_tasks:
+            print(f"    -> {len(llm_parse_tasks)} Seiten unter Confidence {settings.CONFIDENCE_THRESHOLD} gehen an den LLM-Parser...")
+            llm_parse_results = dict(zip(llm_parse_tasks, await asyncio.gather(*llm_parse_tasks.values())))
+        for position, (url_str, parsed_content, report) in enumerate(parse_results):
+            if position in llm_parse_results:
+                llm_content, llm_parse_ms = llm_parse_results[position]
+                report["parse_ms"] = round(report["parse_ms"] + llm_parse_ms, 1)
+                if llm_content is not None:
+                    parsed_content = llm_content
+                else:
+                    report["route"] = "llm_fallback"
+            if parsed_content and not parsed_content.get("parsing_error"):
+                relevant_pages_for_analysis.append(parsed_content)
+            else:
+                reason = parsed_content.get("parsing_error", "Parsing lieferte keinen Inhalt.")
+                failed_page_reports.append({"url": url_str, "reason": reason})
         if not relevant_pages_for_analysis: raise ValueError("Parsing lieferte für keine einzige Seite verwertbaren Inhalt.")
         print(f"  [3/5] [{job_id}] Parsing abgeschlossen: {len(relevant_pages_for_analysis)} Seiten erfolgreich verarbeitet.")
+
+        classifications = await page_classifier.classify_pages(relevant_pages_for_analysis, use_cache=not job.bypass_llm_cache)
+        for report in page_reports:
+            classification = classifications.get(report["url"])
+            if classification:
+                report["category"] = classification["category"]
+                report["category_source"] = classification["source"]
+        job.page_reports = page_reports
+        boilerplate_urls = {url for url, classification in classifications.items() if classification["category"] == "Boilerplate"}
+        content_pages = [page for page in relevant_pages_for_analysis if page.get("url") not in boilerplate_urls]
+        # Besteht eine Website nur aus Boilerplate, wird lieber alles analysiert als gar nichts.
+        if content_pages:
+            excluded_urls_for_report.extend(page.get("url") for page in relevant_pages_for_analysis if page.get("url") in boilerplate_urls)
+            relevant_pages_for_analysis = content_pages
+        sources = [classification["source"] for classification in classifications.values()]
+        print(f"  [3/5] [{job_id}] Klassifizierung: {sources.count('rules')} per Regel, {sources.count('llm')} per LLM, {len(relevant_pages_for_analysis)} Seiten bleiben für die Analyse.")
         
         print(f"  [4/5] [{job_id}] Bereite Daten für finale KI-Analyse vor...")
         final_data_input = {"seiten_inhalte": relevant_pages_for_analysis, "link_struktur": link_map, "parsing_fehlschlaege": failed_page_reports, "ausgeschlossene_seiten": excluded_urls_for_report}
+        # Dedupliziert wird beim Bauen jedes Payloads, damit Verweise nach Kürzung und Gruppierung gültig bleiben.
+        final_payload = payload_builder.build_final_payload(final_data_input)
+        if final_payload.dedup_stats:
+            print(f"  [4/5] [{job_id}] Deduplizierung: {final_payload.dedup_stats.as_dict()}")
+        if settings.MAP_REDUCE_ENABLED and final_payload.original_tokens > settings.MAP_REDUCE_THRESHOLD_TOKENS:
+            page_groups = section_digest.group_pages(relevant_pages_for_analysis, classifications)
+            print(f"  [4/5] [{job_id}] Große Website (ca. {final_payload.original_tokens} Tokens): verdichte {len(page_groups)} Seitengruppen parallel...")
+            digests, failed_groups = await section_digest.summarize_groups(page_groups, use_cache=not job.bypass_llm_cache)
+            if digests:
+                final_payload = payload_builder.build_final_payload(section_digest.build_reduce_input(final_data_input, digests, failed_groups))
+            print(f"  [4/5] [{job_id}] Verdichtung: {len(digests)} Digests, {len(failed_groups)} Gruppen fehlgeschlagen.")
+        job.payload_trimming = final_payload.report() if final_payload.trimming_steps else None
+        print(f"  [4/5] [{job_id}] Payload: ca. {final_payload.tokens} Tokens (Budget {final_payload.budget}).")
         print(f"  [4/5] [{job_id}] Sende Anfrage an Google AI. Das kann einen Moment dauern...")
-        full_llm_response_str = analyzer.analyze_messaging(final_data_input)
+
+        async def save_partial_section(key: str, value: Any) -> None:
+            # Fertige Teile der gestreamten Antwort sofort speichern, damit Clients sie schon anzeigen können.
+            if key not in ANALYSIS_SECTIONS:
+                return
+            try:
+                _apply_analysis_section(job, key, value)
+                job.completed_sections = [*(job.completed_sections or []), key]
+                await job.save()
+                print(f"    -> 📡 [{job_id}] Teilergebnis '{key}' gespeichert.")
+            except Exception as e:
+                print(f"    -> ⚠️ [{job_id}] Teilergebnis '{key}' konnte nicht gespeichert werden: {e}")
+
+        full_llm_response_str = await analyzer.analyze_messaging(final_payload, use_cache=not job.bypass_llm_cache, on_section=save_partial_section)
         if not full_llm_response_str: raise ValueError("Die Antwort der KI war leer.")
-        print(f"  [4/5] [{job_id}] KI-Analyse erfolgreich abgeschlossen. Antwort erhalten.")
+        print(f"  [4/5] [{job_id}] KI-Analyse erfolgreich abgeschlossen. Antwort erhalten. LLM-Cache (Prozess): {llm_client.get_cache_stats()}")
 
         print(f"  [5/5] [{job_id}] Verarbeite JSON-Antwort der KI...")
         try:
@@ -100,22 +227,11 @@ async def async_run_analysis(job_id: str):
             raise ValueError(f"KI-Analyse hat einen internen Fehler gemeldet: {analysis_data['error']}")
 
         # Hier werden jetzt ALLE Felder aus der KI-Antwort korrekt gespeichert
-        job.opportunity_analysis = analysis_data.get("opportunity_analysis")
-        job.full_text_analysis = analysis_data.get("full_text_analysis")
-        
-        exclusion_data = analysis_data.get("exclusion_analysis", [])
-        if exclusion_data:
-            job.exclusion_analysis = [ExclusionCriterion(**item) for item in exclusion_data]
-            
-        detailed_data = analysis_data.get("detailed_analysis", [])
-        if detailed_data:
-            job.detailed_analysis = [DetailedAnalysisCriterion(**item) for item in detailed_data]
-
-        # *** DIE ENTSCHEIDENDE, NEUE ZEILE ***
-        job.actionable_recommendations = analysis_data.get("actionable_recommendations")
-
-        job.status = "completed"
-        job.finished_at = datetime.now(timezone.utc)
+        for key in ANALYSIS_SECTIONS:
+            _apply_analysis_section(job, key, analysis_data.get(key))
+        job.completed_sections = [key for key in ANALYSIS_SECTIONS if analysis_data.get(key)]
+
+        job.mark_finished("completed")
         await job.save()
         print(f"✅✅✅ [WORKER][{job_id}] Job erfolgreich abgeschlossen und als 'completed' markiert! ✅✅✅")
 
@@ -127,25 +243,26 @@ async def async_run_analysis(job_id: str):
         print("--- VOLLSTÄNDIGER TRACEBACK ---")
         print(full_traceback)
         print("-------------------------------")
-        job.status = "failed"
+        job.mark_finished("failed")
         job.error_message = user_friendly_error_message
         job.full_text_analysis = f"DEBUG-INFORMATION:\n\n{full_traceback}"
-        job.finished_at = datetime.now(timezone.utc)
         await job.save()
         print(f"🚨 [WORKER][{job_id}] Job-Status wurde auf 'failed' gesetzt und Fehlerdetails gespeichert.")
+    finally:
+        # HTTP- und Redis-Clients bleiben für die nächsten Tasks offen; runtime.shutdown schließt sie.
+        page_store.close()
 
 @celery_app.task(name="run_website_analysis_task")
 def run_website_analysis_task(job_id: str):
     try:
-        asyncio.run(async_run_analysis(job_id=job_id))
+        runtime.run(async_run_analysis(job_id=job_id))
     except Exception as e:
         print(f"🚨🚨🚨 [CELERY WRAPPER][{job_id}] Kritischer Fehler: {e} 🚨🚨🚨")
         async def mark_as_failed():
-            await init_db()
             job = await AnalysisJob.find_one(AnalysisJob.job_id == job_id)
             if job and job.status != "failed":
-                job.status = "failed"; job.error_message = "Unerwarteter Fehler im Worker-Wrapper."; job.finished_at = datetime.now(timezone.utc); await job.save()
-        asyncio.run(mark_as_failed())
+                job.mark_finished("failed"); job.error_message = "Unerwarteter Fehler im Worker-Wrapper."; await job.save()
+        runtime.run(mark_as_failed())
 
 # === Der neue, intelligente System-Manager (ersetzt den alten Hausmeister) ===
 
@@ -154,48 +271,80 @@ def setup_periodic_tasks(sender, **kwargs):
     """Richtet den periodischen System-Manager-Task ein."""
     sender.add_periodic_task(300.0, system_manager_task.s(), name='system manager every 5 mins')
 
+# Jobs aus der Zeit vor dem TTL-Index haben kein expires_at; das wird einmal pro Worker-Prozess nachgetragen.
+_expiry_backfilled = False
+
+async def _backfill_job_expiry(jobs) -> int:
+    backfilled = 0
+    for status, retention_hours in settings.JOB_RETENTION_HOURS.items():
+        result = await jobs.update_many(
+            {"status": status, "expires_at": None, "finished_at": {"$ne": None}},
+            [{"$set": {"expires_at": {"$add": ["$finished_at", retention_hours * 3600 * 1000]}}}]
+        )
+        backfilled += result.modified_count
+    return backfilled
+
 async def _run_system_manager_logic():
-    """Die asynchrone Logik für den System-Manager."""
-    await init_db()
+    """
+    Die asynchrone Logik für den System-Manager. Alte Jobs löscht MongoDB selbst über den
+    TTL-Index auf expires_at; hier bleibt nur die Wiederaufnahme hängender Jobs. Die Abfrage
+    liest nur job_id und retry_count von höchstens SYSTEM_MANAGER_BATCH_SIZE Jobs. Jedes Update
+    prüft den Status erneut, damit ein Job, der inzwischen fertig wurde, unverändert bleibt.
+    """
     now = datetime.now(timezone.utc)
     print(f"--- ⚙️ System-Manager: Starte Überprüfung um {now.isoformat()} ---")
+    print(f"--- ⚙️ System-Manager: Datenbank {await database.check_health()} ---")
+
+    global _expiry_backfilled
+    jobs = database.get_collection(AnalysisJob)
+    if not _expiry_backfilled:
+        backfilled = await _backfill_job_expiry(jobs)
+        _expiry_backfilled = True
+        if backfilled:
+            print(f"--- ⚙️ System-Manager: Ablaufdatum für {backfilled} ältere Jobs nachgetragen. ---")
+
+    stuck_status = {"$in": ["in_progress", "pending"]}
+    stale_time_limit = now - timedelta(minutes=settings.STUCK_JOB_TIMEOUT_MINUTES)
+    stuck_jobs = await jobs.find(
+        {"status": stuck_status, "created_at": {"$lt": stale_time_limit}},
+        {"_id": 0, "job_id": 1, "retry_count": 1}
+    ).sort("created_at", 1).limit(settings.SYSTEM_MANAGER_BATCH_SIZE).to_list(length=settings.SYSTEM_MANAGER_BATCH_SIZE)
+
+    retry_ids = [job["job_id"] for job in stuck_jobs if not job.get("retry_count")]
+    failed_ids = [job["job_id"] for job in stuck_jobs if job.get("retry_count")]
+
+    retried = 0
+    for job_id in retry_ids:
+        # Einzeln und atomar: nur wenn der Job noch hängt, wird er erneut eingeplant.
+        retried_job = await jobs.find_one_and_update(
+            {"job_id": job_id, "status": stuck_status, "retry_count": {"$in": [0, None]}},
+            [{"$set": {
+                "retry_count": {"$add": [{"$ifNull": ["$retry_count", 0]}, 1]},
+                "notes": {"$concat": [{"$ifNull": ["$notes", ""]}, "\n[System-Manager: Task schien blockiert, starte Versuch 1...]"]}
+            }}],
+            projection={"_id": 1}
+        )
+        if retried_job is None:
+            continue
+        retried += 1
+        celery_app.send_task('run_website_analysis_task', args=[job_id])
+        print(f"--- ⚙️ System-Manager: Task {job_id} schien blockiert. Wird erneut versucht (Versuch #1). ---")
 
-    stale_time_limit = now - timedelta(minutes=5)
-    stuck_jobs = await AnalysisJob.find(
-        AnalysisJob.created_at < stale_time_limit,
-        In(AnalysisJob.status, ["in_progress", "pending"])
-    ).to_list()
-
-    for job in stuck_jobs:
-        if job.retry_count == 0:
-            job.retry_count += 1
-            job.notes = (job.notes or "") + f"\n[System-Manager: Task schien blockiert, starte Versuch {job.retry_count}...]"
-            await job.save()
-            celery_app.send_task('run_website_analysis_task', args=[job.job_id])
-            print(f"--- ⚙️ System-Manager: Task {job.job_id} schien blockiert. Wird erneut versucht (Versuch #{job.retry_count}). ---")
-        else:
-            job.status = "failed"
-            job.error_message = "Analyse nach mehreren automatischen Wiederholungsversuchen fehlgeschlagen."
-            job.finished_at = now
-            await job.save()
-            print(f"--- ⚙️ System-Manager: Task {job.job_id} nach Wiederholung endgültig als fehlgeschlagen markiert. ---")
-
-    cleanup_time_limit = now - timedelta(hours=24)
-    old_failed_jobs = await AnalysisJob.find(
-        AnalysisJob.finished_at < cleanup_time_limit,
-        AnalysisJob.status == "failed"
-    ).to_list()
-
-    if old_failed_jobs:
-        deleted_count = len(old_failed_jobs)
-        for job in old_failed_jobs:
-            await job.delete()
-        print(f"--- ⚙️ System-Manager: {deleted_count} alte, fehlgeschlagene Jobs (>24h) endgültig gelöscht. ---")
+    failed = 0
+    if failed_ids:
+        result = await jobs.update_many({"job_id": {"$in": failed_ids}, "status": stuck_status}, {"$set": {
+            "status": "failed",
+            "error_message": "Analyse nach mehreren automatischen Wiederholungsversuchen fehlgeschlagen.",
+            "finished_at": now,
+            "expires_at": AnalysisJob.expiry_for("failed", now)
+        }})
+        failed = result.modified_count
+        print(f"--- ⚙️ System-Manager: {failed} Tasks nach Wiederholung endgültig als fehlgeschlagen markiert. ---")
 
     print(f"--- ⚙️ System-Manager: Überprüfung abgeschlossen. ---")
-    return f"Checked: {len(stuck_jobs)} stuck, Deleted: {len(old_failed_jobs) if old_failed_jobs else 0} old failed."
+    return f"Checked: {len(stuck_jobs)} stuck, Retried: {retried}, Failed: {failed}."
 
 @celery_app.task(name="system_manager_task")
 def system_manager_task():
     """Synchroner Wrapper für den System-Manager-Task."""
-    return asyncio.run(_run_system_manager_logic())
\ No newline at end of file
+    return runtime.run(_run_system_manager_logic())
\ No newline at end of file
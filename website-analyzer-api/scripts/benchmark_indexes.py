@@ -0,0 +1,141 @@
+# scripts/benchmark_indexes.py
+
+import argparse
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+from app.db import database
+from app.db.models import AnalysisJob, User
+
+STATUSES = ["completed"] * 80 + ["failed"] * 12 + ["in_progress"] * 5 + ["pending"] * 3
+
+def seed_documents(jobs: int, users: int, rng: random.Random) -> tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Erzeugt Nutzer und Jobs mit realistischer Verteilung (Status, Zeitstempel über 90 Tage)."""
+    now = datetime.now(timezone.utc)
+    user_docs = [{"email": f"bench-{i}@example.com", "hashed_password": "x", "is_active": True} for i in range(users)]
+    job_docs = []
+    for _ in range(jobs):
+        created_at = now - timedelta(seconds=rng.randrange(90 * 24 * 3600))
+        status = rng.choice(STATUSES)
+        job_docs.append({
+            "url": f"https://example-{rng.randrange(10_000)}.com",
+            "job_id": str(uuid.UUID(int=rng.getrandbits(128))),
+            "status": status,
+            "user_id": f"user-{rng.randrange(users)}",
+            "created_at": created_at,
+            "finished_at": created_at + timedelta(minutes=rng.randrange(1, 30)) if status in ("completed", "failed") else None,
+            "full_text_analysis": "x" * rng.randrange(2_000, 8_000),
+        })
+    return user_docs, job_docs
+
+def describe_plan(plan: Dict[str, Any]) -> str:
+    """Verkettet die Stages des Gewinner-Plans, z.B. 'LIMIT > FETCH > IXSCAN(user_created_at_id)'."""
+    stages = []
+    while plan:
+        stage = plan.get("stage", "?")
+        stages.append(f"{stage}({plan['indexName']})" if "indexName" in plan else stage)
+        plan = plan.get("inputStage") or (plan.get("inputStages") or [None])[0]
+    return " > ".join(stages)
+
+def build_cursor(collection, query: Dict[str, Any], hint: Optional[Any]):
+    cursor = collection.find(query["filter"], {"_id": 1})
+    if query.get("sort"):
+        cursor = cursor.sort(query["sort"])
+    if query.get("limit"):
+        cursor = cursor.limit(query["limit"])
+    if hint is not None:
+        cursor = cursor.hint(hint)
+    return cursor
+
+async def measure(collection, query: Dict[str, Any], hint: Optional[Any], repeat: int) -> Dict[str, Any]:
+    explain = await build_cursor(collection, query, hint).explain()
+    stats = explain.get("executionStats", {})
+    latencies = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await build_cursor(collection, query, hint).to_list(length=None)
+        latencies.append((time.perf_counter() - started) * 1000)
+    return {
+        "plan": describe_plan(explain["queryPlanner"]["winningPlan"]),
+        "docs_examined": stats.get("totalDocsExamined"),
+        "keys_examined": stats.get("totalKeysExamined"),
+        "returned": stats.get("nReturned"),
+        "median_ms": statistics.median(latencies),
+    }
+
+def build_queries(user_docs: List[Dict[str, Any]], job_docs: List[Dict[str, Any]], rng: random.Random) -> List[Dict[str, Any]]:
+    """Die Abfragemuster aus routes/analysis.py, tasks.py und security.py."""
+    sample_job = rng.choice(job_docs)
+    now = datetime.now(timezone.utc)
+    return [
+        {"name": "Job per job_id + user_id (/results, /status, ...)", "model": AnalysisJob,
+         "filter": {"job_id": sample_job["job_id"], "user_id": sample_job["user_id"]}},
+        {"name": "Historie eines Nutzers (/history)", "model": AnalysisJob,
+         "filter": {"user_id": sample_job["user_id"]}, "sort": [("created_at", -1), ("_id", -1)], "limit": 20},
+        {"name": "Hängende Jobs (System-Manager)", "model": AnalysisJob,
+         "filter": {"status": {"$in": ["in_progress", "pending"]}, "created_at": {"$lt": now - timedelta(minutes=5)}},
+         "sort": [("created_at", 1)], "limit": 100},
+        {"name": "Login per E-Mail", "model": User,
+         "filter": {"email": rng.choice(user_docs)["email"]}},
+    ]
+
+async def benchmark(args: argparse.Namespace) -> None:
+    rng = random.Random(args.seed)
+    db = database.get_client().get_database(args.database)
+    await database.get_client().drop_database(args.database)
+
+    user_docs, job_docs = seed_documents(args.jobs, args.users, rng)
+    print(f"Seede {len(job_docs)} Jobs und {len(user_docs)} Nutzer in '{args.database}'...")
+    await db[User.Settings.name].insert_many(user_docs)
+    for start in range(0, len(job_docs), 10_000):
+        await db[AnalysisJob.Settings.name].insert_many(job_docs[start:start + 10_000])
+
+    queries = build_queries(user_docs, job_docs, rng)
+    results: Dict[str, Dict[str, Any]] = {}
+    for label, create_indexes in (("ohne Indexe", False), ("mit Indexen", True)):
+        if create_indexes:
+            for model in (AnalysisJob, User):
+                await db[model.Settings.name].create_indexes(model.Settings.indexes)
+        for query in queries:
+            collection = db[query["model"].Settings.name]
+            # Ohne Indexe erzwingt der Hint einen Collection-Scan, auch wenn Indexe schon existieren.
+            results.setdefault(query["name"], {})[label] = await measure(collection, query, None if create_indexes else {"$natural": 1}, args.repeat)
+
+    for name, by_label in results.items():
+        print(f"\n{name}")
+        for label, result in by_label.items():
+            print(f"  {label:12} {result['median_ms']:8.2f} ms  docs={result['docs_examined']:>7} keys={result['keys_examined']:>7} "
+                  f"returned={result['returned']:>6}  {result['plan']}")
+
+    if not args.keep:
+        await database.get_client().drop_database(args.database)
+    await database.close_db()
+
+def main() -> int:
+    """
+    Seedet eine eigene Benchmark-Datenbank, misst die Abfragemuster der App ohne und mit den in
+    den Modellen deklarierten Indexen und gibt Query-Plan, untersuchte Dokumente und Latenz aus.
+    Beispiel: python /scripts/benchmark_indexes.py --jobs 200000 --users 500
+    """
+    arg_parser = argparse.ArgumentParser(description="Query-Plan- und Latenz-Benchmark der MongoDB-Indexe.")
+    arg_parser.add_argument("--jobs", type=int, default=100_000)
+    arg_parser.add_argument("--users", type=int, default=200)
+    arg_parser.add_argument("--repeat", type=int, default=20, help="Wiederholungen pro Abfrage für den Median.")
+    arg_parser.add_argument("--database", default=f"{settings.MONGO_DB_NAME}_index_benchmark")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--keep", action="store_true", help="Benchmark-Datenbank danach nicht löschen.")
+    args = arg_parser.parse_args()
+    if args.database == settings.MONGO_DB_NAME:
+        print("Die Benchmark-Datenbank darf nicht die Anwendungsdatenbank sein (sie wird gelöscht).")
+        return 2
+    asyncio.run(benchmark(args))
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
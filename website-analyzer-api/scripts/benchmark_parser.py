@@ -0,0 +1,91 @@
+# scripts/benchmark_parser.py
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+from app.core.parser import PARSER_BACKENDS, analyze_page, parse_html_to_json
+
+REFERENCE_BACKEND = "html.parser"
+
+def load_corpus(corpus_dir: Path) -> list[tuple[Path, str]]:
+    """Lädt alle gespeicherten Seiten (*.html) aus dem Korpus-Verzeichnis."""
+    return [(path, path.read_text(encoding="utf-8", errors="replace")) for path in sorted(corpus_dir.glob("*.html"))]
+
+def golden_path(page_path: Path) -> Path:
+    return page_path.with_suffix(".golden.json")
+
+def write_golden(corpus: list[tuple[Path, str]]) -> None:
+    """Schreibt die Ausgabe des Referenz-Backends als Golden-Datei neben jede Seite."""
+    for path, html in corpus:
+        page_data = parse_html_to_json(html, path.name, backend=REFERENCE_BACKEND)
+        golden_path(path).write_text(json.dumps(page_data, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"{len(corpus)} Golden-Dateien mit Backend '{REFERENCE_BACKEND}' geschrieben.")
+
+def check_equivalence(corpus: list[tuple[Path, str]], backend: str) -> list[Path]:
+    """Vergleicht ein Backend mit den Golden-Dateien (oder live mit dem Referenz-Backend)."""
+    mismatches = []
+    for path, html in corpus:
+        golden_file = golden_path(path)
+        if golden_file.exists():
+            expected = json.loads(golden_file.read_text(encoding="utf-8"))
+        else:
+            expected = parse_html_to_json(html, path.name, backend=REFERENCE_BACKEND)
+        if parse_html_to_json(html, path.name, backend=backend) != expected:
+            mismatches.append(path)
+        elif backend != REFERENCE_BACKEND and metrics_differ(html, path.name, backend):
+            mismatches.append(path)
+    return mismatches
+
+def metrics_differ(html: str, url: str, backend: str) -> bool:
+    """Vergleicht die Kennzahlen für den Confidence-Score (analyze_page) mit dem Referenz-Backend."""
+    return analyze_page(html, url, backend=backend)[1] != analyze_page(html, url, backend=REFERENCE_BACKEND)[1]
+
+def measure_throughput(corpus: list[tuple[Path, str]], backend: str, repeat: int) -> tuple[float, float]:
+    """Gibt (Seiten pro Sekunde, MB pro Sekunde) für ein Backend zurück."""
+    total_bytes = sum(len(html.encode("utf-8")) for _, html in corpus) * repeat
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for path, html in corpus:
+            parse_html_to_json(html, path.name, backend=backend)
+    elapsed = time.perf_counter() - started
+    return len(corpus) * repeat / elapsed, total_bytes / elapsed / (1024 * 1024)
+
+def main() -> int:
+    """
+    Prüft auf einem Korpus gespeicherter Seiten, dass alle Parser-Backends dieselbe page_data-Struktur
+    liefern, und misst den Durchsatz. Die Golden-Fälle mit fehlerhaftem HTML laufen als Test
+    (tests/test_parser.py).
+    Beispiel: python /scripts/benchmark_parser.py /data/parser_corpus --repeat 3
+    """
+    arg_parser = argparse.ArgumentParser(description="Golden-Output-Vergleich und Durchsatz-Benchmark der Parser-Backends.")
+    arg_parser.add_argument("corpus_dir", type=Path, help="Verzeichnis mit gespeicherten Seiten (*.html).")
+    arg_parser.add_argument("--backends", nargs="+", default=list(PARSER_BACKENDS), choices=list(PARSER_BACKENDS))
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Wie oft der Korpus für die Messung geparst wird.")
+    arg_parser.add_argument("--write-golden", action="store_true", help="Golden-Dateien mit dem Referenz-Backend neu schreiben.")
+    args = arg_parser.parse_args()
+
+    corpus = load_corpus(args.corpus_dir)
+    if not corpus:
+        print(f"Keine *.html-Dateien in {args.corpus_dir} gefunden.")
+        return 1
+    if args.write_golden:
+        write_golden(corpus)
+
+    exit_code = 0
+    print(f"Korpus: {len(corpus)} Seiten, {sum(len(html) for _, html in corpus) / (1024 * 1024):.1f} MB")
+    for backend in args.backends:
+        mismatches = check_equivalence(corpus, backend)
+        pages_per_second, mb_per_second = measure_throughput(corpus, backend, args.repeat)
+        status = "✅ identisch" if not mismatches else f"🚨 {len(mismatches)} Abweichungen"
+        print(f"{backend:>12}: {pages_per_second:8.1f} Seiten/s  {mb_per_second:6.2f} MB/s  {status}")
+        for path in mismatches:
+            print(f"              -> {path.name}")
+        if mismatches:
+            exit_code = 1
+    return exit_code
+
+if __name__ == "__main__":
+    sys.exit(main())
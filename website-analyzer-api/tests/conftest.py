@@ -0,0 +1,16 @@
+# tests/conftest.py
+
+import os
+
+# Settings verlangt diese Werte aus der .env; die Tests brauchen weder MongoDB noch Redis noch Gemini.
+for name, value in {
+    "MONGO_INITDB_ROOT_USERNAME": "test",
+    "MONGO_INITDB_ROOT_PASSWORD": "test",
+    "MONGO_HOST": "localhost",
+    "REDIS_HOST": "localhost",
+    "DEIN_GOOGLE_API_KEY": "test",
+    "JWT_SECRET_KEY": "test",
+    "ALGORITHM": "HS256",
+    "ACCESS_TOKEN_EXPIRE_MINUTES": "30",
+}.items():
+    os.environ.setdefault(name, value)
@@ -0,0 +1,71 @@
+# tests/test_page_classifier.py
+
+import asyncio
+
+import pytest
+
+from app.core import llm_client, page_classifier
+from app.core.page_classifier import classify_by_rules
+
+LONG_TEXT = "Wir helfen mittelständischen Unternehmen, ihre Prozesse zu digitalisieren. " * 10
+
+def _page(url: str, page_title: str = "", h1: str = "") -> dict:
+    return {
+        "url": url,
+        "page_title": page_title,
+        "h1": h1,
+        "intro_content": [LONG_TEXT],
+        "content_structure": [],
+    }
+
+@pytest.mark.parametrize("title", [
+    "Impressum",
+    "Impressum | Acme GmbH",
+    "Acme GmbH – Datenschutzerklärung",
+    "Privacy Policy - Acme",
+    "404 - Seite nicht gefunden",
+    "Login",
+    "AGB | Shop",
+])
+def test_legal_and_login_titles_are_boilerplate(title: str):
+    assert classify_by_rules(_page("https://example.com/seite", title)) == "Boilerplate"
+
+@pytest.mark.parametrize("title", [
+    "Privacy-first analytics for growing teams",
+    "Single Sign In für alle Ihre Apps",
+    "Acme | Privacy by Design für Ihre Kundendaten",
+    "AGB-Generator für Online-Shops",
+    "Cookie-Banner, die Nutzer nicht nerven",
+    "Terms that work: Vertragsmanagement für Agenturen",
+    "Login-Schutz für WordPress",
+    "Datenschutz-Software für den Mittelstand",
+])
+def test_product_titles_are_not_boilerplate(title: str):
+    assert classify_by_rules(_page("https://example.com/produkt", title)) is None
+
+def test_homepage_is_core_messaging_regardless_of_title():
+    assert classify_by_rules(_page("https://example.com/", "Privacy-first analytics | Sign in")) == "Core_Messaging"
+    assert classify_by_rules(_page("https://example.com", "Login")) == "Core_Messaging"
+
+@pytest.mark.parametrize("url", ["https://example.com/rechtliches/impressum", "https://example.com/legal-notice.html", "https://blog.example.com/artikel"])
+def test_boilerplate_paths_and_subdomains(url: str):
+    assert classify_by_rules(_page(url, "Artikel")) == "Boilerplate"
+
+@pytest.mark.parametrize("url", ["https://example.com/magazin/paralegal", "https://example.com/agbeton"])
+def test_path_keywords_match_whole_words(url: str):
+    assert classify_by_rules(_page(url, "Artikel")) is None
+
+def test_batch_answers_without_matching_url_fall_back(monkeypatch: pytest.MonkeyPatch):
+    pages = [_page(f"https://example.com/seite-{i}", f"Seite {i}") for i in range(3)]
+
+    async def fake_generate(prompt, template=None, use_cache=True, is_valid=None):
+        # Eine korrekte Antwort, eine ohne URL und eine mit fremder URL.
+        return '[{"url": "https://example.com/seite-0", "category": "Core_Messaging"}, {"category": "Boilerplate"}, {"url": "https://example.com/andere", "category": "Boilerplate"}]'
+
+    monkeypatch.setattr(llm_client, "is_configured", lambda: True)
+    monkeypatch.setattr(llm_client, "generate", fake_generate)
+    results = asyncio.run(page_classifier.classify_pages(pages, use_cache=False))
+    assert results["https://example.com/seite-0"] == {"category": "Core_Messaging", "source": "llm"}
+    assert results["https://example.com/seite-1"] == {"category": "Hard_to_read", "source": "fallback"}
+    assert results["https://example.com/seite-2"] == {"category": "Hard_to_read", "source": "fallback"}
+    assert "https://example.com/andere" not in results
@@ -0,0 +1,38 @@
+# tests/test_page_selector.py
+
+import pytest
+
+from app.core.page_selector import select_pages
+from app.core.page_store import PageStore, StoredPage
+
+TEMPLATE_HTML = b"<html><body><main><h2>Produkt</h2><p>Immer derselbe Vorlagentext.</p></main></body></html>"
+OTHER_HTML = b"<html><body><main><h2>Ratgeber</h2><p>Ein ganz anderer Text mit vielen anderen Worten.</p></main></body></html>"
+
+TEMPLATE_URLS = [f"https://example.com/produkte/{i}" for i in range(8)]
+OTHER_URLS = [f"https://example.com/ratgeber/{i}" for i in range(3)]
+# Ohne gespeichertes HTML zählen nur die URL-Wörter, diese URLs haben also denselben Fingerprint.
+UNSTORED_URLS = ["https://example.com/seite", "https://example.com/Seite/", "https://example.com/SEITE", "https://example.com/seite?", "https://example.com/seite/#"]
+
+@pytest.fixture
+def page_store():
+    with PageStore() as page_store:
+        for urls, html in ((TEMPLATE_URLS, TEMPLATE_HTML), (OTHER_URLS, OTHER_HTML)):
+            for url in urls:
+                page_store.put(StoredPage(url=url, final_url=url, status_code=200, content_type="text/html", body=html, size=len(html)))
+        yield page_store
+
+@pytest.mark.parametrize("strategy", ["diverse", "central"])
+@pytest.mark.parametrize("urls, budget", [
+    (TEMPLATE_URLS, 1),
+    (TEMPLATE_URLS, 3),
+    (TEMPLATE_URLS, 7),
+    (TEMPLATE_URLS + OTHER_URLS, 4),
+    (UNSTORED_URLS, 3),
+], ids=["identisch-1", "identisch-3", "identisch-7", "zwei-gruppen-4", "ohne-html-3"])
+def test_select_pages_with_identical_pages(page_store: PageStore, urls: list[str], budget: int, strategy: str):
+    """Auch bei lauter identischen Seiten: genau budget verschiedene Seiten, unabhängig von der Reihenfolge."""
+    selected = select_pages(urls, budget, page_store, strategy=strategy)
+    assert len(selected) == budget
+    assert len(set(selected)) == budget
+    assert set(selected) <= set(urls)
+    assert select_pages(list(reversed(urls)), budget, page_store, strategy=strategy) == selected
@@ -0,0 +1,112 @@
+# tests/test_parser.py
+
+import os
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional
+
+import pytest
+
+from app.core.parser import PARSER_BACKENDS, analyze_page, parse_html_to_json
+
+REFERENCE_BACKEND = "html.parser"
+
+class GoldenCase(NamedTuple):
+    name: str
+    html: str
+    # Nur bei dokumentierten Abweichungen (siehe app/core/parser.py): die Felder, in denen lxml
+    # vom Referenz-Backend abweicht, mit ihrem erwarteten Wert. Sonst müssen alle Backends gleich
+    # sein, einschließlich der Kennzahlen für den Confidence-Score.
+    lxml_expected: Optional[Dict[str, Any]] = None
+    # Erwartete Differenz der lxml-body_size zum Referenz-Backend (siehe _analyze_with_lxml).
+    body_size_deviation: int = 0
+
+# Fehlerhaftes HTML, wie es in gecrawlten Seiten vorkommt.
+GOLDEN_CASES = [
+    GoldenCase("unclosed_div", "<html><body><div><h2>S</h2><p>a</p><div><p>b</body>"),
+    GoldenCase("template", "<html><body><h2>S</h2><template><p>hidden</p></template><p>vis</p></body></html>"),
+    GoldenCase("title_entity", "<html><head><title>A &amp; B</title></head><body><p>x</p></body></html>"),
+    GoldenCase("li_outside_list", "<html><body><h2>S</h2><ul><li>a</ul><li>orphan<p>x</p></body></html>"),
+    # Eingerückte Liste: Leerraum zwischen den Tags darf body_size nicht aufblähen.
+    GoldenCase("indented_list", "<html><body>\n  <main>\n    <h2>List</h2>\n    <ul>\n"
+               + "".join(f"      <li>Item {i}</li>\n" for i in range(30)) + "    </ul>\n  </main>\n</body>\n</html>"),
+    # Boolean-Attribute ohne Wert gibt BeautifulSoup als disabled="" aus.
+    GoldenCase("boolean_attributes", "<html><body><form></form><p><input disabled>x</p><select multiple><option selected>a</option></select><input hidden required></body></html>"),
+    # lxml kann selected="selected" nicht von selected unterscheiden und zählt beide wie
+    # selected="", also len("selected") + len("checked") Zeichen weniger. Das liegt weit unter
+    # jeder sinnvollen Genauigkeit der Body-Größen-Schwelle.
+    GoldenCase("boolean_attributes_with_value", "<html><body><select><option selected=selected>a</option></select><input checked=\"checked\"><input disabled=\"\"></body></html>", body_size_deviation=-15),
+    GoldenCase("p_in_table", "<html><body><h2>S</h2><table><p>in table</p><tr><td>c</td></tr></table></body></html>"),
+    # html.parser verschachtelt die offenen <p>, jeder Absatz enthält den Text aller folgenden
+    # ("onetwoxthreeab", "twoxthreeab", ...). Für das LLM ist das reine Wiederholung; lxml liefert
+    # die Absätze so, wie der Browser sie anzeigt.
+    GoldenCase(
+        "implicit_p_close",
+        "<html><head><title>T</title></head><body><main><h2>A</h2><p>one<p>two<div>x</div><p>three<ul><li>a<li>b</ul></main></body></html>",
+        {"content_structure": [{"heading": "A", "content_blocks": [
+            {"type": "paragraph", "text": "one"}, {"type": "paragraph", "text": "two"},
+            {"type": "paragraph", "text": "three"}, {"type": "list", "items": ["a", "b"]}]}]}
+    ),
+    # html.parser macht den gesamten Rest der Seite zur Überschrift ("Spara boldnext"); bei lxml
+    # bleibt die Überschrift "S" und die Absätze stehen einzeln darunter.
+    GoldenCase(
+        "unclosed_tags",
+        "<html><body><h2>S<p>para <b>bold<p>next</body></html>",
+        {"content_structure": [{"heading": "S", "content_blocks": [
+            {"type": "paragraph", "text": "para bold"}, {"type": "paragraph", "text": "next"}]}]}
+    ),
+    # Im Browser steht "tail" als loser Text außerhalb jedes Absatzes. Losen Text übernimmt keines
+    # der Backends in die page_data; html.parser hängt ihn nur durch die Verschachtelung an "out".
+    GoldenCase(
+        "nested_p",
+        "<html><body><h2>S</h2><p>out<p>in</p>tail</p></body></html>",
+        {"content_structure": [{"heading": "S", "content_blocks": [
+            {"type": "paragraph", "text": "out"}, {"type": "paragraph", "text": "in"}]}]}
+    ),
+    # Die Überschrift beendet den Absatz wie im Browser. html.parser zieht Überschrift und Folgetext
+    # in den Intro-Absatz ("xSy") und verliert dadurch den Abschnitt "S".
+    GoldenCase("heading_in_p", "<html><body><p>x<h2>S</h2>y</p><p>z</p></body></html>", {"intro_content": ["x"]}),
+    # CDATA ist im HTML-Body kein sichtbarer Text; der Browser zeigt " x < y " nicht an, also gehört
+    # es auch nicht in die Analyse.
+    GoldenCase(
+        "cdata",
+        "<html><body><h2>S</h2><p>a<![CDATA[ x < y ]]>b</p></body></html>",
+        {"content_structure": [{"heading": "S", "content_blocks": [{"type": "paragraph", "text": "ab"}]}]}
+    ),
+    # <title> enthält laut HTML-Standard nur Text; der Browser zeigt "Hello <b>World</b>" wörtlich
+    # im Tab. Das ist für die Analyse besser als der leere Titel von html.parser.
+    GoldenCase("title_markup", "<html><head><title>Hello <b>World</b></title></head><body><h1>H<i>1</i></h1><p>x</p></body></html>", {"page_title": "Hello <b>World</b>"}),
+]
+
+OTHER_BACKENDS = [name for name in PARSER_BACKENDS if name != REFERENCE_BACKEND]
+
+@pytest.mark.parametrize("backend", OTHER_BACKENDS)
+@pytest.mark.parametrize("case", GOLDEN_CASES, ids=lambda case: case.name)
+def test_golden_case_page_data(case: GoldenCase, backend: str):
+    expected = parse_html_to_json(case.html, case.name, backend=REFERENCE_BACKEND)
+    if backend == "lxml" and case.lxml_expected is not None:
+        expected = {**expected, **case.lxml_expected}
+    assert parse_html_to_json(case.html, case.name, backend=backend) == expected
+
+@pytest.mark.parametrize("backend", OTHER_BACKENDS)
+@pytest.mark.parametrize("case", [case for case in GOLDEN_CASES if case.lxml_expected is None], ids=lambda case: case.name)
+def test_golden_case_metrics(case: GoldenCase, backend: str):
+    """Die Kennzahlen für den Confidence-Score müssen dem Referenz-Backend entsprechen."""
+    expected = analyze_page(case.html, case.name, backend=REFERENCE_BACKEND)[1]
+    if backend == "lxml":
+        expected = {**expected, "body_size": expected["body_size"] + case.body_size_deviation}
+    assert analyze_page(case.html, case.name, backend=backend)[1] == expected
+
+def _corpus_pages() -> list[Path]:
+    corpus_dir = os.environ.get("PARSER_CORPUS_DIR")
+    return sorted(Path(corpus_dir).glob("*.html")) if corpus_dir else []
+
+@pytest.mark.skipif(not _corpus_pages(), reason="PARSER_CORPUS_DIR nicht gesetzt (Verzeichnis mit gespeicherten Seiten *.html)")
+@pytest.mark.parametrize("backend", OTHER_BACKENDS)
+def test_corpus_equivalence(backend: str):
+    """Optional gegen einen Korpus echter Seiten: page_data und Kennzahlen wie beim Referenz-Backend."""
+    mismatches = []
+    for path in _corpus_pages():
+        html = path.read_text(encoding="utf-8", errors="replace")
+        if analyze_page(html, path.name, backend=backend) != analyze_page(html, path.name, backend=REFERENCE_BACKEND):
+            mismatches.append(path.name)
+    assert not mismatches
@@ -0,0 +1,50 @@
+# tests/test_payload_builder.py
+
+import re
+
+from app.core import payload_builder, section_digest
+from app.core.config import settings
+
+CTA = "Jetzt unverbindlich beraten lassen und in nur fünf Minuten das passende Angebot für Ihr Unternehmen finden."
+
+def _page(url: str, paragraphs: list[str]) -> dict:
+    return {
+        "url": url,
+        "page_title": url,
+        "intro_content": [],
+        "content_structure": [
+            # Dieselbe Überschrift zweimal: Verweise dürfen sich nicht auf Überschriften verlassen.
+            {"heading": "Leistungen", "content_blocks": [{"type": "paragraph", "text": text} for text in paragraphs]},
+            {"heading": "Leistungen", "content_blocks": [{"type": "paragraph", "text": CTA}]},
+        ],
+    }
+
+def _unresolved_refs(data: dict) -> list[str]:
+    """Alle Duplikat-Verweise, deren Ziel im Payload nicht (mehr) als Text-Block steht."""
+    pages = {page["url"]: page for page in data.get("seiten_inhalte", [])}
+    unresolved = []
+    for page in pages.values():
+        blocks = [block for section in page["content_structure"] for block in section["content_blocks"]]
+        for ref in (block["ref"] for block in blocks if block.get("type") == "duplicate"):
+            url, section_index, position = re.fullmatch(r"(.*)#(\d+)\[(\d+)\]", ref).groups()
+            sections = pages[url]["content_structure"] if url in pages else []
+            target_blocks = sections[int(section_index)]["content_blocks"] if int(section_index) < len(sections) else []
+            if int(position) >= len(target_blocks) or target_blocks[int(position)].get("type") != "paragraph":
+                unresolved.append(ref)
+    return unresolved
+
+def test_duplicate_refs_survive_trimming():
+    # Das erste Vorkommen des CTA steht hinter vielen Absätzen und fällt der Kürzung zum Opfer.
+    filler = [f"Absatz {i}: " + "Wir liefern Lösungen für den Mittelstand. " * 10 for i in range(12)]
+    pages = [_page("https://example.com/a", filler + [CTA])] + [_page(f"https://example.com/{i}", [CTA]) for i in range(5)]
+    payload = payload_builder.build_final_payload({"seiten_inhalte": pages}, budget=1500)
+    assert payload.trimming_steps
+    assert payload.dedup_stats is not None and payload.dedup_stats.exact_duplicates
+    assert not _unresolved_refs(payload.data)
+
+def test_duplicate_refs_stay_within_each_group():
+    pages = [_page(f"https://example.com/{name}/1", [CTA]) for name in ("blog", "produkte")]
+    classifications = {pages[0]["url"]: {"category": "Supporting_Content"}, pages[1]["url"]: {"category": "Core_Messaging"}}
+    for group in section_digest.group_pages(pages, classifications):
+        payload = payload_builder.build_final_payload({"seiten_inhalte": group.pages}, budget=settings.MAP_REDUCE_GROUP_TOKEN_BUDGET)
+        assert not _unresolved_refs(payload.data)